@@ -0,0 +1,103 @@
+"""Circuit breaker failing fast the calls to an unavailable backend."""
+from itertools import count
+from random import uniform
+from threading import Lock
+from time import monotonic, sleep
+
+from napps.kytos.kronos.utils import BackendUnavailableError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Stop calling a backend for a while after consecutive failures.
+
+    Calls raising an exception for which ``is_failure`` returns True fail.
+    While the breaker is closed, failed calls are retried ``retries`` times,
+    after random delays of up to ``backoff`` seconds, doubled on each retry,
+    and ``threshold`` consecutive failures open it. While it is open, calls
+    raise BackendUnavailableError at once. After ``reset_timeout`` seconds
+    it is half-open: a single trial call goes through, closing the breaker
+    if it succeeds and opening it again if it fails.
+    """
+
+    def __init__(self, is_failure, threshold=5, reset_timeout=30, retries=2,
+                 backoff=0.1):
+        """Start closed."""
+        self._is_failure = is_failure
+        self._threshold = max(int(threshold), 1)
+        self._reset_timeout = float(reset_timeout)
+        self._retries = max(int(retries), 0)
+        self._backoff = float(backoff)
+        self._lock = Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self):
+        """Return the state of the breaker."""
+        return self._state
+
+    def call(self, function, *args, **kwargs):
+        """Return ``function(*args, **kwargs)``, unless the breaker is open."""
+        for attempt in count():
+            self._acquire()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                failed = self._is_failure(exc)
+                self._record(failed)
+                if not failed or attempt >= self._retries or \
+                   self._state != CLOSED:
+                    raise
+                sleep(uniform(0, self._backoff * 2 ** attempt))
+            else:
+                self._record(False)
+                return result
+
+    def stats(self):
+        """Return the state of the breaker and its counters."""
+        with self._lock:
+            return {'state': self._state,
+                    'failures': self._failures,
+                    'opened': self._opened,
+                    'rejected': self._rejected}
+
+    def _acquire(self):
+        """Raise BackendUnavailableError unless a call may go through."""
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and \
+               monotonic() - self._opened_at >= self._reset_timeout:
+                # This call is the trial of the half-open breaker.
+                self._state = HALF_OPEN
+                return
+            self._rejected += 1
+        error = 'Error. The backend is unavailable, its circuit is open.'
+        raise BackendUnavailableError(error)
+
+    def _record(self, failed):
+        """Update the state of the breaker with the outcome of a call.
+
+        Errors that are not failures, like invalid queries, still show that
+        the backend answers.
+        """
+        with self._lock:
+            if not failed:
+                self._state = CLOSED
+                self._failures = 0
+                return
+
+            self._failures += 1
+            if self._state == HALF_OPEN or \
+               self._failures >= self._threshold:
+                if self._state != OPEN:
+                    self._opened += 1
+                self._state = OPEN
+                self._opened_at = monotonic()
@@ -1,11 +1,27 @@
 """Backend that save data along time using a csv file."""
 import csv
+import heapq
+import io
 import os
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import groupby, islice
+from operator import itemgetter
 from pathlib import Path
+from threading import RLock
+from time import monotonic
 
-from napps.kytos.kronos.utils import (iso_format_validation, now,
+from napps.kytos.kronos.backends.wrapper import split_fields
+from napps.kytos.kronos.utils import (NamespaceError, convert_to_iso,
+                                      iso_format_validation, namespace_regex,
+                                      now, to_nanoseconds,
                                       validate_timestamp)
 
+HEADER = ['Value', 'Timestamp']
+UNORDERED = 'unordered'
+# Length of the ISO-8601 timestamp prefix that names each segment file.
+SEGMENT_KEYS = {'daily': 10, 'hourly': 13}
+
 
 def _config_path(file_path):
 
@@ -21,88 +37,640 @@ def _config_path(file_path):
     return file_path
 
 
-def _make_search(start, end, fname):
-    """Return the result of the search in csv file."""
-    end = end or now()
-    start = start or 0
+def _normalize_timestamp(timestamp, precision='s'):
+    """Return the timestamp as an ISO-8601 string, comparable as text.
 
-    validate_timestamp(start, end)
-    start = iso_format_validation(start)
-    end = iso_format_validation(end)
+    Epoch times are in the ``precision`` unit, and stored in whole seconds.
+    """
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, (int, float)) or \
+       iso_format_validation(timestamp) is False:
+        if precision != 's':
+            timestamp = to_nanoseconds(timestamp, precision) // 10**9
+        return convert_to_iso(timestamp)
+    return timestamp
 
-    search = []
 
-    with open(fname, 'r', newline='') as csvfile:
-        csvreader = csv.reader(csvfile, delimiter=',')
-        for row in csvreader:
-            if start <= row[1] <= end:
-                search.append(row)
-    return search
+def _segment_key(timestamp, length):
+    """Return the segment that stores an ISO-8601 timestamp."""
+    key = timestamp[:length]
+    if len(key) == 10 and length == 13:
+        key += 'T00'
+    return key
 
 
-class CSVBackend:
-    """CSV backend class defines methods to store, retrieve and delete data."""
+def _index_path(fname):
+    return f'{fname}.idx'
 
-    def __init__(self, settings):
-        """Define the user and a path in case the user does not pass one."""
-        self._read_config(settings)
 
-    def _read_config(self, settings):
-        params = {'PATH': 'data', 'USER': 'default_user'}
-        config = settings.BACKENDS.get('CSV')
-        for key in params:
-            params[key] = config.get(key, params[key])
+def _load_index(fname):
+    """Return the sparse index of a csv file as sorted (time, offset) lists.
 
-        self.path = _config_path(params['PATH'])
-        self.user = params['USER']
+    Return None when there is no usable index, either because the file was
+    written before indexes existed or because its rows are not in time order.
+    """
+    try:
+        with open(_index_path(fname), 'r', newline='') as idxfile:
+            times = []
+            offsets = []
+            for row in csv.reader(idxfile):
+                if row == [UNORDERED]:
+                    return None
+                times.append(row[0])
+                offsets.append(int(row[1]))
+            return times, offsets
+    except FileNotFoundError:
+        return None
 
-    def save(self, namespace, value, timestamp=None):
-        """Store the data in a .csv given a folder."""
-        rows = []
 
-        fname = f"{self.user}_{namespace}.csv"
-        fname = str(Path(self.path, fname))
+def _next_index_entry(tail, timestamp, offset, interval):
+    """Return the index entry for a row written at offset, if one is due.
 
-        if not os.path.exists(fname):
-            rows.append(['Value', 'Timestamp'])
+    ``tail`` is the [last timestamp, last indexed offset] of the file and is
+    updated in place. A row older than the previous one makes the index
+    unusable, so an unordered mark is returned and the tail is disabled.
+    """
+    last_time, last_offset = tail
+    if last_time is None:
+        return None
 
-        rows.append([value, timestamp])
+    if timestamp < last_time:
+        tail[0] = None
+        return [UNORDERED]
 
-        csvfile = open(fname, 'a', newline='')
+    tail[0] = timestamp
+    if last_offset is None or offset - last_offset >= interval:
+        tail[1] = offset
+        return [timestamp, offset]
+    return None
 
-        csvwriter = csv.writer(csvfile, delimiter=',')
-        csvwriter.writerows(rows)
-        csvfile.close()
 
-    def delete(self, namespace, fname, start=None, end=None):
-        """Delete a instances of the csv file."""
-        fname = f"{self.user}_{namespace}.csv"
-        fname = str(Path(self.path, fname))
+def _read_last_row(fname):
+    """Return the last row of a csv file, reading only its tail."""
+    with open(fname, 'rb') as csvfile:
+        size = csvfile.seek(0, os.SEEK_END)
+        csvfile.seek(max(size - 4096, 0))
+        lines = csvfile.read().decode(errors='replace').splitlines()
+    return next(csv.reader(lines[-1:]), None)
 
-        search = _make_search(start, end, fname)
 
-        result = []
+def _complete_lines(rawfile):
+    """Yield the decoded lines of a binary file that end with a line break.
 
-        with open(fname, 'r+', newline='') as csvfile:
-            csvreader = csv.reader(csvfile, delimiter=',')
+    Rows are appended through buffered handles, which may write the start
+    of a row before its end, so an unterminated last line is skipped.
+    """
+    for line in rawfile:
+        if line.endswith(b'\n'):
+            yield line.decode()
 
-            for row in csvreader:
-                if row not in search:
-                    result.append(row)
 
-            csvwriter = csv.writer(csvfile, delimiter=',')
+def _make_search(start, end, fname):
+    """Return the [timestamp, value] rows of a csv file inside a range."""
+    return list(_iter_search(start, end, fname))
 
-            for row in result:
-                csvwriter.writerow(row)
 
-        csvfile.close()
+def _iter_search(start, end, fname):
+    """Yield the [timestamp, value] rows of a csv file inside a range.
 
-    def get(self, namespace, fname, start=None, end=None, method=None,
-            fill=None, group=None):
-        """Retrieve data from a csv file."""
-        fname = f"{self.user}_{namespace}.csv"
-        fname = str(Path(self.path, fname))
+    When the file has a sparse index the scan seeks straight to the last
+    indexed row before ``start`` and stops after the first row past ``end``.
+    The file is read without the backend lock, so partially written or
+    malformed rows are skipped.
+    """
+    end = end or now()
+    start = start or ''
+
+    index = _load_index(fname)
+    offset = 0
+    if index is not None:
+        times, offsets = index
+        position = bisect_left(times, start) - 1
+        if position >= 0:
+            offset = offsets[position]
+
+    with open(fname, 'rb') as rawfile:
+        rawfile.seek(offset)
+        for row in csv.reader(_complete_lines(rawfile), delimiter=','):
+            if row == HEADER or len(row) < 2:
+                continue
+            if row[1] > end:
+                if index is not None:
+                    break
+                continue
+            if start <= row[1]:
+                yield [row[1], row[0]]
+
+
+def _tag_rows(rows, field):
+    """Yield the (timestamp, field, value) tuples of the rows of a field."""
+    for timestamp, value in rows:
+        yield timestamp, field, value
+
+
+def _merge_fields(tagged, fields):
+    """Yield [timestamp, {field: value}] rows from time sorted tagged rows."""
+    for timestamp, group in groupby(tagged, key=itemgetter(0)):
+        values = dict.fromkeys(fields)
+        for _, field, value in group:
+            values[field] = value
+        yield [timestamp, values]
+
+
+def _count_rows(fname):
+    """Return the number of rows of a csv file, without its header."""
+    lines = 0
+    with open(fname, 'rb') as csvfile:
+        for block in iter(lambda: csvfile.read(1 << 20), b''):
+            lines += block.count(b'\n')
+    return max(lines - 1, 0)
+
+
+def _iter_segments(start, end, fnames):
+    """Yield the rows inside a range of each segment file, in order."""
+    for fname in fnames:
+        try:
+            yield from _iter_search(start, end, fname)
+        except FileNotFoundError:
+            # The segment was deleted after the query started.
+            continue
+
+
+class _RowEncoder:
+    """Format csv rows as bytes, to know the size written to a file."""
+
+    def __init__(self):
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line, delimiter=',')
+
+    def encode(self, row):
+        """Return a row as encoded csv bytes."""
+        self._writer.writerow(row)
+        data = self._line.getvalue().encode()
+        self._line.seek(0)
+        self._line.truncate()
+        return data
+
+
+class _AppendFile:
+    """Open append handle of a csv file, with its own row writer.
+
+    Index entries of the pending rows are kept until the rows are flushed,
+    so that the index never points past the data written to the file.
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self.file = open(fname, 'ab')
+        self.size = self.file.seek(0, os.SEEK_END)
+        self.pending = 0
+        self.entries = []
+        self._encoder = _RowEncoder()
+        if self.size == 0:
+            self.size = self.file.write(self._encoder.encode(HEADER))
+
+    def write(self, row):
+        """Append a row and return the offset where it starts."""
+        offset = self.size
+        data = self._encoder.encode(row)
+        self.file.write(data)
+        self.size += len(data)
+        self.pending += 1
+        return offset
+
+    def flush(self, fsync=False):
+        """Write the buffered rows to the operating system or disk.
+
+        The index entries of the rows are appended afterwards.
+        """
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        if self.entries:
+            with open(_index_path(self.fname), 'a', newline='') as idxfile:
+                csv.writer(idxfile).writerows(self.entries)
+            self.entries = []
+        self.pending = 0
+
+
+class _FilePool:
+    """LRU pool of open append handles, closing the least recently used.
+
+    A file is flushed once FLUSH_ROWS rows are pending and every file is
+    flushed when FLUSH_INTERVAL seconds passed since the last full flush.
+    """
+
+    def __init__(self, max_files, flush_rows, flush_interval, fsync):
+        self._files = OrderedDict()
+        self._max_files = max(max_files, 1)
+        self._flush_rows = flush_rows
+        self._flush_interval = flush_interval
+        self._fsync = fsync
+        self._flushed_at = monotonic()
+
+    def open(self, fname):
+        """Return the append handle of a file, opening it if needed."""
+        handle = self._files.get(fname)
+        if handle is not None:
+            self._files.move_to_end(fname)
+            return handle
+
+        while len(self._files) >= self._max_files:
+            _, oldest = self._files.popitem(last=False)
+            self._close(oldest)
+
+        handle = self._files[fname] = _AppendFile(fname)
+        return handle
+
+    def written(self, handle):
+        """Apply the flush policy after rows were written to a handle."""
+        if monotonic() - self._flushed_at >= self._flush_interval:
+            self.flush()
+        elif handle.pending >= self._flush_rows:
+            handle.flush(self._fsync)
+
+    def flush(self, fname=None):
+        """Flush one file, or every open file when fname is None."""
+        if fname is not None:
+            if fname in self._files:
+                self._files[fname].flush(self._fsync)
+            return
+
+        for handle in self._files.values():
+            if handle.pending:
+                handle.flush(self._fsync)
+        self._flushed_at = monotonic()
+
+    def close(self, fname=None):
+        """Close one file, or every open file when fname is None."""
+        if fname is not None:
+            if fname in self._files:
+                self._close(self._files.pop(fname))
+            return
+
+        while self._files:
+            self._close(self._files.popitem()[1])
+
+    def _close(self, handle):
+        handle.flush(self._fsync)
+        handle.file.close()
 
-        search = _make_search(start, end, fname)
 
-        return search
+class CSVBackend:
+    """CSV backend class defines methods to store, retrieve and delete data."""
+
+    # Rows are returned as stored, without filling missing buckets.
+    DEFAULT_FILL = None
+
+    # Each namespace is deleted on its own.
+    DELETES_MEASUREMENTS = False
+
+    # Values are read back as the text written to the files.
+    VALUE_TYPE = str
+
+    def __init__(self, settings):
+        """Define the user and a path in case the user does not pass one."""
+        self._read_config(settings)
+        # Last timestamp and last indexed offset of each file written.
+        self._tails = {}
+        self._dirs = set()
+        self._files = _FilePool(self.max_open_files, self.flush_rows,
+                                self.flush_interval, self.fsync)
+        self._lock = RLock()
+
+    def _read_config(self, settings):
+        params = {'PATH': 'data', 'USER': 'default_user',
+                  'INDEX_INTERVAL': 65536, 'MAX_OPEN_FILES': 128,
+                  'FLUSH_ROWS': 1000, 'FLUSH_INTERVAL': 1, 'FSYNC': False,
+                  'SEGMENT': 'daily'}
+        config = settings.BACKENDS.get('CSV')
+        for key in params:
+            params[key] = config.get(key, params[key])
+
+        self.path = _config_path(params['PATH'])
+        self.user = params['USER']
+        self.index_interval = int(params['INDEX_INTERVAL'])
+        self.max_open_files = int(params['MAX_OPEN_FILES'])
+        self.flush_rows = int(params['FLUSH_ROWS'])
+        self.flush_interval = float(params['FLUSH_INTERVAL'])
+        self.fsync = bool(params['FSYNC'])
+
+        if params['SEGMENT'] not in SEGMENT_KEYS:
+            error = (f'Error. CSV segment \'{params["SEGMENT"]}\' must be one'
+                     f' of {", ".join(SEGMENT_KEYS)}.')
+            raise ValueError(error)
+        self.segment_key = SEGMENT_KEYS[params['SEGMENT']]
+
+    def _fname(self, namespace):
+        """Return the single file used before segments existed."""
+        fname = f"{self.user}_{namespace}.csv"
+        return str(Path(self.path, fname))
+
+    def _segment_fname(self, namespace, timestamp):
+        """Return the segment file that stores a timestamp."""
+        folder = Path(self.path, f'{self.user}_{namespace}')
+        if folder not in self._dirs:
+            folder.mkdir(exist_ok=True)
+            self._dirs.add(folder)
+        key = _segment_key(timestamp, self.segment_key)
+        return str(folder / f'{key}.csv')
+
+    def _segments(self, namespace, start, end):
+        """Return the files of a namespace overlapping [start, end].
+
+        Each item is a (file name, inside) tuple where ``inside`` is True
+        when every row of the file is inside the range. The single file of
+        the previous layout is returned first, if it still exists.
+        """
+        segments = []
+        if os.path.exists(self._fname(namespace)):
+            segments.append((self._fname(namespace), False))
+
+        folder = Path(self.path, f'{self.user}_{namespace}')
+        if not folder.exists():
+            return segments
+
+        for segment in sorted(folder.glob('*.csv')):
+            key = segment.stem
+            first = start[:len(key)]
+            last = end[:len(key)]
+            if first <= key <= last:
+                segments.append((str(segment), first < key < last))
+        return segments
+
+    def _tail(self, fname):
+        """Return the [last timestamp, last indexed offset] of a file.
+
+        The last timestamp is None when the file has no usable index.
+        """
+        if fname not in self._tails:
+            tail = ['', None]
+            if os.path.exists(fname):
+                index = _load_index(fname)
+                if index is None:
+                    tail = [None, None]
+                else:
+                    row = _read_last_row(fname)
+                    if row and row != HEADER:
+                        tail[0] = row[1]
+                    if index[1]:
+                        tail[1] = index[1][-1]
+            self._tails[fname] = tail
+        return self._tails[fname]
+
+    def _update_index(self, handle, timestamp, offset):
+        """Add an index entry for a row written at offset, if needed."""
+        entry = _next_index_entry(self._tails[handle.fname], timestamp,
+                                  offset, self.index_interval)
+        if entry is not None:
+            handle.entries.append(entry)
+
+    def save(self, namespace, value, timestamp=None):
+        """Store the data in the segment file of its timestamp.
+
+        Each field of dictionary data is stored in the ``namespace.field``
+        series, as ``save_many`` does.
+        """
+        timestamp = _normalize_timestamp(timestamp) or now()
+
+        with self._lock:
+            for key, field_value in split_fields(namespace, value).items():
+                self._append(key, field_value, timestamp)
+
+    def _append(self, namespace, value, timestamp):
+        """Write a row to the segment file of an ISO-8601 timestamp."""
+        fname = self._segment_fname(namespace, timestamp)
+        self._tail(fname)
+        handle = self._files.open(fname)
+        offset = handle.write([value, timestamp])
+        self._update_index(handle, timestamp, offset)
+        self._files.written(handle)
+
+    def save_many(self, records, precision='s'):
+        """Store many (namespace, fields, timestamp) records.
+
+        Each field of a record is stored in the ``namespace.field`` series,
+        at the same timestamp, whose epoch times are in the ``precision``
+        unit. Return a list of (position, exception) tuples for skipped
+        records.
+        """
+        errors = []
+        with self._lock:
+            for position, (namespace, data_to_save, timestamp) in \
+                    enumerate(records):
+                try:
+                    timestamp = _normalize_timestamp(timestamp,
+                                                     precision) or now()
+                    for key, value in split_fields(namespace,
+                                                   data_to_save).items():
+                        self._append(key, value, timestamp)
+                except (TypeError, ValueError) as exc:
+                    errors.append((position, exc))
+        return errors
+
+    def flush(self):
+        """Flush the rows written to every open file."""
+        with self._lock:
+            self._files.flush()
+
+    def shutdown(self):
+        """Flush and close every open file."""
+        with self._lock:
+            self._files.close()
+
+    def get_many(self, pattern, start=None, end=None, method=None,
+                 fill=None, group=None):
+        """Return the rows of every namespace matching a pattern.
+
+        The result maps each matching namespace to its rows, read with one
+        scan of its segment files.
+        """
+        regex = namespace_regex(pattern)
+        with self._lock:
+            names = [name for name in self.namespaces() if regex.match(name)]
+            if not names:
+                error = (f'Error to get values because no namespace matches '
+                         f'\'{pattern}\'.')
+                raise NamespaceError(error)
+            return {name: list(self.iter_get(
+                        name, start, end, method, fill, group))
+                    for name in names}
+
+    def delete(self, namespace, start=None, end=None):
+        """Delete the rows of a namespace inside a time range.
+
+        Segments entirely inside the range are unlinked. The others are
+        streamed once into a temporary file without the deleted rows,
+        rebuilding the sparse index on the way, and the result is renamed
+        over the original file. Return the number of deleted rows.
+        """
+        start = _normalize_timestamp(start) or ''
+        end = _normalize_timestamp(end) or now()
+
+        if validate_timestamp(start, end) is False:
+            error = 'Error to get values due end value is smaller than start.'
+            raise ValueError(error)
+
+        with self._lock:
+            segments = self._segments(namespace, start, end)
+            if not segments and not self._exists(namespace):
+                error = (f'Error deleting because namespace \'{namespace}\' '
+                         'does not exist.')
+                raise NamespaceError(error)
+
+            deleted = 0
+            for fname, inside in segments:
+                self._files.close(fname)
+                if inside:
+                    deleted += self._unlink(fname)
+                else:
+                    deleted += self._rewrite(fname, start, end)
+        return deleted
+
+    def namespaces(self):
+        """Return the namespaces stored by the user."""
+        prefix = f'{self.user}_'
+        names = set()
+        if not os.path.isdir(self.path):
+            return []
+        for entry in Path(self.path).iterdir():
+            if not entry.name.startswith(prefix):
+                continue
+            if entry.is_dir():
+                names.add(entry.name[len(prefix):])
+            elif entry.suffix == '.csv':
+                names.add(entry.stem[len(prefix):])
+        return sorted(names)
+
+    def _iter_rows(self, namespace, start, end):
+        """Flush the segments of a range and return an iterator of rows."""
+        with self._lock:
+            if not self._exists(namespace):
+                error = (f'Error to get values because namespace '
+                         f'\'{namespace}\' does not exist.')
+                raise NamespaceError(error)
+
+            fnames = [fname for fname, _ in
+                      self._segments(namespace, start, end)]
+            for fname in fnames:
+                self._files.flush(fname)
+
+        return _iter_segments(start, end, fnames)
+
+    def _iter_fields(self, namespace, fields, start, end):
+        """Return an iterator of rows merging the fields of a namespace.
+
+        Fields without a namespace of their own have None values.
+        """
+        prefix = f'{namespace}.'
+        with self._lock:
+            if fields == '*':
+                names = [name[len(prefix):] for name in self.namespaces()
+                         if name.startswith(prefix)]
+                fields = [name for name in names if '.' not in name]
+            stored = [field for field in fields
+                      if self._exists(f'{prefix}{field}')]
+            if not stored:
+                error = (f'Error to get values because namespace '
+                         f'\'{namespace}\' has no fields.')
+                raise NamespaceError(error)
+
+            rows = [_tag_rows(self._iter_rows(f'{prefix}{field}', start, end),
+                              field) for field in stored]
+
+        return _merge_fields(heapq.merge(*rows), fields)
+
+    def _exists(self, namespace):
+        return os.path.exists(self._fname(namespace)) or \
+            Path(self.path, f'{self.user}_{namespace}').exists()
+
+    def _unlink(self, fname):
+        """Remove a segment file and its index, returning its row count."""
+        rows = _count_rows(fname)
+        if os.path.exists(_index_path(fname)):
+            os.remove(_index_path(fname))
+        os.remove(fname)
+        self._tails.pop(fname, None)
+        return rows
+
+    def _rewrite(self, fname, start, end):
+        """Rewrite a csv file without the rows between start and end.
+
+        Return the number of rows removed.
+        """
+        tail = ['', None]
+        deleted = 0
+        encoder = _RowEncoder()
+
+        with open(fname, 'r', newline='') as csvfile, \
+                open(f'{fname}.tmp', 'wb') as tmpfile, \
+                open(_index_path(f'{fname}.tmp'), 'w', newline='') as idxfile:
+            idxwriter = csv.writer(idxfile)
+            offset = 0
+            for row in csv.reader(csvfile, delimiter=','):
+                if len(row) < 2:
+                    # Left by an interrupted write.
+                    continue
+                if row != HEADER:
+                    if start <= row[1] <= end:
+                        deleted += 1
+                        continue
+                    entry = _next_index_entry(tail, row[1], offset,
+                                              self.index_interval)
+                    if entry is not None:
+                        idxwriter.writerow(entry)
+
+                data = encoder.encode(row)
+                tmpfile.write(data)
+                offset += len(data)
+
+        # Without an index, reads of the new file are still correct while
+        # the index is being replaced.
+        if os.path.exists(_index_path(fname)):
+            os.remove(_index_path(fname))
+        os.replace(f'{fname}.tmp', fname)
+        os.replace(_index_path(f'{fname}.tmp'), _index_path(fname))
+        self._tails[fname] = tail
+        return deleted
+
+    def get(self, namespace, start=None, end=None, method=None,
+            fill=None, group=None, limit=None, after=None, fields=None):
+        """Retrieve [timestamp, value] rows from the segment files.
+
+        At most ``limit`` rows are returned, all newer than the ``after``
+        timestamp when it is given. With ``fields``, a list of names or
+        '*', the rows of the ``namespace.field`` namespaces are merged into
+        ``[timestamp, {field: value}]`` rows.
+        """
+        with self._lock:
+            return list(self.iter_get(namespace, start, end, method, fill,
+                                      group, limit, after, fields))
+
+    def iter_get(self, namespace, start=None, end=None, method=None,
+                 fill=None, group=None, limit=None, after=None, fields=None):
+        """Return an iterator over the [timestamp, value] rows of a range.
+
+        The arguments are validated and the segment files flushed right
+        away, and the rows are then read lazily, one segment at a time, until
+        ``limit`` rows were read.
+        """
+        start = _normalize_timestamp(start) or ''
+        end = _normalize_timestamp(end) or now()
+        after = _normalize_timestamp(after)
+        if after is not None:
+            start = max(start, after)
+
+        if validate_timestamp(start, end) is False:
+            error = 'Error to get values due end value is smaller than start.'
+            raise ValueError(error)
+
+        if fields is None:
+            rows = self._iter_rows(namespace, start, end)
+        else:
+            rows = self._iter_fields(namespace, fields, start, end)
+        if after is not None:
+            rows = (row for row in rows if row[0] > after)
+        if limit is not None:
+            rows = islice(rows, int(limit))
+        return rows
@@ -0,0 +1,190 @@
+"""In-memory hot tier keeping the latest points of each namespace."""
+from array import array
+from collections import OrderedDict
+from threading import Lock
+
+from napps.kytos.kronos.backends.wrapper import BackendWrapper, split_fields
+from napps.kytos.kronos.utils import (nanoseconds_to_iso, now_nanoseconds,
+                                      to_nanoseconds)
+
+
+class RingBuffer:
+    """Fixed-size buffer of (time, value) points sorted by time.
+
+    Times are epoch nanoseconds kept in a compact array. Values are floats,
+    kept in a compact array too, or any other object when ``numeric`` is
+    False. Once the buffer is full, each new point replaces the oldest one.
+    """
+
+    def __init__(self, size, numeric=True):
+        """Allocate the arrays of the buffer."""
+        self._size = size
+        self._times = array('q', bytes(8 * size))
+        self._values = array('d', bytes(8 * size)) if numeric \
+            else [None] * size
+        self._first = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def oldest(self):
+        """Return the time of the oldest point, or None when empty."""
+        return self._times[self._first] if self._count else None
+
+    @property
+    def newest(self):
+        """Return the time of the newest point, or None when empty."""
+        return self._time(self._count - 1) if self._count else None
+
+    def append(self, time, value):
+        """Add a point newer than the others.
+
+        Return False, without adding it, if the point is older than the
+        newest one.
+        """
+        if self._count and time < self.newest:
+            return False
+
+        position = (self._first + self._count) % self._size
+        self._times[position] = time
+        self._values[position] = value
+        if self._count < self._size:
+            self._count += 1
+        else:
+            self._first = (self._first + 1) % self._size
+        return True
+
+    def discard_until(self, time):
+        """Remove the points not newer than time."""
+        discarded = self._bisect(time + 1)
+        self._first = (self._first + discarded) % self._size
+        self._count -= discarded
+
+    def between(self, start, end):
+        """Return the (time, value) points with start <= time <= end."""
+        points = []
+        for index in range(self._bisect(start), self._count):
+            position = (self._first + index) % self._size
+            time = self._times[position]
+            if time > end:
+                break
+            points.append((time, self._values[position]))
+        return points
+
+    def _time(self, index):
+        return self._times[(self._first + index) % self._size]
+
+    def _bisect(self, time):
+        """Return the index of the first point not older than time."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._time(middle) < time:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+class HotTierBackend(BackendWrapper):
+    """Serve recent raw points from memory, in front of another backend.
+
+    Every point saved through this class is also kept in a ring buffer of
+    its namespace. A ``get`` without aggregation whose range starts after
+    the oldest buffered point is answered from memory, because every newer
+    point of the namespace was saved through this class. Values are kept
+    as the ``VALUE_TYPE`` of the persistent backend, so that they do not
+    change between memory and disk. Other calls go to the persistent
+    backend.
+    """
+
+    def __init__(self, backend, settings):
+        """Wrap a backend with ring buffers configured in settings."""
+        super().__init__(backend)
+        config = settings.HOT_TIER
+        self._size = max(int(config.get('SIZE', 1024)), 1)
+        self._max_namespaces = max(int(config.get('MAX_NAMESPACES', 4096)),
+                                   1)
+        self._value_type = backend.VALUE_TYPE
+        self._buffers = OrderedDict()
+        self._lock = Lock()
+
+    def _record(self, namespace, data_to_save, timestamp, precision):
+        """Add a saved point to the ring buffers of its fields."""
+        try:
+            time = to_nanoseconds(timestamp, precision) \
+                if timestamp is not None else now_nanoseconds()
+        except ValueError:
+            time = None
+
+        with self._lock:
+            for key, value in split_fields(namespace, data_to_save).items():
+                try:
+                    value = self._value_type(value) \
+                        if value is not None else None
+                except (TypeError, ValueError):
+                    value = None
+
+                ring = self._buffers.get(key)
+                if ring is None:
+                    if time is None or value is None:
+                        continue
+                    ring = self._buffers[key] = RingBuffer(
+                        self._size, self._value_type is float)
+                    while len(self._buffers) > self._max_namespaces:
+                        self._buffers.popitem(last=False)
+                else:
+                    self._buffers.move_to_end(key)
+
+                # A point the buffer cannot hold in order would leave a gap.
+                if time is None or value is None or \
+                   not ring.append(time, value):
+                    del self._buffers[key]
+
+    def _forget(self, prefix, namespace, start, end):
+        """Drop the deleted points from the buffers of their series.
+
+        Deleting every point up to a time, as retention does, only drops
+        the oldest points. Other deletes drop the whole buffers.
+        """
+        with self._lock:
+            for key in list(self._buffers):
+                if key != namespace and not key.startswith(prefix):
+                    continue
+                ring = self._buffers[key]
+                if start is None and end is not None:
+                    ring.discard_until(end)
+                    if len(ring):
+                        continue
+                del self._buffers[key]
+
+    def _answer(self, namespace, params):
+        """Return the buffered points of a raw query, or None."""
+        if params['start'] is None or \
+           any(params[key] is not None
+               for key in ('method', 'fill', 'group', 'fields')):
+            return None
+        return self._get_points(namespace, params['start'], params['end'],
+                                params['limit'], params['after'])
+
+    def _get_points(self, namespace, start, end, limit=None, after=None):
+        """Return the buffered points, or None if they may be incomplete."""
+        try:
+            start = to_nanoseconds(start)
+            end = to_nanoseconds(end) if end is not None else now_nanoseconds()
+            first = max(start, to_nanoseconds(after) + 1) \
+                if after is not None else start
+        except ValueError:
+            return None
+
+        with self._lock:
+            ring = self._buffers.get(namespace)
+            if ring is None or start < ring.oldest or start > end:
+                return None
+            points = ring.between(first, end)
+
+        if limit is not None:
+            points = points[:int(limit)]
+        return [[nanoseconds_to_iso(time), value] for time, value in points]
@@ -1,29 +1,50 @@
 """InfluxDB backend."""
+import json
 import re
+from threading import Event, Lock, Thread
+from time import monotonic
 
 # pylint: disable=import-error,wrong-import-order
 from influxdb import InfluxDBClient, exceptions
 from kytos.core import log
 # pylint: disable=import-error,wrong-import-order
-from napps.kytos.kronos.utils import (BackendError, NamespaceError,
-                                      convert_to_iso, iso_format_validation,
-                                      now, validate_timestamp)
+from napps.kytos.kronos.backends.breaker import CircuitBreaker
+from napps.kytos.kronos.backends.spool import Spool
+from napps.kytos.kronos.utils import (BackendError, BackendUnavailableError,
+                                      InvalidQueryError, NamespaceError,
+                                      convert_to_iso, extract_field,
+                                      iso_format_validation, namespace_regex,
+                                      nanoseconds_to_iso, now_nanoseconds,
+                                      parse_duration, to_nanoseconds,
+                                      validate_namespace, validate_timestamp)
 
 
 def _query_assemble(clause, namespace, start, end, field=None,
-                    method=None, group=None, fill=None):
+                    method=None, group=None, fill=None, limit=None,
+                    after=None):
+
+    # A compiled regex selects every measurement it matches.
+    if isinstance(namespace, re.Pattern):
+        source = f'/{namespace.pattern}/'
+    else:
+        source = f'"{namespace}"'
 
     if clause.upper() == 'SELECT':
-        if field is None:
-            clause += f' * FROM "{namespace}"'
+        if isinstance(field, (list, tuple)):
+            columns = ', '.join(f'"{name}"' if method is None
+                                else f'{method}("{name}") AS "{name}"'
+                                for name in field)
+            clause += f' {columns} FROM {source}'
+        elif field is None:
+            clause += f' * FROM {source}'
         else:
             if method is None:
-                clause += f' {field} FROM "{namespace}"'
+                clause += f' {field} FROM {source}'
             else:
-                clause += f' {method}({field}) FROM "{namespace}"'
+                clause += f' {method}({field}) FROM {source}'
 
     elif clause.upper() == 'DELETE':
-        clause += f' FROM "{namespace}"'
+        clause += f' FROM {source}'
     else:
         error = f'Error. Invalid clause "{clause}".'
         log.error(error)
@@ -37,97 +58,331 @@ def _query_assemble(clause, namespace, start, end, field=None,
     elif start is None and end is not None:
         clause += f"{time_clause}<= '{str(end)}'"
 
+    if after is not None:
+        operator = '>'
+        if group is not None:
+            # The bucket of the cursor was already returned whole, so the
+            # next page starts at the following bucket.
+            step = parse_duration(group)
+            bucket = to_nanoseconds(after) // step + 1
+            after = nanoseconds_to_iso(bucket * step)
+            operator = '>='
+        if start is None and end is None:
+            clause += f"{time_clause}{operator} '{str(after)}'"
+        else:
+            clause += f" AND time {operator} '{str(after)}'"
+
     if group is not None:
         clause += f' GROUP BY time({group})'
     if fill is not None:
         clause += f' fill({fill})'
+    if limit is not None:
+        clause += f' LIMIT {int(limit)}'
     return clause
 
 
-def _validate_namespace(namespace):
-    if not isinstance(namespace, str) or not re.match(r'\S+', namespace):
-        error = 'Error. Namespace should be a string.'
-        raise TypeError(error)
-
-    if 'kytos.kronos' not in namespace:
-        error = (f'Error. Namespace \'{namespace}\' must have the format '
-                 '\'kytos.kronos.*\'')
-        raise NamespaceError(error)
-
-    return True
-
+def _get_times(start, end):
+    """Validate the range of a query, returning it in ISO-8601."""
+    if start is None and end is None:
+        error = 'Start and end value should not be \'None\'.'
+        raise ValueError(error)
+
+    if iso_format_validation(start) is False and start is not None:
+        start = convert_to_iso(start)
+    if iso_format_validation(end) is False and end is not None:
+        end = convert_to_iso(end)
+
+    if validate_timestamp(start, end) is False:
+        error = 'Error to get values due end value is smaller than start.'
+        raise ValueError(error)
+    return start, end
+
+
+def _unavailable(exc):
+    """Return whether an exception means that InfluxDB is unavailable.
+
+    Server errors and connection errors, which requests raises as OSError
+    subclasses, may go away, unlike errors in the request.
+    """
+    return isinstance(exc, (exceptions.InfluxDBServerError, OSError))
+
+
+def _many_fields(field):
+    """Return whether a query selects several fields of a measurement."""
+    return field == '*' or isinstance(field, (list, tuple))
+
+
+def _field_rows(columns, values, field, method=None):
+    """Return the [time, {field: value}] rows of a series.
+
+    InfluxDB names the columns of an aggregation of every field after the
+    method, like ``mean_bytes_in``, so the method is removed from them.
+    """
+    names = columns[1:]
+    if field == '*' and method is not None:
+        prefix = f'{method.lower()}_'
+        names = [name[len(prefix):] if name.startswith(prefix) else name
+                 for name in names]
+    return [[row[0], dict(zip(names, row[1:]))] for row in values]
+
+
+def _make_point(namespace, data_to_save, timestamp=None, precision='s'):
+    """Validate the data and return it as an InfluxDB point."""
+    try:
+        for key, stat in data_to_save.items():
+            data_to_save[key] = float(stat)
+    except ValueError:
+        error = (f"Could not convert {type(stat)} to float: '{stat}' "
+                 f"for key '{key}'.")
+        raise ValueError(error)
+
+    validate_namespace(namespace)
+
+    return {
+        'measurement': namespace,
+        'time': to_nanoseconds(timestamp, precision) if timestamp is not None
+        else now_nanoseconds(),
+        'fields': data_to_save
+    }
+
+
+class _NameCache:
+    """Set of InfluxDB object names refreshed after a time-to-live.
+
+    The ``fetch`` callable must return a list of dictionaries with a ``name``
+    key, like ``get_list_database`` and ``get_list_measurements`` do. The
+    flusher thread adds names while other threads look them up, so every
+    access holds a lock.
+    """
+
+    def __init__(self, fetch, ttl):
+        self._fetch = fetch
+        self._ttl = ttl
+        self._names = set()
+        self._expires_at = 0
+        self._lock = Lock()
+
+    def __contains__(self, name):
+        with self._lock:
+            self._refresh()
+            return name in self._names
+
+    def names(self):
+        """Return a copy of the cached names, fetching them if expired."""
+        with self._lock:
+            self._refresh()
+            return set(self._names)
+
+    def add(self, name):
+        """Register a name created by this backend."""
+        with self._lock:
+            self._names.add(name)
+
+    def invalidate(self):
+        """Force the names to be fetched again on the next lookup."""
+        with self._lock:
+            self._expires_at = 0
+
+    def _refresh(self):
+        """Fetch the names if expired. The caller holds the lock."""
+        if monotonic() < self._expires_at:
+            return
+        self._names = {item['name'] for item in self._fetch() or []}
+        self._expires_at = monotonic() + self._ttl
 
-def _extract_field(namespace):
-    field = namespace.split('.')[-1]
-    namespace = '.'.join(namespace.split('.')[:-1])
-    return namespace, field
 
+class InfluxBackend:
+    """This Backend is responsible to the connection with InfluxDB."""
 
-class InvalidQueryError(Exception):
-    """Exception thrown when the assembled query is not valid."""
+    # InfluxDB returns the empty buckets of a GROUP BY as nulls.
+    DEFAULT_FILL = 'null'
 
+    # Deletes remove every field of the measurement of a namespace.
+    DELETES_MEASUREMENTS = True
 
-class InfluxBackend:
-    """This Backend is responsible to the connection with InfluxDB."""
+    # Values are stored and read back as floats.
+    VALUE_TYPE = float
 
     def __init__(self, settings):
         """Read config from settings file and start a InfluxBackend client."""
         self._read_config(settings)
         self._start_client()
 
+        # The lambdas look the client methods up on every refresh, so the
+        # caches keep working if the client is replaced.
+        self._databases = _NameCache(
+            lambda: self._call(self._client.get_list_database),
+            self._metadata_ttl)
+        self._measurements = _NameCache(
+            lambda: self._call(self._client.get_list_measurements),
+            self._metadata_ttl)
+
+        self._buffer = []
+        self._buffer_lock = Lock()
+        self._flush_lock = Lock()
+        self._flush_event = Event()
+        self._stop_event = Event()
+        self._flusher = Thread(target=self._flush_loop, daemon=True,
+                               name='kronos-influx-flusher')
+        self._flusher.start()
+
+        self._spool = None
+        self._replayer = None
+        if self._spool_path:
+            self._spool = Spool(self._spool_path, self._spool_max_bytes)
+            self._replayer = Thread(target=self._replay_loop, daemon=True,
+                                    name='kronos-influx-replayer')
+            self._replayer.start()
+
     def save(self, namespace, data_to_save, timestamp=None):
         """Insert data on influxdb."""
-        try:
-            for key, stat in data_to_save.items():
-                data_to_save[key] = float(stat)
-        except ValueError:
-            error = (f"Could not convert {type(stat)} to float: '{stat}' "
-                     f"for key '{key}'.")
-            raise ValueError(error)
-
-        _validate_namespace(namespace)
-
-        timestamp = timestamp or now()
-
-        if isinstance(timestamp, (int, float)) or \
-           iso_format_validation(timestamp) is False:
-            timestamp = convert_to_iso(timestamp)
-
-        data = [{
-            'measurement': namespace,
-            'time': timestamp,
-            'fields': data_to_save
-        }]
-
-        return self._write_endpoints(data)
-
-    def get(self, namespace, start=None, end=None,
-            method=None, fill=None, group=None):
-        """Make a query to retrieve something in the database."""
-        if _validate_namespace(namespace):
-            namespace, field = _extract_field(namespace)
+        self._buffer_points([_make_point(namespace, data_to_save, timestamp)])
+
+    def save_many(self, records, precision='s'):
+        """Insert many (namespace, data, timestamp) records on influxdb.
+
+        Epoch timestamps are in the ``precision`` unit. Valid records are
+        buffered together and invalid ones are skipped. Return a list of
+        (position, exception) tuples for skipped records.
+        """
+        points = []
+        errors = []
+        for position, (namespace, data_to_save, timestamp) in \
+                enumerate(records):
+            try:
+                points.append(_make_point(namespace, data_to_save,
+                                          timestamp, precision))
+            except (NamespaceError, TypeError, ValueError) as exc:
+                errors.append((position, exc))
+
+        if points:
+            self._buffer_points(points)
+        return errors
+
+    def flush(self):
+        """Write every buffered point to InfluxDB in batches.
+
+        A batch rejected by InfluxDB is dropped, without stopping the next
+        ones. When InfluxDB is unavailable, the points left are appended to
+        the spool, if there is one, to be written again once it is back, or
+        put back in the buffer before the error is raised.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                data, self._buffer = self._buffer, []
+
+            for index in range(0, len(data), self._batch_size):
+                batch = data[index:index + self._batch_size]
+                try:
+                    self._write_endpoints(batch)
+                except BackendUnavailableError:
+                    if self._spool is None:
+                        self._requeue(data[index:])
+                        raise
+                    # Spool every remaining batch, instead of waiting for
+                    # each of them to fail too.
+                    self._spool.append(data[index:])
+                    return
+                except BackendError:
+                    # The error was already logged by _write_endpoints.
+                    continue
+                except Exception:
+                    # The batch would fail again, unlike the next ones.
+                    self._requeue(data[index + self._batch_size:])
+                    raise
+
+    def shutdown(self):
+        """Stop the background threads and write the points still buffered."""
+        self._stop_event.set()
+        self._flush_event.set()
+        self._flusher.join(self._flush_interval)
+        if self._replayer is not None:
+            self._replayer.join(self._flush_interval)
+        self.flush()
+        if self._spool is not None:
+            self._spool.close()
+
+    def stats(self):
+        """Return the counters of the circuit breaker and of the spool.
+
+        The spool counters are None without a spool.
+        """
+        return {'breaker': self._breaker.stats(),
+                'spool': self._spool.stats()
+                if self._spool is not None else None}
+
+    def get(self, namespace, start=None, end=None, method=None, fill=None,
+            group=None, limit=None, after=None, fields=None):
+        """Make a query to retrieve something in the database.
+
+        At most ``limit`` points are returned, all newer than the ``after``
+        timestamp when it is given. With ``fields``, a list of field names
+        or '*', the namespace is a measurement and each point is a
+        ``[time, {field: value}]`` row with every field.
+        """
+        namespace, field, start, end = self._get_range(namespace, start, end,
+                                                       fields)
+        points = self._get_points(namespace, start, end,
+                                  field, method, fill, group, limit, after)
+        return points
 
-        if not self._namespace_exists(namespace):
-            error = (f'Error to get values because namespace \'{namespace}\''
-                     'does not exist.')
+    def iter_get(self, namespace, start=None, end=None, method=None,
+                 fill=None, group=None, limit=None, after=None, fields=None):
+        """Return an iterator over the points of a query.
+
+        The arguments are validated right away, and the points are then read
+        from InfluxDB one chunk of CHUNK_SIZE points at a time.
+        """
+        namespace, field, start, end = self._get_range(namespace, start, end,
+                                                       fields)
+        return self._iter_points(namespace, start, end,
+                                 field, method, fill, group, limit, after)
+
+    def get_many(self, pattern, start=None, end=None, method=None,
+                 fill=None, group=None):
+        """Return the points of every namespace matching a pattern.
+
+        The measurements of the pattern are looked up in the cached list of
+        measurements, and read by a single query selecting them with a
+        regex. The result maps each matching namespace to its points.
+        """
+        validate_namespace(pattern)
+        measurement, field = extract_field(pattern)
+        regex = namespace_regex(measurement)
+        if not any(regex.match(name) for name in self._measurements.names()):
+            error = (f'Error to get values because no namespace matches '
+                     f'\'{pattern}\'.')
             raise NamespaceError(error)
+        start, end = _get_times(start, end)
 
-        if start is None and end is None:
-            error = 'Start and end value should not be \'None\'.'
-            raise ValueError(error)
-
-        if iso_format_validation(start) is False and start is not None:
-            start = convert_to_iso(start)
-        if iso_format_validation(end) is False and end is not None:
-            end = convert_to_iso(end)
-
-        if validate_timestamp(start, end) is False:
-            error = 'Error to get values due end value is smaller than start.'
-            raise ValueError(error)
+        selected = '*' if '*' in field else field
+        query = _query_assemble('SELECT', regex, start, end, selected,
+                                method, group, fill)
+        try:
+            results = self._call(self._client.query, query, chunked=True,
+                                 chunk_size=0).raw
+            series_list = results.get('series', [])
+        except (AttributeError, KeyError):
+            error = f'Error. Query {query} not valid'
+            raise InvalidQueryError(error)
 
-        points = self._get_points(namespace, start, end,
-                                  field, method, fill, group)
-        return points
+        points = {}
+        field_regex = namespace_regex(field)
+        # Chunked responses repeat a series in every chunk it spans.
+        for series in series_list:
+            if selected != '*':
+                points.setdefault(f'{series["name"]}.{field}',
+                                  []).extend(series['values'])
+                continue
+            for time, values in _field_rows(series['columns'],
+                                            series['values'], '*', method):
+                for name, value in values.items():
+                    # Raw rows have a null for the fields not written then.
+                    if field_regex.match(name) and \
+                       (value is not None or method is not None):
+                        points.setdefault(f'{series["name"]}.{name}',
+                                          []).append([time, value])
+        return dict(sorted(points.items()))
 
     def delete(self, namespace, start=None, end=None):
         """Delete data in influxdb. Start and end must be a timestamp."""
@@ -136,8 +391,8 @@ class InfluxBackend:
         if iso_format_validation(end) is False and end is not None:
             end = convert_to_iso(end)
 
-        if _validate_namespace(namespace):
-            namespace, _ = _extract_field(namespace)
+        if validate_namespace(namespace):
+            namespace, _ = extract_field(namespace)
 
         if not self._namespace_exists(namespace):
             error = (f'Error deleting because namespace \'{namespace}\' does'
@@ -148,7 +403,35 @@ class InfluxBackend:
             error = 'Error to get values due end value is smaller than start.'
             raise ValueError(error)
 
-        return self._delete_points(namespace, start, end)
+        # Holding the flush lock waits for the batches being written, so
+        # no deleted point is written after the delete.
+        with self._flush_lock:
+            self._discard_buffered(namespace, start, end)
+            return self._delete_points(namespace, start, end)
+
+    def namespaces(self):
+        """Return the namespace of every field of the database."""
+        results = self._call(self._client.query, 'SHOW FIELD KEYS').raw
+        return sorted(f'{series["name"]}.{field}'
+                      for series in results.get('series', [])
+                      for field, *_ in series['values'])
+
+    def _get_range(self, namespace, start, end, fields=None):
+        """Validate a query, returning its measurement, field and range.
+
+        With ``fields``, the namespace is already a measurement.
+        """
+        field = fields
+        if validate_namespace(namespace) and fields is None:
+            namespace, field = extract_field(namespace)
+
+        if not self._namespace_exists(namespace):
+            error = (f'Error to get values because namespace \'{namespace}\''
+                     'does not exist.')
+            raise NamespaceError(error)
+
+        start, end = _get_times(start, end)
+        return namespace, field, start, end
 
     def _read_config(self, settings):
 
@@ -157,7 +440,20 @@ class InfluxBackend:
                   'DBNAME': None,
                   'USER': None,
                   'PASS': None,
-                  'POOL_SIZE': 100}
+                  'POOL_SIZE': 100,
+                  'BATCH_SIZE': 5000,
+                  'FLUSH_INTERVAL': 1,
+                  'MAX_BUFFER_SIZE': 50000,
+                  'METADATA_TTL': 60,
+                  'CHUNK_SIZE': 10000,
+                  'SPOOL_PATH': 'data/influx.spool',
+                  'SPOOL_MAX_BYTES': 100 * 2**20,
+                  'SPOOL_REPLAY_RATE': 50000,
+                  'TIMEOUT': 5,
+                  'RETRIES': 2,
+                  'RETRY_BACKOFF': 0.1,
+                  'BREAKER_THRESHOLD': 5,
+                  'BREAKER_RESET': 30}
         config = settings.BACKENDS.get('INFLUXDB')
 
         for key in params:
@@ -172,69 +468,230 @@ class InfluxBackend:
         self._password = params['PASS']
         self._database = params['DBNAME']
         self._pool_size = params['POOL_SIZE']
+        self._batch_size = max(int(params['BATCH_SIZE']), 1)
+        self._flush_interval = float(params['FLUSH_INTERVAL'])
+        self._max_buffer_size = max(int(params['MAX_BUFFER_SIZE']),
+                                    self._batch_size)
+        self._metadata_ttl = float(params['METADATA_TTL'])
+        self._chunk_size = max(int(params['CHUNK_SIZE']), 1)
+        self._spool_path = params['SPOOL_PATH']
+        self._spool_max_bytes = int(params['SPOOL_MAX_BYTES'])
+        self._replay_rate = max(int(params['SPOOL_REPLAY_RATE']), 1)
+        self._timeout = float(params['TIMEOUT'])
+        self._retries = int(params['RETRIES'])
+        self._retry_backoff = float(params['RETRY_BACKOFF'])
+        self._breaker_threshold = int(params['BREAKER_THRESHOLD'])
+        self._breaker_reset = float(params['BREAKER_RESET'])
 
     def _start_client(self):
-        self._client = InfluxDBClient(host=self._host,
-                                      port=self._port,
-                                      username=self._username,
-                                      password=self._password,
-                                      database=self._database,
-                                      pool_size=self._pool_size)
+        self._client = self._create_client()
+        self._breaker = CircuitBreaker(_unavailable,
+                                       self._breaker_threshold,
+                                       self._breaker_reset, self._retries,
+                                       self._retry_backoff)
+
+    def _create_client(self):
+        """Return the client of the InfluxDB API."""
+        # The client makes a single attempt per call, retried by the
+        # circuit breaker only while InfluxDB seems available.
+        return InfluxDBClient(host=self._host,
+                              port=self._port,
+                              username=self._username,
+                              password=self._password,
+                              database=self._database,
+                              pool_size=self._pool_size,
+                              timeout=self._timeout,
+                              retries=1)
+
+    def _call(self, function, *args, **kwargs):
+        """Call a client method through the circuit breaker."""
+        return self._breaker.call(function, *args, **kwargs)
 
     def _create_database(self):
-        self._client.create_database(self._database)
+        self._call(self._client.create_database, self._database)
+        self._databases.add(self._database)
 
     def _write_endpoints(self, data, create_database=True):
-        if not self._get_database() and create_database:
-            self._create_database()
-
         try:
-            self._client.write_points(data)
+            if not self._get_database() and create_database:
+                self._create_database()
+            self._call(self._client.write_points, data, time_precision='n')
+        except BackendUnavailableError:
+            # The circuit breaker is open.
+            raise
         except exceptions.InfluxDBClientError as exc:
             error = f'Error inserting data to InfluxDB: {str(exc)}'
             log.error(error)
             raise BackendError(error)
+        except (exceptions.InfluxDBServerError, OSError) as exc:
+            error = f'Error. InfluxDB is unavailable: {str(exc)}'
+            log.error(error)
+            raise BackendUnavailableError(error)
+
+        for point in data:
+            self._measurements.add(point['measurement'])
+
+    def _buffer_points(self, points):
+        """Add points to the write buffer, waking the flusher if needed.
+
+        When the buffer grows beyond MAX_BUFFER_SIZE the caller flushes it
+        synchronously, so a slow server cannot make the buffer grow forever.
+        """
+        with self._buffer_lock:
+            self._buffer.extend(points)
+            size = len(self._buffer)
+
+        if size >= self._max_buffer_size:
+            self.flush()
+        elif size >= self._batch_size:
+            self._flush_event.set()
+
+    def _requeue(self, points):
+        """Put points back at the start of the write buffer.
+
+        The oldest points are dropped to keep at most MAX_BUFFER_SIZE.
+        """
+        with self._buffer_lock:
+            self._buffer[:0] = points
+            dropped = len(self._buffer) - self._max_buffer_size
+            if dropped > 0:
+                del self._buffer[:dropped]
+                log.error(f'Write buffer is full, dropping {dropped} points.')
+
+    def _discard_buffered(self, measurement, start, end):
+        """Remove the buffered points of a measurement inside a range."""
+        first = to_nanoseconds(start) if start is not None else 0
+        last = to_nanoseconds(end) if end is not None else float('inf')
+        with self._buffer_lock:
+            kept = []
+            for point in self._buffer:
+                if point['measurement'] != measurement or \
+                   not first <= point['time'] <= last:
+                    kept.append(point)
+            self._buffer = kept
+
+    def _flush_loop(self):
+        """Flush the buffer on every FLUSH_INTERVAL or when a batch is full.
+
+        Errors are logged without stopping the thread, so that the next
+        points are still written.
+        """
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self._flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except BackendError:
+                # The error was already logged by _write_endpoints.
+                continue
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error(f'Error flushing points to InfluxDB: {exc}')
+
+    def _replay_loop(self):
+        """Replay the spool on every FLUSH_INTERVAL until shutdown."""
+        while not self._stop_event.wait(self._flush_interval):
+            self._replay()
+
+    def _replay(self):
+        """Write the spooled points again, in batches of BATCH_SIZE.
+
+        Batches are spaced so that at most SPOOL_REPLAY_RATE points are
+        written per second. Replay stops while InfluxDB is unavailable,
+        and batches InfluxDB rejects are dropped, as they would be again.
+        """
+        while self._spool.pending() and not self._stop_event.is_set():
+            points, offset = self._spool.read(min(self._batch_size,
+                                                  self._replay_rate))
+            if points:
+                try:
+                    self._write_endpoints(points)
+                except BackendUnavailableError:
+                    return
+                except BackendError:
+                    # The error was already logged by _write_endpoints.
+                    pass
+            self._spool.commit(offset, len(points))
+            self._stop_event.wait(len(points) / self._replay_rate)
 
     def _get_database(self):
         """Verify if a database exists."""
-        all_dbs = self._client.get_list_database()
-        exist = list(filter(lambda x: x['name'] == self._database, all_dbs))
-        if not exist:
-            return False
-
-        return True
+        return self._database in self._databases
 
     def _delete_points(self, namespace, start, end):
 
         query = _query_assemble('DELETE', namespace, start, end)
 
-        self._client.query(query)
+        self._call(self._client.query, query)
+        self._measurements.invalidate()
 
-    def _get_points(self, name, start, end,
-                    field=None, method=None, fill=None, group=None):
+    def _get_points(self, name, start, end, field=None, method=None,
+                    fill=None, group=None, limit=None, after=None):
 
         query = _query_assemble('SELECT', name, start, end, field,
-                                method, group, fill)
+                                method, group, fill, limit, after)
         try:
-            results = self._client.query(query, chunked=True, chunk_size=0).raw
-            results = results['series'][0]['values']
-            return results
+            results = self._call(self._client.query, query, chunked=True,
+                                 chunk_size=0).raw
+            series = results['series'][0]
+            if _many_fields(field):
+                return _field_rows(series['columns'], series['values'], field,
+                                   method)
+            return series['values']
         except KeyError:
             error = (f'Error. Query {query} not valid')
             raise InvalidQueryError(error)
 
+    def _iter_points(self, name, start, end, field=None, method=None,
+                     fill=None, group=None, limit=None, after=None):
+        """Yield the points of a query, decoding one chunk at a time.
+
+        ``InfluxDBClient.query`` merges every chunk of a chunked response,
+        so the response is read here line by line instead.
+        """
+        query = _query_assemble('SELECT', name, start, end, field,
+                                method, group, fill, limit, after)
+        response = self._call(
+            self._client.request,
+            'query', params={'q': query, 'db': self._database,
+                             'chunked': 'true',
+                             'chunk_size': self._chunk_size},
+            stream=True)
+
+        found = False
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                for result in json.loads(line).get('results', []):
+                    if 'error' in result:
+                        error = f'Error. Query {query} not valid'
+                        raise InvalidQueryError(error)
+                    for series in result.get('series', []):
+                        found = True
+                        if _many_fields(field):
+                            yield from _field_rows(series['columns'],
+                                                   series['values'], field,
+                                                   method)
+                        else:
+                            yield from series['values']
+        finally:
+            response.close()
+
+        if not found:
+            error = f'Error. Query {query} not valid'
+            raise InvalidQueryError(error)
+
     def _namespace_exists(self, namespace):
 
         if namespace is None:
             log.error('Invalid namespace.')
             return False
 
-        all_nspace = self._client.get_list_measurements()
+        all_nspace = self._measurements.names()
         if not all_nspace:
             log.error('Error. There are no valid database.')
             return False
-        exist = list(filter(lambda x: x['name'] == namespace, all_nspace))
-        if not exist:
+        if namespace not in all_nspace:
             log.error('Required namespace does not exist.')
             return False
 
@@ -0,0 +1,315 @@
+"""InfluxDB backend sending requests to the HTTP API from an event loop."""
+import asyncio
+import json
+from threading import Thread
+
+# pylint: disable=import-error,wrong-import-order
+import aiohttp
+from influxdb import exceptions
+# pylint: disable=import-error,wrong-import-order
+from kytos.core import log
+from napps.kytos.kronos.backends.influx import InfluxBackend, _unavailable
+from napps.kytos.kronos.utils import BackendUnavailableError
+
+
+def _escape(text, characters):
+    """Escape the characters of text with backslashes."""
+    for character in characters:
+        text = text.replace(character, f'\\{character}')
+    return text
+
+
+def _field_value(value):
+    """Return a field value in line protocol."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return f'{value}i'
+    if isinstance(value, float):
+        return repr(value)
+    return '"' + _escape(str(value), '\\"') + '"'
+
+
+def _line_protocol(points):
+    """Return InfluxDB points, with times in nanoseconds, as line protocol."""
+    lines = []
+    for point in points:
+        fields = ','.join(f'{_escape(key, ", =")}={_field_value(value)}'
+                          for key, value in point['fields'].items())
+        lines.append(f'{_escape(point["measurement"], ", ")} {fields} '
+                     f'{point["time"]}')
+    return '\n'.join(lines).encode()
+
+
+class _Result:
+    """Result of a query, with the ``raw`` attribute of a ResultSet."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+
+class _StreamedResponse:
+    """Response whose lines are read from the event loop as needed."""
+
+    def __init__(self, client, response):
+        self._client = client
+        self._response = response
+
+    def iter_lines(self):
+        """Yield the lines of the response body."""
+        while True:
+            line = self._client.run(self._response.content.readline())
+            if not line:
+                return
+            yield line.rstrip(b'\r\n')
+
+    def close(self):
+        """Release the connection of the response to the pool."""
+        self._client.loop.call_soon_threadsafe(self._response.close)
+
+
+class AsyncInfluxClient:
+    """Client of the InfluxDB HTTP API running on an asyncio event loop.
+
+    Requests are coroutines run on an event loop of its own thread, sharing
+    a session whose keep-alive pool holds up to ``pool_size`` connections.
+    The methods of ``InfluxDBClient`` used by InfluxBackend can be called
+    from any thread, waiting for their requests. ``write_points`` sends
+    batches of ``batch_size`` points concurrently.
+    """
+
+    def __init__(self, host, port, username, password, database,
+                 pool_size=100, timeout=5, batch_size=5000):
+        """Start the event loop and open the session."""
+        self._url = f'http://{host}:{port}'
+        self._params = {'u': username, 'p': password} if username else {}
+        self._database = database
+        self._batch_size = max(int(batch_size), 1)
+        self.loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self.loop.run_forever, daemon=True,
+                              name='kronos-influx-loop')
+        self._thread.start()
+        self._session = self.run(self._open_session(pool_size, timeout))
+
+    def run(self, coroutine):
+        """Run a coroutine on the event loop and return its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        """Close the session and stop the event loop."""
+        self.run(self._session.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def write_points(self, points, time_precision='n'):
+        """Write points, sending their batches concurrently.
+
+        The error of the first failed batch is raised once every batch was
+        sent.
+        """
+        for _, error in self.write_each(points, time_precision):
+            if error is not None:
+                raise error
+
+    def write_each(self, points, time_precision='n'):
+        """Write points in concurrent batches, returning their outcomes.
+
+        Return a list of (batch, exception) tuples in order, where the
+        exception is None for the batches written.
+        """
+        return self.run(self.write_batches(points, time_precision))
+
+    def query(self, query, chunked=False, chunk_size=0):
+        """Run a query, returning the result of its single statement.
+
+        Responses are never chunked, so ``chunked`` and ``chunk_size`` are
+        only there to match ``InfluxDBClient.query``.
+        """
+        # pylint: disable=unused-argument
+        return _Result(self.run(self.execute(query)))
+
+    def request(self, url, params=None, stream=False):
+        """Send a GET request, returning its response to read line by line.
+
+        Only streamed requests, like InfluxBackend sends for chunked
+        queries, are supported.
+        """
+        # pylint: disable=unused-argument
+        return _StreamedResponse(self, self.run(self._open(url, params)))
+
+    def get_list_database(self):
+        """Return the databases as a list of dictionaries with a name."""
+        return self._names('SHOW DATABASES')
+
+    def get_list_measurements(self):
+        """Return the measurements as a list of dictionaries with a name."""
+        return self._names('SHOW MEASUREMENTS')
+
+    def create_database(self, database):
+        """Create a database."""
+        self.run(self.execute(f'CREATE DATABASE "{database}"'))
+
+    async def write(self, points, time_precision='n'):
+        """Write points with times in a precision of the write endpoint."""
+        params = {'db': self._database, 'precision': time_precision}
+        await self._send('POST', 'write', params, _line_protocol(points))
+
+    async def write_batches(self, points, time_precision='n'):
+        """Write points in batches of ``batch_size``, all at once.
+
+        Return the (batch, exception) tuples of ``write_each``.
+        """
+        batches = [points[index:index + self._batch_size]
+                   for index in range(0, len(points), self._batch_size)]
+        results = await asyncio.gather(
+            *(self.write(batch, time_precision) for batch in batches),
+            return_exceptions=True)
+        return [(batch, result if isinstance(result, Exception) else None)
+                for batch, result in zip(batches, results)]
+
+    async def execute(self, query):
+        """Run a query, returning the result of its single statement."""
+        # Queries changing data must be POST requests.
+        method = 'GET' if query.split(None, 1)[0].upper() in \
+            ('SELECT', 'SHOW') else 'POST'
+        body = await self._send(method, 'query',
+                                {'q': query, 'db': self._database})
+        result = json.loads(body)['results'][0]
+        if 'error' in result:
+            raise exceptions.InfluxDBClientError(result['error'])
+        return result
+
+    async def _open_session(self, pool_size, timeout):
+        """Return a session, created on the event loop it runs on."""
+        # Streamed responses may take long, so only the connection and
+        # each read time out.
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max(int(pool_size), 1)),
+            timeout=aiohttp.ClientTimeout(sock_connect=float(timeout),
+                                          sock_read=float(timeout)))
+
+    async def _send(self, method, path, params, data=None):
+        """Send a request and return its body."""
+        response = await self._open(path, params, method, data)
+        try:
+            async with response:
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise exceptions.InfluxDBServerError(str(exc))
+
+    async def _open(self, path, params, method='GET', data=None):
+        """Send a request and return its response, before reading it.
+
+        Error statuses raise the exceptions of ``InfluxDBClient``, and so
+        do connection errors and timeouts, as server errors, so that
+        InfluxBackend handles them alike.
+        """
+        try:
+            response = await self._session.request(
+                method, f'{self._url}/{path}',
+                params={**self._params, **params}, data=data)
+            if response.status < 400:
+                return response
+            async with response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise exceptions.InfluxDBServerError(str(exc))
+
+        if response.status >= 500:
+            raise exceptions.InfluxDBServerError(body)
+        raise exceptions.InfluxDBClientError(body, response.status)
+
+    def _names(self, query):
+        """Return the values of a SHOW query as dictionaries with a name."""
+        result = self.run(self.execute(query))
+        return [{'name': values[0]}
+                for series in result.get('series', [])
+                for values in series['values']]
+
+
+class AsyncInfluxBackend(InfluxBackend):
+    """InfluxDB backend driving the HTTP API from an asyncio event loop.
+
+    It validates, caches and queries like InfluxBackend, but its client
+    sends every request from one event loop thread, through an aiohttp
+    keep-alive connection pool. Flushes write all their batches at once,
+    and queries from many threads are in flight on that single thread.
+    """
+
+    def flush(self):
+        """Write every buffered point to InfluxDB, batches concurrently.
+
+        Batches rejected by InfluxDB are dropped, and the others are still
+        written. Only the batches that failed because InfluxDB is
+        unavailable are appended to the spool, if there is one, to be
+        written again once it is back, or put back in the buffer before
+        the error is raised.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                data, self._buffer = self._buffer, []
+            if not data:
+                return
+
+            pending = self._write_batches(data)
+            if not pending:
+                return
+            if self._spool is None:
+                self._requeue(pending)
+                error = 'Error. InfluxDB is unavailable.'
+                raise BackendUnavailableError(error)
+            self._spool.append(pending)
+
+    def shutdown(self):
+        """Write the points still buffered and stop the event loop."""
+        super().shutdown()
+        self._client.close()
+
+    def _write_batches(self, points):
+        """Write points in concurrent batches, returning the points left.
+
+        Batches rejected by InfluxDB are logged and dropped. Retries of the
+        circuit breaker only send again the batches that failed because
+        InfluxDB is unavailable, and their points are returned if they
+        still fail.
+        """
+        pending = points
+
+        def write():
+            nonlocal pending
+            results = self._client.write_each(pending, time_precision='n')
+            pending = []
+            errors = []
+            for batch, exc in results:
+                if exc is None:
+                    for point in batch:
+                        self._measurements.add(point['measurement'])
+                elif _unavailable(exc):
+                    pending.extend(batch)
+                    errors.append(exc)
+                else:
+                    log.error(f'Error inserting data to InfluxDB: {exc}')
+            if errors:
+                raise errors[0]
+
+        try:
+            if not self._get_database():
+                self._create_database()
+            self._call(write)
+        except BackendUnavailableError:
+            # The circuit breaker is open.
+            pass
+        except exceptions.InfluxDBClientError as exc:
+            log.error(f'Error inserting data to InfluxDB: {exc}')
+            return []
+        except (exceptions.InfluxDBServerError, OSError) as exc:
+            log.error(f'Error. InfluxDB is unavailable: {exc}')
+        return pending
+
+    def _create_client(self):
+        """Return the client of the InfluxDB HTTP API."""
+        return AsyncInfluxClient(self._host, self._port, self._username,
+                                 self._password, self._database,
+                                 self._pool_size, self._timeout,
+                                 self._batch_size)
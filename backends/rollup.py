@@ -0,0 +1,243 @@
+"""Rollup tiers keeping pre-aggregated buckets of each namespace."""
+from array import array
+from collections import OrderedDict
+from threading import Lock
+
+from napps.kytos.kronos.backends.wrapper import BackendWrapper, split_fields
+from napps.kytos.kronos.utils import (fill_buckets, nanoseconds_to_iso,
+                                      now_nanoseconds, parse_duration,
+                                      to_nanoseconds)
+
+METHODS = ('mean', 'sum', 'count', 'min', 'max')
+
+
+class RollupTier:
+    """Count, sum, min and max of the points in fixed time buckets.
+
+    The last ``size`` buckets are kept in a ring of arrays, indexed by the
+    bucket number modulo ``size``, with the times of their first and last
+    points. The bucket of the first point recorded may miss older points
+    saved before the tier existed, so buckets are only complete from the
+    next one on.
+    """
+
+    def __init__(self, step, size):
+        """Allocate the arrays of the tier."""
+        self.step = step
+        self._size = size
+        self._buckets = array('q', [-1]) * size
+        self._counts = array('q', bytes(8 * size))
+        self._sums = array('d', bytes(8 * size))
+        self._mins = array('d', bytes(8 * size))
+        self._maxs = array('d', bytes(8 * size))
+        self._firsts = array('q', bytes(8 * size))
+        self._lasts = array('q', bytes(8 * size))
+        self._since = None
+        self._newest = None
+
+    @property
+    def complete_since(self):
+        """Return the number of the first complete bucket, or None."""
+        if self._since is None:
+            return None
+        return max(self._since, self._newest - self._size + 1)
+
+    def add(self, time, value):
+        """Add a point to the aggregates of its bucket."""
+        bucket = time // self.step
+        if self._since is None:
+            self._since = self._newest = bucket + 1
+        if bucket < self.complete_since:
+            return
+
+        position = bucket % self._size
+        if self._buckets[position] != bucket:
+            self._buckets[position] = bucket
+            self._counts[position] = 0
+            self._sums[position] = 0.0
+            self._mins[position] = value
+            self._maxs[position] = value
+            self._firsts[position] = time
+            self._lasts[position] = time
+
+        self._counts[position] += 1
+        self._sums[position] += value
+        self._mins[position] = min(self._mins[position], value)
+        self._maxs[position] = max(self._maxs[position], value)
+        self._firsts[position] = min(self._firsts[position], time)
+        self._lasts[position] = max(self._lasts[position], time)
+        self._newest = max(self._newest, bucket)
+
+    def expire(self, time):
+        """Leave out the buckets with points not newer than time."""
+        if self._since is not None:
+            self._since = max(self._since, time // self.step + 1)
+
+    def splits(self, start, end):
+        """Return whether the edge buckets of a range hold points outside."""
+        first = self._position(start)
+        last = self._position(end)
+        return (first is not None and self._firsts[first] < start) or \
+            (last is not None and self._lasts[last] > end)
+
+    def aggregates(self, first, last):
+        """Yield (bucket time, count, sum, min, max) of buckets with data."""
+        for bucket in range(max(first, self.complete_since),
+                            min(last, self._newest) + 1):
+            position = bucket % self._size
+            if self._buckets[position] == bucket:
+                yield (bucket * self.step, self._counts[position],
+                       self._sums[position], self._mins[position],
+                       self._maxs[position])
+
+    def _position(self, time):
+        """Return the position of the bucket of a time, or None if empty."""
+        bucket = time // self.step
+        position = bucket % self._size
+        return position if self._buckets[position] == bucket else None
+
+
+def _merge(groups, group, count, total, low, high):
+    """Merge the aggregates of a tier bucket into its group."""
+    current = groups.get(group)
+    if current is None:
+        groups[group] = [count, total, low, high]
+    else:
+        current[0] += count
+        current[1] += total
+        current[2] = min(current[2], low)
+        current[3] = max(current[3], high)
+
+
+def _value(method, count, total, low, high):
+    """Return the result of an aggregation method."""
+    return {'mean': total / count, 'sum': total, 'count': count,
+            'min': low, 'max': high}[method]
+
+
+class RollupBackend(BackendWrapper):
+    """Answer grouped aggregations from rollup tiers kept in memory.
+
+    Every point saved through this class is added to the tiers of its
+    namespace, for example 1m, 10m and 1h buckets. A ``get`` with a
+    ``mean``, ``sum``, ``count``, ``min`` or ``max`` method and a ``group``
+    interval is answered from the coarsest tier whose buckets fit in the
+    group interval and cover the range, with the ``DEFAULT_FILL`` of the
+    backend when no fill is given. Other calls go to the backend.
+    """
+
+    def __init__(self, backend, settings):
+        """Wrap a backend with the rollup tiers configured in settings."""
+        super().__init__(backend)
+        config = settings.ROLLUP
+        tiers = config.get('TIERS', {'1m': 1440, '10m': 1008, '1h': 720})
+        self._tiers = sorted((parse_duration(interval), max(int(size), 1))
+                             for interval, size in tiers.items())
+        self._max_namespaces = max(int(config.get('MAX_NAMESPACES', 256)), 1)
+        self._series = OrderedDict()
+        self._lock = Lock()
+
+    def _record(self, namespace, data_to_save, timestamp, precision):
+        """Add a saved point to the tiers of its fields."""
+        try:
+            time = to_nanoseconds(timestamp, precision) \
+                if timestamp is not None else now_nanoseconds()
+        except ValueError:
+            time = None
+
+        with self._lock:
+            for key, value in split_fields(namespace, data_to_save).items():
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    value = None
+
+                if time is None or value is None:
+                    # The tiers would miss a point kept by the backend.
+                    self._series.pop(key, None)
+                    continue
+
+                tiers = self._series.get(key)
+                if tiers is None:
+                    tiers = self._series[key] = [RollupTier(step, size)
+                                                 for step, size in self._tiers]
+                    while len(self._series) > self._max_namespaces:
+                        self._series.popitem(last=False)
+                else:
+                    self._series.move_to_end(key)
+
+                for tier in tiers:
+                    tier.add(time, value)
+
+    def _forget(self, prefix, namespace, start, end):
+        """Drop the deleted buckets from the tiers of their series.
+
+        Deleting every point up to a time, as retention does, only expires
+        the oldest buckets. Other deletes drop the whole tiers.
+        """
+        with self._lock:
+            for key in list(self._series):
+                if key != namespace and not key.startswith(prefix):
+                    continue
+                if start is None and end is not None:
+                    for tier in self._series[key]:
+                        tier.expire(end)
+                else:
+                    del self._series[key]
+
+    def _answer(self, namespace, params):
+        """Return the points of a grouped aggregation, or None."""
+        method = params['method']
+        if params['start'] is None or params['group'] is None or \
+           method is None or method.lower() not in METHODS or \
+           any(params[key] is not None
+               for key in ('limit', 'after', 'fields')):
+            return None
+
+        try:
+            step = parse_duration(params['group'])
+            start = to_nanoseconds(params['start'])
+            end = to_nanoseconds(params['end']) \
+                if params['end'] is not None else now_nanoseconds()
+        except ValueError:
+            return None
+        if start > end:
+            return None
+
+        with self._lock:
+            rows = self._aggregate(namespace, method.lower(), start, end,
+                                   step)
+        if rows is None:
+            return None
+
+        fill = params['fill']
+        if fill is None:
+            fill = self._backend.DEFAULT_FILL
+        try:
+            rows = fill_buckets(rows, fill, start, end, step)
+        except ValueError:
+            # Let the backend handle fills like 'linear'.
+            return None
+        return [[nanoseconds_to_iso(time), value] for time, value in rows]
+
+    def _aggregate(self, namespace, method, start, end, step):
+        """Return the (group time, value) rows from the coarsest tier."""
+        tiers = self._series.get(namespace)
+        if tiers is None:
+            return None
+
+        for tier in reversed(tiers):
+            complete = tier.complete_since
+            # Tier buckets must not cross the edges of the groups or of the
+            # range, and every bucket in the range must be complete.
+            if step % tier.step or complete is None or \
+               start // tier.step < complete or tier.splits(start, end):
+                continue
+
+            groups = {}
+            for time, *aggregates in tier.aggregates(start // tier.step,
+                                                     end // tier.step):
+                _merge(groups, time - time % step, *aggregates)
+            return [(group, _value(method, *groups[group]))
+                    for group in sorted(groups)]
+        return None
@@ -0,0 +1,125 @@
+"""Append-only spool of the points a backend could not write."""
+import json
+import os
+from pathlib import Path
+from threading import Lock
+
+from kytos.core import log
+
+
+class Spool:
+    """Points waiting to be written again, kept in a local file.
+
+    Points are appended to the file as JSON lines and read back in order
+    from a read offset, saved next to the file after each batch, so they
+    survive restarts. The file is truncated once every point was read.
+    Points that would make the file larger than ``max_bytes`` are dropped.
+    The file is only created when the first points are spooled.
+    """
+
+    def __init__(self, path, max_bytes):
+        """Keep the spool in the file at path."""
+        self._path = Path(path)
+        self._offset_path = self._path.with_name(f'{self._path.name}.offset')
+        self._max_bytes = max(int(max_bytes), 0)
+        self._file = None
+        self._offset = 0
+        self._lock = Lock()
+        self._spooled = 0
+        self._replayed = 0
+        self._dropped = 0
+
+    def pending(self):
+        """Return the number of bytes of points not read yet."""
+        with self._lock:
+            if not self._open(create=False):
+                return 0
+            return self._file.seek(0, os.SEEK_END) - self._offset
+
+    def append(self, points):
+        """Add points to the end of the spool.
+
+        Return False, dropping the points, if the spool is full.
+        """
+        lines = (json.dumps(point, separators=(',', ':')) + '\n'
+                 for point in points)
+        data = ''.join(lines).encode()
+        with self._lock:
+            self._open(create=True)
+            size = self._file.seek(0, os.SEEK_END)
+            if size + len(data) > self._max_bytes:
+                self._dropped += len(points)
+                log.error(f'Spool {self._path} is full, dropping '
+                          f'{len(points)} points.')
+                return False
+
+            self._file.write(data)
+            self._file.flush()
+            self._spooled += len(points)
+            return True
+
+    def read(self, count):
+        """Return at most count points and the offset after them.
+
+        The points are read again until the offset is committed.
+        """
+        points = []
+        with self._lock:
+            if not self._open(create=False):
+                return points, 0
+
+            offset = self._file.seek(self._offset)
+            while len(points) < count:
+                line = self._file.readline()
+                # A line without end is still being written, or was cut
+                # short by a crash.
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                try:
+                    points.append(json.loads(line))
+                except ValueError:
+                    log.error(f'Skipping an invalid point in {self._path}.')
+            return points, offset
+
+    def commit(self, offset, count):
+        """Mark the points up to offset as written, count of them."""
+        with self._lock:
+            self._replayed += count
+            if offset >= self._file.seek(0, os.SEEK_END):
+                self._file.truncate(0)
+                offset = 0
+            self._offset = offset
+            self._offset_path.write_text(str(offset))
+
+    def close(self):
+        """Close the spool file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self):
+        """Return the spooled, replayed and dropped point counters."""
+        return {'spooled': self._spooled,
+                'replayed': self._replayed,
+                'dropped': self._dropped}
+
+    def _open(self, create):
+        """Open the spool file, if it exists or create is True.
+
+        Return whether the file is open.
+        """
+        if self._file is not None:
+            return True
+        if not create and not self._path.exists():
+            return False
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._path, 'a+b')
+        try:
+            self._offset = int(self._offset_path.read_text())
+        except (OSError, ValueError):
+            self._offset = 0
+        self._offset = min(self._offset, self._file.seek(0, os.SEEK_END))
+        return True
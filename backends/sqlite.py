@@ -0,0 +1,429 @@
+"""SQLite backend, storing data in a local database file."""
+import sqlite3
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from threading import RLock, local
+from time import monotonic
+
+from napps.kytos.kronos.utils import (NamespaceError, extract_field,
+                                      fill_buckets, namespace_regex,
+                                      nanoseconds_to_iso, now_nanoseconds,
+                                      parse_duration, to_nanoseconds,
+                                      validate_namespace)
+
+# The primary key keeps the rows of a table clustered by namespace, field and
+# time, so range queries read contiguous pages.
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS points (
+    namespace TEXT NOT NULL,
+    field TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (namespace, field, time)
+) WITHOUT ROWID
+'''
+
+METHODS = {'mean': 'AVG', 'sum': 'SUM', 'count': 'COUNT', 'min': 'MIN',
+           'max': 'MAX'}
+
+
+def _sql_function(method):
+    """Return the SQL aggregate function of a method, or None."""
+    if method is None:
+        return None
+    if method.lower() not in METHODS:
+        error = (f'Error. Method \'{method}\' must be one of '
+                 f'{", ".join(METHODS)}.')
+        raise ValueError(error)
+    return METHODS[method.lower()]
+
+
+def _get_times(start, end):
+    """Validate the range of a query, returning it in epoch nanoseconds."""
+    if start is None and end is None:
+        error = 'Start and end value should not be \'None\'.'
+        raise ValueError(error)
+
+    start = to_nanoseconds(start) if start is not None else 0
+    end = to_nanoseconds(end) if end is not None else now_nanoseconds()
+
+    if start > end:
+        error = 'Error to get values due end value is smaller than start.'
+        raise ValueError(error)
+    return start, end
+
+
+def _fill_columns(rows, fill, start, end, step, width):
+    """Fill the (bucket, value, ...) rows of many fields, field by field."""
+    if fill is None or fill == 'none':
+        return rows
+    filled = [fill_buckets([(row[0], row[index]) for row in rows
+                            if row[index] is not None], fill, start, end, step)
+              for index in range(1, width + 1)]
+    return [(points[0][0], *(value for _, value in points))
+            for points in zip(*filled)]
+
+
+class SQLiteBackend:
+    """This Backend stores data in a SQLite database in WAL mode."""
+
+    # Grouped queries only return the buckets with data by default.
+    DEFAULT_FILL = None
+
+    # Deletes remove every field of the measurement of a namespace.
+    DELETES_MEASUREMENTS = True
+
+    # Values are stored and read back as floats.
+    VALUE_TYPE = float
+
+    def __init__(self, settings):
+        """Read config from settings file and open the database."""
+        self._read_config(settings)
+
+        self._lock = RLock()
+        self._local = local()
+        self._readers = []
+        self._pending = []
+        self._flushed_at = monotonic()
+
+        self._writer = self._connect()
+        with self._writer:
+            self._writer.execute(SCHEMA)
+
+    def _read_config(self, settings):
+        params = {'PATH': 'data/kronos.db',
+                  'BATCH_SIZE': 1000,
+                  'FLUSH_INTERVAL': 1}
+        config = settings.BACKENDS.get('SQLITE')
+        for key in params:
+            params[key] = config.get(key, params[key])
+
+        self._path = str(params['PATH'])
+        self._batch_size = max(int(params['BATCH_SIZE']), 1)
+        self._flush_interval = float(params['FLUSH_INTERVAL'])
+
+        if self._path != ':memory:':
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self):
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _reader(self):
+        """Return the connection used for queries by the current thread.
+
+        With WAL journaling, each thread reads from its own connection
+        without blocking the writer.
+        """
+        if self._path == ':memory:':
+            return self._writer
+        if not hasattr(self._local, 'connection'):
+            self._local.connection = self._connect()
+            with self._lock:
+                self._readers.append(self._local.connection)
+        return self._local.connection
+
+    def save(self, namespace, data_to_save, timestamp=None):
+        """Insert data on the database."""
+        self._buffer_rows(self._make_rows(namespace, data_to_save, timestamp))
+
+    def save_many(self, records, precision='s'):
+        """Insert many (namespace, data, timestamp) records.
+
+        Epoch timestamps are in the ``precision`` unit. Valid records are
+        written in the same transaction and invalid ones are skipped. Return
+        a list of (position, exception) tuples for skipped records.
+        """
+        rows = []
+        errors = []
+        for position, (namespace, data_to_save, timestamp) in \
+                enumerate(records):
+            try:
+                rows.extend(self._make_rows(namespace, data_to_save,
+                                            timestamp, precision))
+            except (NamespaceError, TypeError, ValueError) as exc:
+                errors.append((position, exc))
+
+        if rows:
+            self._buffer_rows(rows)
+        return errors
+
+    def flush(self):
+        """Write every pending row in a single transaction."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._flushed_at = monotonic()
+            if rows:
+                with self._writer:
+                    self._writer.executemany(
+                        'INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?)',
+                        rows)
+
+    def shutdown(self):
+        """Write the pending rows and close every connection."""
+        self.flush()
+        with self._lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers = []
+            self._writer.close()
+
+    def get(self, namespace, start=None, end=None, method=None, fill=None,
+            group=None, limit=None, after=None, fields=None):
+        """Make a query to retrieve something in the database.
+
+        At most ``limit`` points are returned, all newer than the ``after``
+        timestamp when it is given. With ``fields``, a list of field names
+        or '*', the namespace is a measurement and each point is a
+        ``[time, {field: value}]`` row with every field.
+        """
+        return list(self.iter_get(namespace, start, end, method, fill, group,
+                                  limit, after, fields))
+
+    def iter_get(self, namespace, start=None, end=None, method=None,
+                 fill=None, group=None, limit=None, after=None, fields=None):
+        """Return an iterator over the points of a query.
+
+        The arguments are validated right away, and raw points are then
+        fetched lazily from the database cursor.
+        """
+        field = fields
+        if validate_namespace(namespace) and fields is None:
+            namespace, field = extract_field(namespace)
+
+        start, end = _get_times(start, end)
+        after = to_nanoseconds(after) if after is not None else None
+
+        self.flush()
+        if not self._namespace_exists(namespace):
+            error = (f'Error to get values because namespace \'{namespace}\''
+                     'does not exist.')
+            raise NamespaceError(error)
+
+        if field == '*':
+            field = self._fields(namespace)
+        rows = self._get_points(namespace, field, start, end,
+                                method, fill, group, limit, after)
+        if isinstance(field, (list, tuple)):
+            return ([nanoseconds_to_iso(time), dict(zip(field, values))]
+                    for time, *values in rows)
+        return ([nanoseconds_to_iso(time), value] for time, value in rows)
+
+    def get_many(self, pattern, start=None, end=None, method=None,
+                 fill=None, group=None):
+        """Return the points of every namespace matching a pattern.
+
+        The stored namespaces are matched against the pattern, and every
+        matching series is read by a single query. The result maps each
+        matching namespace to its points.
+        """
+        validate_namespace(pattern)
+        measurement, field = extract_field(pattern)
+        start, end = _get_times(start, end)
+        function = _sql_function(method)
+        if group is not None and function is None:
+            error = 'Error. Group requires an aggregation method.'
+            raise ValueError(error)
+
+        self.flush()
+        regex = namespace_regex(measurement)
+        cursor = self._reader().execute(
+            'SELECT DISTINCT namespace FROM points ORDER BY namespace')
+        names = [name for name, in cursor if regex.match(name)]
+        if not names:
+            error = (f'Error to get values because no namespace matches '
+                     f'\'{pattern}\'.')
+            raise NamespaceError(error)
+
+        marks = ', '.join('?' * len(names))
+        where = f'WHERE namespace IN ({marks}) AND time BETWEEN ? AND ?'
+        params = [*names, start, end]
+        if '*' not in field:
+            where += ' AND field = ?'
+            params.append(field)
+
+        step = None
+        if group is not None:
+            step = parse_duration(group)
+            query = (f'SELECT namespace, field, (time / ?) * ? AS bucket, '
+                     f'{function}(value) FROM points {where} '
+                     'GROUP BY namespace, field, bucket '
+                     'ORDER BY namespace, field, bucket')
+            params = [step, step] + params
+        elif function is not None:
+            # The whole range of each series is a single point, at its start.
+            query = (f'SELECT namespace, field, ?, {function}(value) '
+                     f'FROM points {where} GROUP BY namespace, field '
+                     'ORDER BY namespace, field')
+            params.insert(0, start)
+        else:
+            query = ('SELECT namespace, field, time, value FROM points '
+                     f'{where} ORDER BY namespace, field, time')
+
+        points = {}
+        field_regex = namespace_regex(field)
+        rows = self._reader().execute(query, params)
+        for (name, key), series in groupby(rows, key=itemgetter(0, 1)):
+            if not field_regex.match(key):
+                continue
+            series = [(time, value) for _, _, time, value in series]
+            if step is not None:
+                series = fill_buckets(series, fill, start, end, step)
+            points[f'{name}.{key}'] = [[nanoseconds_to_iso(time), value]
+                                       for time, value in series]
+        return points
+
+    def delete(self, namespace, start=None, end=None):
+        """Delete data of a namespace inside a time range.
+
+        Return the number of deleted points.
+        """
+        if validate_namespace(namespace):
+            namespace, _ = extract_field(namespace)
+
+        start = to_nanoseconds(start) if start is not None else None
+        end = to_nanoseconds(end) if end is not None else None
+
+        if start is not None and end is not None and start > end:
+            error = 'Error to get values due end value is smaller than start.'
+            raise ValueError(error)
+
+        self.flush()
+        if not self._namespace_exists(namespace):
+            error = (f'Error deleting because namespace \'{namespace}\' does'
+                     'not exist.')
+            raise NamespaceError(error)
+
+        query = 'DELETE FROM points WHERE namespace = ?'
+        params = [namespace]
+        if start is not None:
+            query += ' AND time >= ?'
+            params.append(start)
+        if end is not None:
+            query += ' AND time <= ?'
+            params.append(end)
+
+        with self._lock, self._writer:
+            return self._writer.execute(query, params).rowcount
+
+    def namespaces(self):
+        """Return the namespace of every field stored in the database."""
+        self.flush()
+        cursor = self._reader().execute(
+            'SELECT DISTINCT namespace, field FROM points '
+            'ORDER BY namespace, field')
+        return [f'{namespace}.{field}' for namespace, field in cursor]
+
+    @staticmethod
+    def _make_rows(namespace, data_to_save, timestamp, precision='s'):
+        """Validate the data and return one row per field."""
+        try:
+            for key, stat in data_to_save.items():
+                data_to_save[key] = float(stat)
+        except ValueError:
+            error = (f"Could not convert {type(stat)} to float: '{stat}' "
+                     f"for key '{key}'.")
+            raise ValueError(error)
+
+        validate_namespace(namespace)
+        time = to_nanoseconds(timestamp, precision) \
+            if timestamp is not None else now_nanoseconds()
+
+        return [(namespace, key, time, value)
+                for key, value in data_to_save.items()]
+
+    def _buffer_rows(self, rows):
+        """Add rows to the next transaction, committing it when due."""
+        with self._lock:
+            self._pending.extend(rows)
+            due = len(self._pending) >= self._batch_size or \
+                monotonic() - self._flushed_at >= self._flush_interval
+        if due:
+            self.flush()
+
+    def _namespace_exists(self, namespace):
+        cursor = self._reader().execute(
+            'SELECT 1 FROM points WHERE namespace = ? LIMIT 1', (namespace,))
+        return cursor.fetchone() is not None
+
+    def _fields(self, namespace):
+        """Return the fields stored in a namespace."""
+        cursor = self._reader().execute(
+            'SELECT DISTINCT field FROM points WHERE namespace = ? '
+            'ORDER BY field', (namespace,))
+        return [field for field, in cursor]
+
+    def _get_points(self, namespace, field, start, end, method=None,
+                    fill=None, group=None, limit=None, after=None):
+        """Return an iterable of (time, value) rows, aggregated by SQL.
+
+        When ``field`` is a list of fields, the rows have one value per
+        field, pivoted by SQL. Only rows, or group buckets, newer than
+        ``after`` are returned, up to ``limit`` of them.
+        """
+        limit = int(limit) if limit is not None else -1
+        if isinstance(field, (list, tuple)):
+            marks = ', '.join('?' * len(field))
+            where = (f'WHERE namespace = ? AND field IN ({marks}) '
+                     'AND time BETWEEN ? AND ?')
+            params = [namespace, *field, start, end]
+            value = '{0}(CASE WHEN field = ? THEN value END)'
+            values = ', '.join([value] * len(field))
+            columns = list(field)
+        else:
+            where = ('WHERE namespace = ? AND field = ? '
+                     'AND time BETWEEN ? AND ?')
+            params = [namespace, field, start, end]
+            values = '{0}(value)'
+            columns = []
+
+        function = _sql_function(method)
+
+        if group is None:
+            if method is None:
+                if after is not None:
+                    where += ' AND time > ?'
+                    params.append(after)
+                if columns:
+                    query = (f'SELECT time, {values.format("MAX")} '
+                             f'FROM points {where} '
+                             'GROUP BY time ORDER BY time LIMIT ?')
+                    params = columns + params
+                else:
+                    query = (f'SELECT time, value FROM points {where} '
+                             'ORDER BY time LIMIT ?')
+                params.append(limit)
+            else:
+                # The whole range is a single point, at its start.
+                if after is not None and after >= start:
+                    return []
+                query = (f'SELECT ?, {values.format(function)} '
+                         f'FROM points {where}')
+                params = [start] + columns + params
+                # Without rows in the range, the aggregates are NULL.
+                return [row for row in self._reader().execute(query, params)
+                        if any(value is not None for value in row[1:])]
+            return self._reader().execute(query, params)
+
+        if method is None:
+            error = 'Error. Group requires an aggregation method.'
+            raise ValueError(error)
+
+        step = parse_duration(group)
+        if after is not None:
+            start = max(start, (after // step + 1) * step)
+            if start > end:
+                return []
+            params[-2] = start
+        query = (f'SELECT (time / ?) * ? AS bucket, {values.format(function)} '
+                 f'FROM points {where} GROUP BY bucket ORDER BY bucket')
+        rows = list(self._reader().execute(query,
+                                           [step, step] + columns + params))
+        if columns:
+            rows = _fill_columns(rows, fill, start, end, step, len(columns))
+        else:
+            rows = fill_buckets(rows, fill, start, end, step)
+        return rows if limit < 0 else rows[:limit]
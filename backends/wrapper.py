@@ -0,0 +1,114 @@
+"""Base class of the in-memory tiers kept in front of a backend."""
+from abc import ABC, abstractmethod
+
+from napps.kytos.kronos.utils import (PRECISIONS, now_nanoseconds,
+                                      to_nanoseconds)
+
+QUERY_PARAMS = ('start', 'end', 'method', 'fill', 'group', 'limit', 'after',
+                'fields')
+
+
+def split_fields(namespace, data_to_save):
+    """Return the value saved in each series, by series namespace.
+
+    Dictionary data saves one series per field, named ``namespace.field``.
+    """
+    if isinstance(data_to_save, dict):
+        return {f'{namespace}.{field}': value
+                for field, value in data_to_save.items()}
+    return {namespace: data_to_save}
+
+
+class BackendWrapper(ABC):
+    """Forward calls to a backend, recording what is saved in it.
+
+    Subclasses implement ``_record``, called with every point saved and
+    the precision of its epoch timestamp, ``_forget``, called with the
+    prefix of the series affected by a delete and its range in nanoseconds,
+    and ``_answer``, which returns the points of a query when they can be
+    answered from memory, or None. Any other attribute is read from the
+    wrapped backend.
+    """
+
+    def __init__(self, backend):
+        """Wrap a backend."""
+        self._backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def save(self, namespace, data_to_save, timestamp=None):
+        """Save data in the backend and record it.
+
+        A missing timestamp is set here, so that the backend and the
+        wrapper keep the same time.
+        """
+        if timestamp is None:
+            timestamp = now_nanoseconds() // PRECISIONS['s']
+        result = self._backend.save(namespace, data_to_save, timestamp)
+        self._record(namespace, data_to_save, timestamp, 's')
+        return result
+
+    def save_many(self, records, precision='s'):
+        """Save many records in the backend and record the saved ones."""
+        now = now_nanoseconds() // PRECISIONS[precision]
+        records = [(namespace, data_to_save,
+                    now if timestamp is None else timestamp)
+                   for namespace, data_to_save, timestamp in records]
+        errors = self._backend.save_many(records, precision)
+
+        skipped = {position for position, _ in errors}
+        for position, record in enumerate(records):
+            if position not in skipped:
+                self._record(*record, precision)
+        return errors
+
+    def get(self, namespace, *args, **kwargs):
+        """Return the points from memory or from the backend."""
+        points = self._answer(namespace, self._params(args, kwargs))
+        if points is not None:
+            return points
+        return self._backend.get(namespace, *args, **kwargs)
+
+    def iter_get(self, namespace, *args, **kwargs):
+        """Iterate over the points from memory or from the backend."""
+        points = self._answer(namespace, self._params(args, kwargs))
+        if points is not None:
+            return iter(points)
+        return self._backend.iter_get(namespace, *args, **kwargs)
+
+    def delete(self, namespace, start=None, end=None):
+        """Delete data in the backend and forget the affected series.
+
+        Backends delete every field of the measurement of a namespace, so
+        the sibling series are forgotten too.
+        """
+        result = self._backend.delete(namespace, start, end)
+        try:
+            start, end = [to_nanoseconds(time) if time is not None else None
+                          for time in (start, end)]
+        except ValueError:
+            start = end = None
+        self._forget(namespace.rsplit('.', 1)[0] + '.', namespace, start,
+                     end)
+        return result
+
+    @staticmethod
+    def _params(args, kwargs):
+        """Return the query parameters of a get call by name."""
+        params = dict.fromkeys(QUERY_PARAMS)
+        params.update(zip(QUERY_PARAMS, args))
+        params.update(kwargs)
+        return params
+
+    @abstractmethod
+    def _record(self, namespace, data_to_save, timestamp, precision):
+        """Record a point saved in the backend."""
+
+    @abstractmethod
+    def _forget(self, prefix, namespace, start, end):
+        """Forget the points of the series deleted in the backend."""
+
+    @abstractmethod
+    def _answer(self, namespace, params):
+        """Return the points of a query from memory, or None."""
@@ -0,0 +1,222 @@
+"""Cache of query results, invalidated by writes to the queried data."""
+from collections import OrderedDict, deque
+from threading import Lock
+from time import monotonic
+
+from napps.kytos.kronos.utils import (is_namespace_pattern, namespace_regex,
+                                      now_nanoseconds, to_nanoseconds)
+
+# Number of recent invalidations checked before storing a query result.
+INVALIDATION_LOG = 1024
+
+
+def _to_nanoseconds(timestamp, precision='s'):
+    """Return epoch nanoseconds, or None if the timestamp is not valid."""
+    try:
+        return to_nanoseconds(timestamp, precision)
+    except ValueError:
+        return None
+
+
+def _normalize(timestamp):
+    """Return a query timestamp in epoch nanoseconds when it is valid."""
+    if timestamp is None:
+        return None
+    time = _to_nanoseconds(timestamp)
+    return timestamp if time is None else time
+
+
+class QueryCache:
+    """LRU cache of up to ``size`` query results, kept for ``ttl`` seconds.
+
+    Results are stored by namespace and time range, so a write invalidates
+    only the cached queries of the same namespace whose range contains the
+    written time. A query of a namespace with fields, like ``a.b.field``, is
+    also invalidated by writes to ``a.b``. Queries of namespace patterns are
+    invalidated by writes to any namespace they match.
+    """
+
+    def __init__(self, size, ttl):
+        """Create an empty cache."""
+        self._size = max(int(size), 0)
+        self._ttl = float(ttl)
+        self._entries = OrderedDict()
+        self._index = {}
+        self._patterns = {}
+        self._lock = Lock()
+        self._version = 0
+        self._log = deque(maxlen=INVALIDATION_LOG)
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def version(self):
+        """Return a number increased by every invalidation.
+
+        A result queried while an invalidation of its namespace and range
+        happened may be stale, so ``put`` does not store it.
+        """
+        return self._version
+
+    @staticmethod
+    def key(namespace, start=None, end=None, method=None, fill=None,
+            group=None, **options):
+        """Return the normalized key of a query.
+
+        Other options of the query, like ``limit``, are part of the key.
+        """
+        start, end = _normalize(start), _normalize(end)
+        if method is not None:
+            method = method.lower()
+        if 'after' in options:
+            options['after'] = _normalize(options['after'])
+        return (namespace, start, end, method, fill, group,
+                tuple(sorted(options.items())))
+
+    def get(self, key):
+        """Return the cached result of a query, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and monotonic() - entry[0] > self._ttl:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, result, version):
+        """Store the result of a query started at the given version."""
+        if self._size == 0 or self._ttl <= 0 or result is None:
+            return
+
+        with self._lock:
+            if not self._fresh(key, version):
+                return
+
+            self._remove(key)
+            self._entries[key] = (monotonic(), result)
+            namespace = key[0]
+            if is_namespace_pattern(namespace):
+                self._patterns[key] = (
+                    namespace_regex(namespace),
+                    namespace_regex(namespace.rsplit('.', 1)[0]))
+            else:
+                for name in {namespace, namespace.rsplit('.', 1)[0]}:
+                    self._index.setdefault(name, set()).add(key)
+
+            while len(self._entries) > self._size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, namespace, start=None, end=None):
+        """Drop the queries of a namespace overlapping a time range.
+
+        A None start or end leaves that side of the range open.
+        """
+        start = _to_nanoseconds(start) if start is not None else None
+        end = _to_nanoseconds(end) if end is not None else None
+        self._invalidate(namespace, start, end)
+
+    def invalidate_records(self, records, precision='s'):
+        """Drop the queries affected by saving (namespace, data, timestamp).
+
+        Epoch timestamps of the records are in the ``precision`` unit. A
+        record with a single value, like CSV saves, writes a field, so the
+        queries of the fields of its measurement are dropped too.
+        """
+        ranges = {}
+        for namespace, data_to_save, timestamp in records:
+            time = _to_nanoseconds(timestamp, precision) \
+                if timestamp is not None \
+                else now_nanoseconds()
+            names = [namespace]
+            if not isinstance(data_to_save, dict):
+                names.append(namespace.rsplit('.', 1)[0])
+            for name in names:
+                first, last = ranges.get(name, (time, time))
+                if time is None or first is None:
+                    ranges[name] = (None, None)
+                else:
+                    ranges[name] = (min(first, time), max(last, time))
+
+        for namespace, (first, last) in ranges.items():
+            self._invalidate(namespace, first, last)
+
+    def stats(self):
+        """Return the cache size and its hit and miss counters."""
+        with self._lock:
+            return {'entries': len(self._entries),
+                    'size': self._size,
+                    'hits': self._hits,
+                    'misses': self._misses,
+                    'invalidations': self._invalidations}
+
+    @staticmethod
+    def _overlaps(key, start, end):
+        """Return whether a cached query range overlaps [start, end].
+
+        Query ranges that are not numbers are treated as open.
+        """
+        _, query_start, query_end, *_ = key
+        if isinstance(query_start, int) and end is not None and \
+           query_start > end:
+            return False
+        if isinstance(query_end, int) and start is not None and \
+           query_end < start:
+            return False
+        return True
+
+    @staticmethod
+    def _affects(key, namespace, start, end):
+        """Return whether invalidating a namespace range drops a query."""
+        query = key[0]
+        names = (query, query.rsplit('.', 1)[0])
+        if is_namespace_pattern(query):
+            matches = any(namespace_regex(name).match(namespace)
+                          for name in names)
+        else:
+            matches = namespace in names
+        return matches and QueryCache._overlaps(key, start, end)
+
+    def _fresh(self, key, version):
+        """Return whether no invalidation since version affects a query.
+
+        When older invalidations are no longer logged, the result is
+        treated as stale.
+        """
+        if version == self._version:
+            return True
+        if not self._log or self._log[0][0] > version + 1:
+            return False
+        return not any(self._affects(key, namespace, start, end)
+                       for number, namespace, start, end in self._log
+                       if number > version)
+
+    def _invalidate(self, namespace, start, end):
+        with self._lock:
+            self._version += 1
+            self._log.append((self._version, namespace, start, end))
+            keys = list(self._index.get(namespace, ()))
+            keys.extend(key for key, regexes in self._patterns.items()
+                        if any(regex.match(namespace) for regex in regexes))
+            for key in keys:
+                if self._overlaps(key, start, end):
+                    self._remove(key)
+                    self._invalidations += 1
+
+    def _remove(self, key):
+        if self._entries.pop(key, None) is None:
+            return
+        self._patterns.pop(key, None)
+        namespace = key[0]
+        for name in {namespace, namespace.rsplit('.', 1)[0]}:
+            keys = self._index.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[name]
@@ -0,0 +1,58 @@
+"""Columnar encodings of query results, smaller and faster to load."""
+import sys
+from array import array
+
+from napps.kytos.kronos.utils import to_nanoseconds_many
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def to_columns(points):
+    """Return the times and values of [timestamp, value] points as columns.
+
+    Times are epoch nanoseconds, given by the ``start`` time and either the
+    ``step`` between evenly spaced points or the ``deltas`` between each
+    point and the previous one.
+    """
+    times = to_nanoseconds_many([point[0] for point in points])
+    deltas = [later - earlier for earlier, later in zip(times, times[1:])]
+
+    columns = {'start': times[0] if times else None}
+    if deltas and deltas.count(deltas[0]) == len(deltas):
+        columns['step'] = deltas[0]
+    else:
+        columns['deltas'] = deltas
+    columns['values'] = [point[1] for point in points]
+    return columns
+
+
+def to_buffers(points):
+    """Return the times and values of [timestamp, value] points as bytes.
+
+    The times, as int64 epoch nanoseconds, are followed by the values, as
+    float64, both little-endian, so they can be loaded without copies. Null
+    values are NaN.
+    """
+    times = array('q', to_nanoseconds_many([point[0] for point in points]))
+    try:
+        values = array('d', [float('nan') if point[1] is None
+                             else float(point[1]) for point in points])
+    except (TypeError, ValueError):
+        error = 'Error. The float64 format requires numeric values.'
+        raise ValueError(error)
+
+    if sys.byteorder == 'big':
+        times.byteswap()
+        values.byteswap()
+    return times.tobytes() + values.tobytes()
+
+
+def packb(data):
+    """Serialize data with MessagePack."""
+    if msgpack is None:
+        error = 'Error. The msgpack format requires the msgpack package.'
+        raise ValueError(error)
+    return msgpack.packb(data)
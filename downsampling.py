@@ -0,0 +1,66 @@
+"""Reduction of query results to a number of points fit for plotting."""
+from array import array
+
+from napps.kytos.kronos.utils import to_nanoseconds_many
+
+
+def _numeric(points):
+    """Return the points with a numeric value and their x and y columns.
+
+    The columns are arrays of the times in seconds and of the values.
+    """
+    kept = []
+    values = array('d')
+    for point in points:
+        try:
+            value = float(point[1])
+        except (TypeError, ValueError):
+            continue
+        kept.append(point)
+        values.append(value)
+    times = array('d', (time / 10**9 for time in
+                        to_nanoseconds_many([point[0] for point in kept])))
+    return kept, times, values
+
+
+def lttb(points, max_points):
+    """Downsample [time, value] points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept, and the points between them are split
+    in ``max_points - 2`` buckets. From each bucket, the point forming the
+    largest triangle with the point kept from the previous bucket and the
+    average of the next bucket is kept, so peaks and dips stay visible.
+    Points without a numeric value are left out.
+    """
+    if len(points) <= max_points:
+        return points
+
+    kept, times, values = _numeric(points)
+    if len(kept) <= max_points or max_points < 3:
+        return kept[:max_points]
+
+    sampled = [kept[0]]
+    size = (len(kept) - 2) / (max_points - 2)
+    chosen = 0
+
+    for bucket in range(max_points - 2):
+        first = int(bucket * size) + 1
+        last = int((bucket + 1) * size) + 1
+
+        end = min(int((bucket + 2) * size) + 1, len(kept))
+        average_x = sum(times[last:end]) / (end - last)
+        average_y = sum(values[last:end]) / (end - last)
+
+        # With the other two vertices fixed for the bucket, twice the area
+        # of the triangle of each candidate is a linear function of it.
+        previous_x, previous_y = times[chosen], values[chosen]
+        weight_x = average_y - previous_y
+        weight_y = previous_x - average_x
+        offset = -weight_x * previous_x - weight_y * previous_y
+        areas = [abs(weight_x * x + weight_y * y + offset)
+                 for x, y in zip(times[first:last], values[first:last])]
+        chosen = first + areas.index(max(areas))
+        sampled.append(kept[chosen])
+
+    sampled.append(kept[-1])
+    return sampled
@@ -1,16 +1,244 @@
 """Main module of kytos/kronos Network Application."""
-from flask import jsonify
+import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+
+from flask import Response, jsonify, request
 
 from kytos.core import KytosNApp, log, rest
 from kytos.core.helpers import listen_to
 from napps.kytos.kronos import settings
 from napps.kytos.kronos.backends.csvbackend import CSVBackend
-from napps.kytos.kronos.utils import NamespaceError
+from napps.kytos.kronos.backends.hottier import HotTierBackend
+from napps.kytos.kronos.backends.rollup import RollupBackend
+from napps.kytos.kronos.backends.sqlite import SQLiteBackend
+from napps.kytos.kronos.cache import QueryCache
+from napps.kytos.kronos.columnar import packb, to_buffers, to_columns
+from napps.kytos.kronos.downsampling import lttb
+from napps.kytos.kronos.retention import RetentionEngine
+from napps.kytos.kronos.utils import (BackendError, NamespaceError,
+                                      QueueFullError, decode_cursor,
+                                      encode_cursor, is_namespace_pattern,
+                                      parse_fields, parse_line_protocol,
+                                      parse_record)
+from napps.kytos.kronos.workers import WorkerPool
 
 # If backend is set as InfluxDB and the module is not available
 # we should let the ModuleNotFoundError be caught on `controller.load_napp()`
 if settings.DEFAULT_BACKEND.lower() == 'influxdb':
     from napps.kytos.kronos.backends.influx import InfluxBackend
+elif settings.DEFAULT_BACKEND.lower() == 'influxdb_async':
+    from napps.kytos.kronos.backends.influx_async import AsyncInfluxBackend
+
+# Parameters of a batch query that may be numbers.
+NUMBER_PARAMS = ('id', 'start', 'end', 'limit', 'max_points')
+
+RESPONSE_FORMATS = ('columnar', 'msgpack', 'float64')
+
+
+def _parse_event_record(record):
+    """Return a (namespace, fields, timestamp) tuple from an event record."""
+    if isinstance(record, dict):
+        return parse_record(record)
+    try:
+        namespace, fields, timestamp = record
+    except (TypeError, ValueError):
+        error = ('Error. Record must be a (namespace, fields, timestamp) '
+                 'tuple.')
+        raise ValueError(error)
+    return namespace, fields, timestamp
+
+
+def _page_params(limit, cursor):
+    """Return the backend arguments selecting a page of points."""
+    page = {}
+    if limit is not None:
+        try:
+            page['limit'] = int(limit)
+        except (TypeError, ValueError):
+            page['limit'] = 0
+        if page['limit'] < 1:
+            error = f'Error. Limit \'{limit}\' must be a positive integer.'
+            raise ValueError(error)
+    if cursor is not None:
+        page['after'] = decode_cursor(cursor)
+    return page
+
+
+def _query_params(limit, cursor, fields):
+    """Return the backend arguments selecting the fields and page of points."""
+    params = _page_params(limit, cursor)
+    fields = parse_fields(fields)
+    if fields is not None:
+        params['fields'] = fields
+    return params
+
+
+def _max_points(max_points, params):
+    """Return the number of points to downsample a result to, or None.
+
+    Rows with many fields have no single value to downsample by, so they
+    cannot be downsampled.
+    """
+    if max_points is None:
+        return None
+    if 'fields' in params:
+        error = 'Error. Max points cannot be used with fields.'
+        raise ValueError(error)
+    try:
+        value = int(max_points)
+    except (TypeError, ValueError):
+        value = 0
+    if value < 3:
+        error = (f'Error. Max points \'{max_points}\' must be an integer '
+                 'greater than 2.')
+        raise ValueError(error)
+    return value
+
+
+def _check_pattern(namespace, params, stream=None):
+    """Reject the query options that namespace patterns do not support."""
+    if is_namespace_pattern(namespace) and (params or stream is not None):
+        error = ('Error. Namespace patterns cannot be used with limit, '
+                 'cursor, fields or stream.')
+        raise ValueError(error)
+
+
+def _check_format(response_format, namespace, params, stream=None):
+    """Reject the query options that columnar formats do not support."""
+    if response_format is None:
+        return
+    if response_format not in RESPONSE_FORMATS:
+        error = (f'Error. Format \'{response_format}\' must be one of '
+                 f'{", ".join(RESPONSE_FORMATS)}.')
+    elif 'fields' in params or stream is not None:
+        error = 'Error. Format cannot be used with fields or stream.'
+    elif response_format == 'float64' and is_namespace_pattern(namespace):
+        error = 'Error. The float64 format cannot be used with patterns.'
+    else:
+        return
+    raise ValueError(error)
+
+
+def _format_response(response, response_format):
+    """Return a query response encoded in a columnar format.
+
+    The ``float64`` format has no room for the cursor of a page, which is
+    sent in the ``X-Kronos-Cursor`` header instead.
+    """
+    result = response['response']
+    if response_format == 'float64':
+        headers = {'X-Kronos-Points': str(len(result))}
+        if response.get('cursor') is not None:
+            headers['X-Kronos-Cursor'] = response['cursor']
+        return Response(to_buffers(result),
+                        mimetype='application/octet-stream', headers=headers)
+
+    if isinstance(result, dict):
+        columns = {namespace: to_columns(points)
+                   for namespace, points in result.items()}
+    else:
+        columns = to_columns(result)
+    response = dict(response, response=columns)
+    if response_format == 'msgpack':
+        return Response(packb(response), mimetype='application/msgpack')
+    return jsonify(response)
+
+
+def _query_specs(queries, max_queries):
+    """Return the queries of a batch by query id.
+
+    Each query is an object with a ``namespace``. Its ``id`` defaults to its
+    position in the batch. Time and number parameters may be strings or
+    numbers, and the others must be strings.
+    """
+    if not isinstance(queries, list):
+        error = 'Error. The request body must be a JSON array.'
+        raise ValueError(error)
+    if len(queries) > max_queries:
+        error = f'Error. At most {max_queries} queries can be sent at once.'
+        raise ValueError(error)
+
+    specs = {}
+    for index, spec in enumerate(queries):
+        if not isinstance(spec, dict) or \
+           not isinstance(spec.get('namespace'), str):
+            error = f'Error. Query {index} must be an object with a namespace.'
+            raise ValueError(error)
+        for name, value in spec.items():
+            types = (str, int, float) if name in NUMBER_PARAMS else str
+            if name != 'fields' and value is not None and \
+               not isinstance(value, types):
+                error = f'Error. Query {index} has an invalid {name}.'
+                raise ValueError(error)
+        query_id = str(spec.get('id', index))
+        if query_id in specs:
+            error = f'Error. Query id \'{query_id}\' is repeated.'
+            raise ValueError(error)
+        specs[query_id] = spec
+    return specs
+
+
+def _downsample(result, max_points):
+    """Downsample the points of a result, or of each namespace in it."""
+    if isinstance(result, dict):
+        return {namespace: lttb(points, max_points)
+                for namespace, points in result.items()}
+    return lttb(result, max_points)
+
+
+def _page_response(points, page):
+    """Return the points of a query with the cursor of the next page.
+
+    The cursor is None when the page is the last one.
+    """
+    response = {'response': points}
+    if 'limit' in page:
+        full = points and len(points) == page['limit']
+        response['cursor'] = encode_cursor(points[-1][0]) if full else None
+    return response
+
+
+def _chunks(points):
+    """Split an iterator of points into lists of STREAM_CHUNK_SIZE points."""
+    while True:
+        rows = list(islice(points, settings.STREAM_CHUNK_SIZE))
+        if not rows:
+            return
+        yield rows
+
+
+def _stream_ndjson(points):
+    """Yield the points as JSON lines, ending with an error if any."""
+    try:
+        for rows in _chunks(points):
+            yield ''.join(json.dumps(row) + '\n' for row in rows)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.error(f'Error streaming points: {exc}')
+        yield json.dumps({'exc_name': exc.__class__.__name__,
+                          'response': str(exc)}) + '\n'
+
+
+def _stream_json(points):
+    """Yield the points as a JSON response, written chunk by chunk.
+
+    If reading the points fails, the document is left incomplete so the
+    client cannot take it for a complete result.
+    """
+    yield '{"response": ['
+    separator = ''
+    try:
+        for rows in _chunks(points):
+            yield separator + ', '.join(json.dumps(row) for row in rows)
+            separator = ', '
+    except Exception as exc:  # pylint: disable=broad-except
+        log.error(f'Error streaming points: {exc}')
+        return
+    yield ']}'
+
+
+STREAM_FORMATS = {'ndjson': (_stream_ndjson, 'application/x-ndjson'),
+                  'json': (_stream_json, 'application/json')}
 
 
 class Main(KytosNApp):
@@ -20,29 +248,72 @@ class Main(KytosNApp):
     """
 
     backend = None
+    workers = None
+    queries = None
+    cache = None
+    retention = None
 
     def setup(self):
         """Init method for the napp."""
         log.info("Kronos NApp started.")
 
+        self.workers = WorkerPool(settings.WORKER_POOL_SIZE,
+                                  settings.WORKER_QUEUE_SIZE,
+                                  settings.WORKER_OVERFLOW,
+                                  name='kronos-worker')
+        self.queries = ThreadPoolExecutor(settings.BATCH_QUERY['POOL_SIZE'],
+                                          thread_name_prefix='kronos-query')
+        self.cache = QueryCache(settings.QUERY_CACHE['SIZE'],
+                                settings.QUERY_CACHE['TTL'])
+
         if settings.DEFAULT_BACKEND.lower() == 'influxdb':
             self.backend = InfluxBackend(settings)
+        elif settings.DEFAULT_BACKEND.lower() == 'influxdb_async':
+            self.backend = AsyncInfluxBackend(settings)
         elif settings.DEFAULT_BACKEND.lower() == 'csv':
             self.backend = CSVBackend(settings)
+        elif settings.DEFAULT_BACKEND.lower() == 'sqlite':
+            self.backend = SQLiteBackend(settings)
+
+        if settings.ROLLUP['ENABLED']:
+            self.backend = RollupBackend(self.backend, settings)
+        if settings.HOT_TIER['ENABLED']:
+            self.backend = HotTierBackend(self.backend, settings)
+
+        self.retention = RetentionEngine(
+            self.backend, settings.RETENTION['RULES'],
+            settings.RETENTION['NAMESPACES_PER_RUN'],
+            on_delete=self._invalidate_deleted,
+            slice_duration=settings.RETENTION['SLICE'])
+        if self.retention.enabled:
+            self.execute_as_loop(settings.RETENTION['INTERVAL'])
 
     def execute(self):
         """Run after the setup method execution.
 
-        You can also use this method in loop mode if you add to the above setup
-        method a line like the following example:
-
-            self.execute_as_loop(30)  # 30-second interval.
+        When there are retention rules, this method runs in loop mode and
+        expires the old data of a few namespaces each time.
         """
+        if self.retention is not None and self.retention.enabled:
+            try:
+                deleted = self.retention.run()
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error(f'Retention run failed: {exc}')
+            else:
+                if deleted:
+                    log.info(f'Retention deleted {deleted} points.')
+            return
         log.info("Executing Kronos NApp!")
 
     def shutdown(self):
         """Execute before the NApp is unloaded."""
         log.info("Kronos NApp is shutting down.")
+        if self.workers is not None:
+            self.workers.shutdown()
+        if self.queries is not None:
+            self.queries.shutdown()
+        if self.backend is not None:
+            self.backend.shutdown()
 
     @rest('v1/<namespace>/<value>', methods=['POST'])
     @rest('v1/<namespace>/<value>/<timestamp>', methods=['POST'])
@@ -50,12 +321,62 @@ class Main(KytosNApp):
         """Save the data in one of the backends."""
         try:
             self.backend.save(namespace, value, timestamp)
-        except (NamespaceError, ValueError) as exc:
+        except (NamespaceError, ValueError, BackendError) as exc:
             exc_name = exc.__class__.__name__
             return jsonify({'exc_name': exc_name, 'response': str(exc)})
+        finally:
+            self.cache.invalidate_records([(namespace, value, timestamp)])
 
         return jsonify({'response': 'Value saved.'})
 
+    @rest('v1/batch', methods=['POST'])
+    def rest_save_batch(self):
+        """Save many records in one backend write.
+
+        The body is either a JSON array of objects with ``namespace``,
+        ``fields`` and ``timestamp`` keys, or InfluxDB line protocol text with
+        one record per line. Invalid records are reported by their index and
+        do not prevent the others from being saved.
+        """
+        if request.is_json:
+            items = request.get_json(silent=True)
+            parse = parse_record
+            precision = 's'
+        else:
+            items = [line for line in
+                     request.get_data(as_text=True).splitlines()
+                     if line.strip() and not line.startswith('#')]
+            parse = parse_line_protocol
+            precision = 'ns'
+
+        if not isinstance(items, list):
+            error = 'Error. The request body must be a JSON array.'
+            return jsonify({'exc_name': 'ValueError', 'response': error})
+
+        try:
+            saved, errors = self._save_records(items, parse, precision)
+        except BackendError as exc:
+            exc_name = exc.__class__.__name__
+            return jsonify({'exc_name': exc_name, 'response': str(exc)})
+        return jsonify({'response': f'{saved} values saved.',
+                        'errors': [{'index': index,
+                                    'exc_name': exc.__class__.__name__,
+                                    'response': str(exc)}
+                                   for index, exc in errors]})
+
+    @rest('v1/stats', methods=['GET'])
+    def rest_stats(self):
+        """Return the worker pool, query cache and retention counters.
+
+        Backends with counters of their own, like InfluxDB, add them.
+        """
+        stats = {'workers': self.workers.stats(),
+                 'query_cache': self.cache.stats(),
+                 'retention': self.retention.stats()}
+        if hasattr(self.backend, 'stats'):
+            stats['backend'] = self.backend.stats()
+        return jsonify({'response': stats})
+
     @rest('v1/<namespace>/', methods=['DELETE'])
     @rest('v1/<namespace>/start/<start>', methods=['DELETE'])
     @rest('v1/<namespace>/end/<end>', methods=['DELETE'])
@@ -64,9 +385,11 @@ class Main(KytosNApp):
         """Delete the data in one of the backends."""
         try:
             self.backend.delete(namespace, start, end)
-        except (NamespaceError, ValueError) as exc:
+        except (NamespaceError, ValueError, BackendError) as exc:
             exc_name = exc.__class__.__name__
             return jsonify({'exc_name': exc_name, 'response': str(exc)})
+        finally:
+            self._invalidate_deleted(namespace, start, end)
 
         return jsonify({'response': 'Values deleted.'})
 
@@ -82,49 +405,257 @@ class Main(KytosNApp):
           methods=['GET'])
     def rest_get(self, namespace, start=None, end=None, method=None,
                  fill=None, group=None):
-        """Retrieve the data from one of the backends."""
+        """Retrieve the data from one of the backends.
+
+        Results are cached for ``QUERY_CACHE['TTL']`` seconds, or until a
+        write to the same namespace and time range. With the ``stream``
+        query parameter set to ``ndjson`` or ``json``, the points are
+        instead streamed as they are read from the backend.
+
+        The ``limit`` query parameter bounds the number of points returned.
+        The response then carries a ``cursor``, to be sent back as the
+        ``cursor`` query parameter to get the next page, or None after the
+        last page. The ``max_points`` query parameter downsamples the points
+        with LTTB, keeping the shape of the series for plotting.
+
+        The ``fields`` query parameter, a comma-separated list of fields or
+        ``*``, selects many fields of the namespace, a measurement, in one
+        query. Each point is then a ``[time, {field: value}]`` row.
+
+        A namespace with ``*`` in some of its segments is a pattern, like
+        ``kytos.kronos.telemetry.switches.1.interfaces.*.bytes_in``. The
+        response then maps every matching namespace to its points.
+
+        The ``format`` query parameter returns the points in columns, a
+        ``start`` time in epoch nanoseconds, the ``step`` or ``deltas``
+        between times and the ``values``, as JSON (``columnar``) or
+        MessagePack (``msgpack``). The ``float64`` format returns the times
+        as int64 followed by the values as float64, both little-endian.
+        """
+        stream = request.args.get('stream')
+        response_format = request.args.get('format')
+        try:
+            params = _query_params(request.args.get('limit'),
+                                   request.args.get('cursor'),
+                                   request.args.get('fields'))
+            max_points = _max_points(request.args.get('max_points'), params)
+            _check_pattern(namespace, params, stream)
+            _check_format(response_format, namespace, params, stream)
+        except ValueError as exc:
+            exc_name = exc.__class__.__name__
+            return jsonify({'exc_name': exc_name, 'response': str(exc)})
+
+        if stream is not None:
+            return self._stream_get(stream, namespace, start, end, method,
+                                    fill, group, params, max_points)
+
+        try:
+            response = self._query(namespace, start, end, method, fill,
+                                   group, params, max_points)
+            if response_format is not None:
+                return _format_response(response, response_format)
+        except (NamespaceError, ValueError, BackendError) as exc:
+            exc_name = exc.__class__.__name__
+            return jsonify({'exc_name': exc_name, 'response': str(exc)})
+        return jsonify(response)
+
+    @rest('v1/query', methods=['POST'])
+    def rest_query(self):
+        """Run many queries concurrently, returning their results by id.
+
+        The body is a JSON array of queries, objects with an ``id``, a
+        ``namespace`` and the optional ``start``, ``end``, ``method``,
+        ``fill``, ``group``, ``limit``, ``cursor``, ``fields`` and
+        ``max_points`` of a GET query. The queries run on a pool of
+        ``BATCH_QUERY['POOL_SIZE']`` threads, and each result is the
+        response of the same GET query, or its error.
+        """
         try:
+            specs = _query_specs(request.get_json(silent=True),
+                                 settings.BATCH_QUERY['MAX_QUERIES'])
+        except ValueError as exc:
+            exc_name = exc.__class__.__name__
+            return jsonify({'exc_name': exc_name, 'response': str(exc)})
+
+        futures = {query_id: self.queries.submit(self._run_query, spec)
+                   for query_id, spec in specs.items()}
+        return jsonify({'response': {query_id: future.result()
+                                     for query_id, future in futures.items()}})
+
+    def _run_query(self, spec):
+        """Return the response of a query of a batch, or its error."""
+        try:
+            params = _query_params(spec.get('limit'), spec.get('cursor'),
+                                   spec.get('fields'))
+            max_points = _max_points(spec.get('max_points'), params)
+            _check_pattern(spec['namespace'], params)
+            return self._query(spec['namespace'], spec.get('start'),
+                               spec.get('end'), spec.get('method'),
+                               spec.get('fill'), spec.get('group'), params,
+                               max_points)
+        except (NamespaceError, ValueError, BackendError) as exc:
+            # One failed query must not fail the rest of the batch.
+            exc_name = exc.__class__.__name__
+            return {'exc_name': exc_name, 'response': str(exc)}
+        except Exception as exc:  # pylint: disable=broad-except
+            # Backends raise their own errors too, like InfluxDB's for
+            # ranges without data.
+            log.error(f'Error running query {spec}: {exc}')
+            return {'exc_name': exc.__class__.__name__,
+                    'response': str(exc)}
+
+    def _query(self, namespace, start, end, method, fill, group, params,
+               max_points):
+        """Return the response of a query, from the cache when possible."""
+        key = self.cache.key(namespace, start, end, method, fill, group,
+                             max_points=max_points, **params)
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        version = self.cache.version
+        if is_namespace_pattern(namespace):
+            result = self.backend.get_many(namespace, start, end, method,
+                                           fill, group)
+        else:
             result = self.backend.get(namespace, start, end, method, fill,
-                                      group)
-        except (NamespaceError, ValueError) as exc:
+                                      group, **params)
+
+        response = _page_response(result, params)
+        if max_points is not None:
+            response['response'] = _downsample(result, max_points)
+        self.cache.put(key, response, version)
+        return response
+
+    def _stream_get(self, stream, namespace, start, end, method, fill,
+                    group, params, max_points):
+        """Return a response streaming the points of a query."""
+        try:
+            if stream not in STREAM_FORMATS:
+                error = (f'Error. Stream format \'{stream}\' must be one of '
+                         f'{", ".join(STREAM_FORMATS)}.')
+                raise ValueError(error)
+
+            points = self.backend.iter_get(namespace, start, end, method,
+                                           fill, group, **params)
+            if max_points is not None:
+                points = iter(lttb(list(points), max_points))
+            # Read the first point now, so that query errors are still
+            # returned as a regular error response.
+            first = list(islice(points, 1))
+        except (NamespaceError, ValueError, BackendError) as exc:
             exc_name = exc.__class__.__name__
             return jsonify({'exc_name': exc_name, 'response': str(exc)})
 
-        return jsonify({'response': result})
+        encode, mimetype = STREAM_FORMATS[stream]
+        return Response(encode(chain(first, points)), mimetype=mimetype)
 
     @listen_to('kytos.kronos.save')
     def event_save(self, event):
         """Save the data in one of the backends."""
+        self._submit_event(self._save_event, event)
+
+    @listen_to('kytos.kronos.save_many')
+    def event_save_many(self, event):
+        """Save many records in one backend call.
+
+        The event content carries a ``records`` list of (namespace, fields,
+        timestamp) tuples or of objects with those keys. The callback
+        receives the number of saved records and, when some were rejected,
+        a list of (index, exception name, message) tuples as error.
+        """
+        self._submit_event(self._save_many_event, event)
+
+    @listen_to('kytos.kronos.get')
+    def event_get(self, event):
+        """Get the data in one of the backends."""
+        self._submit_event(self._get_event, event)
+
+    @listen_to('kytos.kronos.delete')
+    def event_delete(self, event):
+        """Delete data in one of the backends."""
+        self._submit_event(self._delete_event, event)
+
+    def _submit_event(self, function, event):
+        """Run an event handler on the worker pool.
+
+        Events are routed to a worker by namespace, so the events of a
+        namespace are handled in the order they arrive. ``save_many``
+        events, which have no single namespace, keep no order with the
+        other events.
+        """
+        self.workers.submit(function, event,
+                            key=event.content.get('namespace'),
+                            on_reject=self._reject_event)
+
+    def _reject_event(self, event):
+        """Answer an event discarded by the worker pool with an error."""
+        exc = QueueFullError('Error. Kronos worker queue is full, the event '
+                             'was discarded.')
+        self._execute_callback(event, None, (exc.__class__.__name__,
+                                             str(exc)))
+
+    def _save_event(self, event):
         error = None
         result = None
 
+        record = (event.content['namespace'], event.content['value'],
+                  event.content['timestamp'])
         try:
-            self.backend.save(event.content['namespace'],
-                              event.content['value'],
-                              event.content['timestamp'])
+            self.backend.save(*record)
             result = 'Value saved.'
-        except (NamespaceError, ValueError) as exc:
+        except (NamespaceError, ValueError, BackendError) as exc:
             error = (exc.__class__.__name__, str(exc))
+        finally:
+            self.cache.invalidate_records([record])
 
         self._execute_callback(event, result, error)
 
-    @listen_to('kytos.kronos.get')
-    def event_get(self, event):
-        """Get the data in one of the backends."""
+    def _save_many_event(self, event):
+        records = event.content.get('records', [])
+        try:
+            saved, errors = self._save_records(records, _parse_event_record)
+        except BackendError as exc:
+            self._execute_callback(event, None, (exc.__class__.__name__,
+                                                 str(exc)))
+            return
+        errors = [(index, exc.__class__.__name__, str(exc))
+                  for index, exc in errors]
+
+        self._execute_callback(event, f'{saved} values saved.',
+                               errors or None)
+
+    def _get_event(self, event):
         error = None
         result = None
         try:
-            result = self.backend.get(event.content['namespace'],
-                                      event.content['start'],
-                                      event.content['end'])
-        except (NamespaceError, ValueError) as exc:
+            params = _query_params(event.content.get('limit'),
+                                   event.content.get('cursor'),
+                                   event.content.get('fields'))
+            max_points = _max_points(event.content.get('max_points'), params)
+            namespace = event.content['namespace']
+            _check_pattern(namespace, params)
+            if is_namespace_pattern(namespace):
+                result = self.backend.get_many(namespace,
+                                               event.content['start'],
+                                               event.content['end'])
+            else:
+                result = self.backend.get(namespace, event.content['start'],
+                                          event.content['end'], **params)
+            if 'limit' in params or 'after' in params:
+                response = _page_response(result, params)
+                result = {'points': response['response'],
+                          'cursor': response.get('cursor')}
+                if max_points is not None:
+                    result['points'] = lttb(result['points'], max_points)
+            elif max_points is not None:
+                result = _downsample(result, max_points)
+        except (NamespaceError, ValueError, BackendError) as exc:
             error = (exc.__class__.__name__, str(exc))
 
         self._execute_callback(event, result, error)
 
-    @listen_to('kytos.kronos.delete')
-    def event_delete(self, event):
-        """Delete data in one of the backends."""
+    def _delete_event(self, event):
         error = None
         result = None
         try:
@@ -132,11 +663,51 @@ class Main(KytosNApp):
                                 event.content['start'],
                                 event.content['end'])
             result = 'Value deleted.'
-        except (NamespaceError, ValueError) as exc:
+        except (NamespaceError, ValueError, BackendError) as exc:
             error = (exc.__class__.__name__, str(exc))
+        finally:
+            self._invalidate_deleted(event.content['namespace'],
+                                     event.content['start'],
+                                     event.content['end'])
 
         self._execute_callback(event, result, error)
 
+    def _save_records(self, items, parse, precision='s'):
+        """Parse items into records and save them in one backend call.
+
+        Epoch timestamps of the records are in the ``precision`` unit.
+        Return the number of saved records and a list of (index, exception)
+        tuples for the items that were rejected, sorted by index.
+        """
+        indexes = []
+        records = []
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                records.append(parse(item))
+                indexes.append(index)
+            except ValueError as exc:
+                errors.append((index, exc))
+
+        if records:
+            try:
+                for position, exc in self.backend.save_many(records,
+                                                            precision):
+                    errors.append((indexes[position], exc))
+            finally:
+                self.cache.invalidate_records(records, precision)
+
+        errors.sort(key=lambda error: error[0])
+        return len(items) - len(errors), errors
+
+    def _invalidate_deleted(self, namespace, start, end):
+        """Drop the cached queries of a namespace after deleting from it.
+
+        Backends delete every field of the measurement of a namespace, so
+        the queries of its sibling fields are dropped too.
+        """
+        self.cache.invalidate(namespace.rsplit('.', 1)[0], start, end)
+
     @staticmethod
     def _execute_callback(event, data, error):
         """Run the callback function for event calls to the NApp."""
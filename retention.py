@@ -0,0 +1,178 @@
+"""Expiry of old data, by namespace pattern, in small periodic runs."""
+from collections import deque
+from threading import Lock
+from time import time
+
+from kytos.core import log
+from napps.kytos.kronos.utils import (BackendError, InvalidQueryError,
+                                      NamespaceError, convert_to_iso,
+                                      namespace_regex, parse_duration,
+                                      to_nanoseconds)
+
+
+class RetentionEngine:
+    """Delete the points older than the retention of each namespace.
+
+    ``rules`` maps namespace patterns, like ``kytos.kronos.telemetry.*``, to
+    durations, like ``30d``. As in the patterns of queries, a ``*`` matches
+    a single segment. The first matching pattern gives the retention of a
+    namespace, and namespaces matching none are kept forever.
+
+    Each ``run`` makes at most ``namespaces_per_run`` deletes, taking the
+    namespaces stored in the backend in turns, so a run is a few short
+    deletes between foreground writes. A delete moves the expired time of
+    a namespace forward by at most ``slice_duration``, from its oldest
+    point, so a large backlog is expired over many runs, and namespaces
+    without points older than their retention are not deleted. Backends that
+    delete every field of a measurement at once expire each measurement
+    once, so a rule applies to whole measurements. ``on_delete`` is called
+    with the namespace and the deleted range after each delete.
+    """
+
+    def __init__(self, backend, rules, namespaces_per_run=10,
+                 on_delete=None, slice_duration='1d'):
+        """Parse the retention rules."""
+        self._backend = backend
+        self._rules = [(namespace_regex(pattern), parse_duration(duration))
+                       for pattern, duration in rules.items()]
+        self._per_run = max(int(namespaces_per_run), 1)
+        self._slice = max(parse_duration(slice_duration) // 10**9, 1)
+        self._on_delete = on_delete
+        self._pending = deque()
+        # Time in seconds up to which each namespace is already expired.
+        self._expired = {}
+        self._lock = Lock()
+        self._runs = 0
+        self._namespaces = 0
+        self._deleted = 0
+        self._errors = 0
+
+    @property
+    def enabled(self):
+        """Return whether there is any retention rule."""
+        return bool(self._rules)
+
+    def retention(self, namespace):
+        """Return the retention of a namespace in nanoseconds, or None."""
+        for regex, duration in self._rules:
+            if regex.match(namespace):
+                return duration
+        return None
+
+    def run(self):
+        """Expire the old points of the next namespaces.
+
+        Return the number of points deleted, when the backend reports it.
+        """
+        if not self._rules:
+            return 0
+
+        with self._lock:
+            if not self._pending:
+                namespaces = self._measurements(self._backend.namespaces())
+                self._expired = {namespace: self._expired[namespace]
+                                 for namespace in namespaces
+                                 if namespace in self._expired}
+                self._pending.extend(namespaces)
+
+            deleted = 0
+            for _ in range(self._per_run):
+                if not self._pending:
+                    break
+                namespace = self._pending.popleft()
+                count, done = self._expire(namespace)
+                deleted += count
+                if not done:
+                    self._pending.append(namespace)
+            self._runs += 1
+            return deleted
+
+    def stats(self):
+        """Return the counters of the retention runs."""
+        return {'rules': len(self._rules),
+                'runs': self._runs,
+                'pending': len(self._pending),
+                'namespaces': self._namespaces,
+                'deleted_points': self._deleted,
+                'errors': self._errors}
+
+    def _measurements(self, namespaces):
+        """Return one namespace of each measurement, if deletes are wide."""
+        if not self._backend.DELETES_MEASUREMENTS:
+            return list(namespaces)
+
+        measurements = set()
+        unique = []
+        for namespace in namespaces:
+            measurement = namespace.rsplit('.', 1)[0]
+            if measurement not in measurements:
+                measurements.add(measurement)
+                unique.append(namespace)
+        return unique
+
+    def _oldest(self, namespace, cutoff):
+        """Return the time in seconds of the oldest point, or None on errors.
+
+        Without points older than cutoff, cutoff is returned.
+        """
+        try:
+            points = self._backend.get(namespace, 0, cutoff, limit=1)
+        except NamespaceError:
+            return None
+        except (ValueError, BackendError) as exc:
+            log.error(f'Retention of {namespace} failed: {exc}')
+            self._errors += 1
+            return None
+        except InvalidQueryError:
+            # InfluxDB raises it for ranges without points.
+            return cutoff
+        if not points:
+            return cutoff
+        return min(to_nanoseconds(points[0][0]) // 10**9, cutoff)
+
+    def _expire(self, namespace):
+        """Delete the next slice of the points older than the retention.
+
+        Return the number of points deleted and whether the namespace is
+        expired up to the retention, or failed until the next turn. Once it
+        is, the oldest point is looked up again on the next turn, so that
+        no delete is sent while nothing is older than the retention.
+        """
+        retention = self.retention(namespace)
+        if retention is None:
+            return 0, True
+
+        cutoff = int(time() - retention / 10**9)
+        start = self._expired.get(namespace)
+        if start is None:
+            start = self._oldest(namespace, cutoff)
+            if start is None:
+                return 0, True
+        if start >= cutoff:
+            self._expired.pop(namespace, None)
+            return 0, True
+
+        end = min(start + self._slice, cutoff)
+        end_iso = convert_to_iso(end)
+        try:
+            deleted = self._backend.delete(namespace, None, end_iso)
+        except NamespaceError:
+            # Deleted since it was listed, or along with a sibling field.
+            self._expired.pop(namespace, None)
+            return 0, True
+        except (ValueError, BackendError) as exc:
+            log.error(f'Retention of {namespace} failed: {exc}')
+            self._errors += 1
+            return 0, True
+        finally:
+            if self._on_delete is not None:
+                self._on_delete(namespace, None, end_iso)
+
+        if end < cutoff:
+            self._expired[namespace] = end
+        else:
+            self._expired.pop(namespace, None)
+        self._namespaces += 1
+        deleted = deleted if isinstance(deleted, int) else 0
+        self._deleted += deleted
+        return deleted, end >= cutoff
@@ -1,6 +1,72 @@
 """Module with the Constants used in the kytos/Kronos."""
 
+# 'INFLUXDB_ASYNC' uses the INFLUXDB settings, but sends the requests from
+# an asyncio event loop, with the aiohttp package.
 DEFAULT_BACKEND = 'INFLUXDB'
+
+# The last SIZE points of up to MAX_NAMESPACES namespaces are kept in memory
+# to answer queries about recent data without reaching the backend. Each
+# point takes 16 bytes, so the defaults use up to 64MB once enabled.
+HOT_TIER = {
+    'ENABLED': False,
+    'SIZE': 1024,
+    'MAX_NAMESPACES': 4096
+}
+
+# Saved points are also aggregated in memory in buckets of each interval of
+# TIERS, keeping the given number of buckets, for up to MAX_NAMESPACES
+# namespaces. Queries grouping by a multiple of an interval are answered
+# from the coarsest tier covering their range. Each bucket takes 56 bytes,
+# so the defaults use up to 44MB once enabled.
+ROLLUP = {
+    'ENABLED': False,
+    'TIERS': {'1m': 1440, '10m': 1008, '1h': 720},
+    'MAX_NAMESPACES': 256
+}
+
+# Up to SIZE results of GET queries are cached for TTL seconds. Writes drop
+# the cached queries of the same namespace and time range. SIZE 0 disables
+# the cache.
+QUERY_CACHE = {
+    'SIZE': 1024,
+    'TTL': 5
+}
+
+# Points older than the retention of their namespace are deleted in the
+# background, every INTERVAL seconds, with at most NAMESPACES_PER_RUN
+# deletes each time, each one expiring up to SLICE more of a namespace.
+# RULES maps namespace patterns to durations, for example
+# {'kytos.kronos.telemetry.*': '30d'}, where a * matches one segment, as in
+# GET queries. The first matching pattern applies, and namespaces matching
+# none are kept forever.
+RETENTION = {
+    'INTERVAL': 60,
+    'NAMESPACES_PER_RUN': 10,
+    'SLICE': '1d',
+    'RULES': {}
+}
+
+# Queries sent together to POST v1/query run concurrently on a pool of
+# POOL_SIZE threads. A request has at most MAX_QUERIES queries.
+BATCH_QUERY = {
+    'POOL_SIZE': 8,
+    'MAX_QUERIES': 100
+}
+
+# Streamed GET responses are written in chunks of STREAM_CHUNK_SIZE points.
+STREAM_CHUNK_SIZE = 1000
+
+# Events are handled by a pool of WORKER_POOL_SIZE threads, with at most
+# WORKER_QUEUE_SIZE events waiting. Each thread has its own queue, and the
+# events of a namespace always go to the same one, so they are handled in
+# order. When a queue is full, WORKER_OVERFLOW chooses to 'block' the event
+# handler, to discard the oldest waiting event ('drop_oldest') or to discard
+# the new one ('reject'). Discarded events get a QueueFullError in their
+# callback.
+WORKER_POOL_SIZE = 8
+WORKER_QUEUE_SIZE = 10000
+WORKER_OVERFLOW = 'block'
+
 BACKENDS = {}
 BACKENDS['INFLUXDB'] = {
     'USER': 'foo',
@@ -8,9 +74,54 @@ BACKENDS['INFLUXDB'] = {
     'PORT': 8086,
     'HOST': 'localhost',
     'DBNAME': 'kytos',
-    'POOL_SIZE': 100
+    'POOL_SIZE': 100,
+    # Points are buffered and written in batches of BATCH_SIZE, at least
+    # every FLUSH_INTERVAL seconds. Saves block once MAX_BUFFER_SIZE points
+    # are waiting to be written.
+    'BATCH_SIZE': 5000,
+    'FLUSH_INTERVAL': 1,
+    'MAX_BUFFER_SIZE': 50000,
+    # Seconds to cache the list of databases and measurements.
+    'METADATA_TTL': 60,
+    # Points read per chunk of a streamed query.
+    'CHUNK_SIZE': 10000,
+    # Points that cannot be written while InfluxDB is unavailable are
+    # appended to the SPOOL_PATH file, of at most SPOOL_MAX_BYTES, and
+    # written again, at most SPOOL_REPLAY_RATE points per second, once it is
+    # back. An empty SPOOL_PATH disables the spool.
+    'SPOOL_PATH': 'data/influx.spool',
+    'SPOOL_MAX_BYTES': 100 * 2**20,
+    'SPOOL_REPLAY_RATE': 50000,
+    # Requests time out after TIMEOUT seconds. Failed requests are retried
+    # RETRIES times, after random delays of up to RETRY_BACKOFF seconds,
+    # doubled on each retry. After BREAKER_THRESHOLD failed requests in a
+    # row, requests fail at once for BREAKER_RESET seconds, until a trial
+    # request succeeds.
+    'TIMEOUT': 5,
+    'RETRIES': 2,
+    'RETRY_BACKOFF': 0.1,
+    'BREAKER_THRESHOLD': 5,
+    'BREAKER_RESET': 30
 }
 BACKENDS['CSV'] = {
     'USER': 'foo',
-    'PATH': 'data/'
+    'PATH': 'data/',
+    # Bytes of data between two entries of the sparse time index.
+    'INDEX_INTERVAL': 65536,
+    # Append handles are kept open for up to MAX_OPEN_FILES namespaces. A
+    # file is flushed after FLUSH_ROWS rows and every file is flushed each
+    # FLUSH_INTERVAL seconds, calling fsync when FSYNC is True.
+    'MAX_OPEN_FILES': 128,
+    'FLUSH_ROWS': 1000,
+    'FLUSH_INTERVAL': 1,
+    'FSYNC': False,
+    # Each namespace is stored in one file per 'daily' or 'hourly' segment.
+    'SEGMENT': 'daily'
+}
+BACKENDS['SQLITE'] = {
+    'PATH': 'data/kronos.db',
+    # Rows are committed in one transaction every BATCH_SIZE rows, or on the
+    # first write after FLUSH_INTERVAL seconds. Reads commit them first.
+    'BATCH_SIZE': 1000,
+    'FLUSH_INTERVAL': 1
 }
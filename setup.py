@@ -287,6 +287,13 @@ setup(name=f'kytos_{NAPP_NAME}',
           ],
           'influxdb': [
               'influxdb'
+          ],
+          'influxdb_async': [
+              'aiohttp',
+              'influxdb'
+          ],
+          'msgpack': [
+              'msgpack'
           ]
       },
       cmdclass={
@@ -0,0 +1,79 @@
+"""Module to test the circuit breaker of backend calls."""
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.backends.breaker import CircuitBreaker
+from napps.kytos.kronos.utils import BackendUnavailableError
+
+
+class TestCircuitBreaker(TestCase):
+    """Test the states of the circuit breaker."""
+
+    def setUp(self):
+        """Create a breaker counting OSError as failures."""
+        self.breaker = CircuitBreaker(lambda exc: isinstance(exc, OSError),
+                                      threshold=2, reset_timeout=30,
+                                      retries=0)
+        self.function = mock.MagicMock(side_effect=OSError())
+
+    @mock.patch('napps.kytos.kronos.backends.breaker.monotonic')
+    def test_opens_after_failures(self, mock_monotonic):
+        """Test that calls fail fast once the breaker is open."""
+        mock_monotonic.return_value = 100
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.breaker.call(self.function)
+        self.assertEqual(self.breaker.state, 'open')
+
+        with self.assertRaises(BackendUnavailableError):
+            self.breaker.call(self.function)
+        self.assertEqual(self.function.call_count, 2)
+        self.assertEqual(self.breaker.stats(),
+                         {'state': 'open', 'failures': 2, 'opened': 1,
+                          'rejected': 1})
+
+    @mock.patch('napps.kytos.kronos.backends.breaker.monotonic')
+    def test_half_open_trial(self, mock_monotonic):
+        """Test that a trial call closes or opens the breaker again."""
+        mock_monotonic.return_value = 100
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.breaker.call(self.function)
+
+        mock_monotonic.return_value = 130
+        with self.assertRaises(OSError):
+            self.breaker.call(self.function)
+        self.assertEqual(self.breaker.state, 'open')
+        with self.assertRaises(BackendUnavailableError):
+            self.breaker.call(self.function)
+
+        mock_monotonic.return_value = 160
+        self.function.side_effect = None
+        self.function.return_value = 'ok'
+        self.assertEqual(self.breaker.call(self.function), 'ok')
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_other_errors_are_not_failures(self):
+        """Test that errors in the request do not open the breaker."""
+        self.function.side_effect = ValueError()
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.breaker.call(self.function)
+        self.assertEqual(self.breaker.state, 'closed')
+
+    @mock.patch('napps.kytos.kronos.backends.breaker.uniform',
+                return_value=0.5)
+    @mock.patch('napps.kytos.kronos.backends.breaker.sleep')
+    def test_retries_with_jitter(self, mock_sleep, mock_uniform):
+        """Test that failed calls are retried after random delays."""
+        breaker = CircuitBreaker(lambda exc: isinstance(exc, OSError),
+                                 threshold=5, retries=2, backoff=0.1)
+        self.function.side_effect = [OSError(), OSError(), 'ok']
+
+        self.assertEqual(breaker.call(self.function, 1, key=2), 'ok')
+
+        self.function.assert_called_with(1, key=2)
+        self.assertEqual(mock_uniform.call_args_list,
+                         [mock.call(0, 0.1), mock.call(0, 0.2)])
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(breaker.stats()['failures'], 0)
@@ -0,0 +1,139 @@
+"""Module to test the query result cache."""
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.cache import INVALIDATION_LOG, QueryCache
+
+
+class TestQueryCache(TestCase):
+    """Test methods in the query result cache."""
+
+    def setUp(self):
+        """Create a small cache."""
+        self.cache = QueryCache(2, 60)
+        self.namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+
+    def _put(self, namespace, start, end, result):
+        key = self.cache.key(namespace, start, end)
+        self.cache.put(key, result, self.cache.version)
+        return key
+
+    def test_key_normalization(self):
+        """Test that equivalent queries have the same key."""
+        self.assertEqual(self.cache.key(self.namespace, 10, 20, 'MEAN'),
+                         self.cache.key(self.namespace,
+                                        '1970-01-01T00:00:10Z', '20',
+                                        'mean'))
+
+    def test_get(self):
+        """Test hits and misses."""
+        key = self._put(self.namespace, 10, 20, [['a', 1]])
+
+        self.assertEqual(self.cache.get(key), [['a', 1]])
+        self.assertIsNone(self.cache.get(self.cache.key(self.namespace, 10)))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_ttl(self):
+        """Test that expired results are not returned."""
+        key = self._put(self.namespace, 10, 20, [])
+
+        with mock.patch('napps.kytos.kronos.cache.monotonic',
+                        return_value=10**9):
+            self.assertIsNone(self.cache.get(key))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used result is evicted."""
+        first = self._put(self.namespace, 10, 20, [])
+        second = self._put(self.namespace, 20, 30, [])
+        self.cache.get(first)
+        self._put(self.namespace, 30, 40, [])
+
+        self.assertIsNotNone(self.cache.get(first))
+        self.assertIsNone(self.cache.get(second))
+
+    def test_invalidate_overlapping_range(self):
+        """Test that only queries overlapping the range are dropped."""
+        self.cache = cache = QueryCache(10, 60)
+        before = self._put(f'{self.namespace}.bytes_in', 10, 20, [])
+        after = self._put(f'{self.namespace}.bytes_in', 30, 40, [])
+        other = self._put('kytos.kronos.other.bytes_in', 30, 40, [])
+
+        cache.invalidate_records([(self.namespace, {'bytes_in': 1}, 35)])
+
+        self.assertIsNotNone(cache.get(before))
+        self.assertIsNone(cache.get(after))
+        self.assertIsNotNone(cache.get(other))
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+    def test_invalidate_open_range(self):
+        """Test that a write without timestamp drops queries up to now."""
+        key = self._put(self.namespace, 10, None, [])
+
+        self.cache.invalidate_records([(self.namespace, 1, None)])
+
+        self.assertIsNone(self.cache.get(key))
+
+    def test_invalidate_field_write(self):
+        """Test that a single field write drops its measurement queries."""
+        self.cache = cache = QueryCache(10, 60)
+        key = cache.key(self.namespace, 10, 20, fields=('bytes_in',))
+        cache.put(key, [], cache.version)
+        sibling = self._put('kytos.kronos.telemetry.switches.2', 10, 20, [])
+
+        cache.invalidate_records([(f'{self.namespace}.bytes_in', 1, 15)])
+
+        self.assertIsNone(cache.get(key))
+        self.assertIsNotNone(cache.get(sibling))
+
+    def test_invalidate_pattern(self):
+        """Test that writes to a matching namespace drop pattern queries."""
+        self.cache = cache = QueryCache(10, 60)
+        key = self._put('kytos.kronos.telemetry.switches.*.bytes_in', 10, 20,
+                        {})
+
+        cache.invalidate_records([('kytos.kronos.telemetry.routers.2',
+                                   {'bytes_in': 1}, 15)])
+        self.assertIsNotNone(cache.get(key))
+
+        cache.invalidate_records([('kytos.kronos.telemetry.switches.2',
+                                   {'bytes_in': 1}, 15)])
+        self.assertIsNone(cache.get(key))
+
+    def test_put_after_invalidation(self):
+        """Test that a result queried during a write is not stored."""
+        key = self.cache.key(self.namespace, 10, 20)
+        version = self.cache.version
+        self.cache.invalidate(self.namespace)
+
+        self.cache.put(key, [], version)
+
+        self.assertIsNone(self.cache.get(key))
+
+    def test_put_after_unrelated_invalidation(self):
+        """Test that writes to other data do not block storing a result."""
+        key = self.cache.key(self.namespace, 10, 20)
+        version = self.cache.version
+        self.cache.invalidate('kytos.kronos.telemetry.switches.2')
+        self.cache.invalidate(self.namespace, 30, 40)
+
+        self.cache.put(key, [], version)
+
+        self.assertEqual(self.cache.get(key), [])
+
+    def test_put_after_lost_invalidations(self):
+        """Test that a result is not stored once its writes are unknown."""
+        key = self.cache.key(self.namespace, 10, 20)
+        version = self.cache.version
+        for _ in range(INVALIDATION_LOG + 1):
+            self.cache.invalidate('kytos.kronos.telemetry.switches.2')
+
+        self.cache.put(key, [], version)
+
+        self.assertIsNone(self.cache.get(key))
+
+    def test_disabled(self):
+        """Test that a cache of size 0 stores nothing."""
+        self.cache = QueryCache(0, 60)
+        key = self._put(self.namespace, 10, 20, [])
+
+        self.assertIsNone(self.cache.get(key))
@@ -0,0 +1,53 @@
+"""Module to test the columnar encodings of query results."""
+from array import array
+from unittest import TestCase, mock
+
+from napps.kytos.kronos import columnar
+from napps.kytos.kronos.columnar import packb, to_buffers, to_columns
+
+
+class TestColumnar(TestCase):
+    """Test the columnar encodings."""
+
+    def setUp(self):
+        """Create evenly spaced points."""
+        self.points = [['1970-01-01T00:00:00Z', 1],
+                       ['1970-01-01T00:00:10Z', 2.5],
+                       ['1970-01-01T00:00:20Z', None]]
+
+    def test_to_columns(self):
+        """Test that evenly spaced times are given by a step."""
+        self.assertEqual(to_columns(self.points),
+                         {'start': 0, 'step': 10**10,
+                          'values': [1, 2.5, None]})
+
+        self.points[2][0] = '1970-01-01T00:00:11Z'
+        self.assertEqual(to_columns(self.points),
+                         {'start': 0, 'deltas': [10**10, 10**9],
+                          'values': [1, 2.5, None]})
+        self.assertEqual(to_columns([]),
+                         {'start': None, 'deltas': [], 'values': []})
+
+    def test_to_buffers(self):
+        """Test that times and values are packed little-endian."""
+        data = to_buffers(self.points)
+
+        times, values = array('q'), array('d')
+        times.frombytes(data[:24])
+        values.frombytes(data[24:])
+        self.assertEqual(list(times), [0, 10**10, 2 * 10**10])
+        self.assertEqual(list(values[:2]), [1.0, 2.5])
+        self.assertNotEqual(values[2], values[2])
+
+        with self.assertRaises(ValueError):
+            to_buffers([['1970-01-01T00:00:00Z', {'bytes_in': 1}]])
+
+    def test_packb(self):
+        """Test that msgpack is optional."""
+        with mock.patch.object(columnar, 'msgpack', None):
+            with self.assertRaises(ValueError):
+                packb({})
+
+        with mock.patch.object(columnar, 'msgpack') as mock_msgpack:
+            mock_msgpack.packb.return_value = b'\x80'
+            self.assertEqual(packb({}), b'\x80')
@@ -1,52 +1,354 @@
 """Module to test the CSV Backend."""
-# from unittest import TestCase
-#
-# from napps.kytos.kronos import settings
-# from napps.kytos.kronos.backends.csvbackend import CSVBackend
-# from napps.kytos.kronos.utils import now
-#
-#
-# class TestCSVBackend(TestCase):
-#    """Test methods in CSV Backend."""
-#
-#    def test_save_success(self):
-#        """Test to check the success in data storage in CSV Backend."""
-#        namespace = 'kytos.telemetry.switches.1.interfaces.232.bytes_in'
-#        value = '1324'
-#        timestamp = now()
-#
-#        csvbackend = CSVBackend(settings)
-#        result = csvbackend.save(namespace, value, timestamp)
-#
-#        self.assertEqual(None, result)
-#
-#    def test_get_success(self):
-#        """Test to check success in data retrieving in CSV Backend."""
-#        namespace = 'kytos.telemetry.switches.1.interfaces.232.bytes_in'
-#        value = '1324'
-#        timestamp = now()
-#
-#        csvbackend = CSVBackend(settings)
-#        csvbackend.save(namespace, value, timestamp)
-#
-#        fname = f'{csvbackend.user}_{namespace}.csv'
-#
-#        result = csvbackend.get(namespace, fname, start=timestamp)
-#        expected_store_value = [[value, timestamp]]
-#
-#        self.assertEqual(expected_store_value, result)
-#
-#    def test_delete_sucess(self):
-#        """Test to check success in data retrieving in CSV Backend."""
-#        namespace = 'kytos.telemetry.switches.1.interfaces.232.bytes_in'
-#        value = '1324'
-#        timestamp = now()
-#
-#        csvbackend = CSVBackend(settings)
-#        csvbackend.save(namespace, value, timestamp)
-#
-#        fname = f'{csvbackend.user}_{namespace}.csv'
-#
-#        result = csvbackend.delete(namespace, fname, start=timestamp)
-#
-#        self.assertEqual(None, result)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.backends import csvbackend
+from napps.kytos.kronos.backends.csvbackend import CSVBackend
+from napps.kytos.kronos.utils import NamespaceError
+
+
+class TestCSVBackend(TestCase):
+    """Test methods in CSV Backend."""
+
+    def setUp(self):
+        """Create a CSV backend in a temporary folder."""
+        self.tmpdir = TemporaryDirectory()
+        self.settings = mock.MagicMock()
+        self.settings.BACKENDS = {'CSV': {'USER': 'foo',
+                                          'PATH': self.tmpdir.name,
+                                          'INDEX_INTERVAL': 1}}
+        self.backend = CSVBackend(self.settings)
+        self.namespace = 'kytos.kronos.telemetry.switches.1.bytes_in'
+        self.fname = str(Path(self.tmpdir.name, f'foo_{self.namespace}',
+                              '1970-01-01.csv'))
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        self.backend.shutdown()
+        self.tmpdir.cleanup()
+
+    def test_save_success(self):
+        """Test to check the success in data storage in CSV Backend."""
+        self.backend.save(self.namespace, '1324', 0)
+        self.backend.flush()
+
+        with open(self.fname) as csvfile:
+            self.assertEqual(csvfile.read().splitlines(),
+                             ['Value,Timestamp',
+                              '1324,1970-01-01T00:00:00Z'])
+
+    def test_save_splits_fields(self):
+        """Test that save stores each field of dictionary data as a series."""
+        namespace = 'kytos.kronos.telemetry.switches.1'
+        self.backend.save(namespace, {'bytes_in': 1, 'bytes_out': 2}, 0)
+
+        self.assertEqual(self.backend.get(self.namespace, 0, 1),
+                         [['1970-01-01T00:00:00Z', '1']])
+        self.assertEqual(self.backend.get(f'{namespace}.bytes_out', 0, 1),
+                         [['1970-01-01T00:00:00Z', '2']])
+
+    def test_save_many_splits_fields(self):
+        """Test that save_many stores each field of a record as a series."""
+        namespace = 'kytos.kronos.telemetry.switches.1'
+        errors = self.backend.save_many(
+            [(namespace, {'bytes_in': 1.0, 'bytes_out': 2.0}, 0),
+             (namespace, {'bytes_in': 3.0}, 'not a time')])
+
+        self.assertEqual([position for position, _ in errors], [1])
+        self.assertEqual(self.backend.get(self.namespace, 0, 1),
+                         [['1970-01-01T00:00:00Z', '1.0']])
+        self.assertEqual(self.backend.get(f'{namespace}.bytes_out', 0, 1),
+                         [['1970-01-01T00:00:00Z', '2.0']])
+
+        self.backend.save_many([(namespace, {'bytes_in': 4.0},
+                                 2 * 10**9 + 1)], 'ns')
+        self.assertEqual(self.backend.get(self.namespace, 2, 3),
+                         [['1970-01-01T00:00:02Z', '4.0']])
+
+    def test_get_success(self):
+        """Test to check success in data retrieving in CSV Backend."""
+        for timestamp in range(10):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        result = self.backend.get(self.namespace, 3, 5)
+
+        self.assertEqual(result, [['1970-01-01T00:00:03Z', '3'],
+                                  ['1970-01-01T00:00:04Z', '4'],
+                                  ['1970-01-01T00:00:05Z', '5']])
+
+    def test_iter_get(self):
+        """Test that iter_get validates eagerly and reads lazily."""
+        for timestamp in range(0, 7200, 1800):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        with self.assertRaises(NamespaceError):
+            self.backend.iter_get('kytos.kronos.unknown', 0, 10)
+
+        points = self.backend.iter_get(self.namespace, 1800, 3600)
+        self.assertEqual(next(points), ['1970-01-01T00:30:00Z', '1800'])
+        self.assertEqual(list(points), [['1970-01-01T01:00:00Z', '3600']])
+
+    def test_get_pages(self):
+        """Test that limit and after select a page of rows."""
+        for timestamp in range(10):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        result = self.backend.get(self.namespace, 2, 8, limit=2,
+                                  after='1970-01-01T00:00:03Z')
+
+        self.assertEqual(result, [['1970-01-01T00:00:04Z', '4'],
+                                  ['1970-01-01T00:00:05Z', '5']])
+
+    def test_get_fail_end_smaller_than_start(self):
+        """Test fail case in get with end smaller than start."""
+        self.backend.save(self.namespace, '1', 0)
+
+        with self.assertRaises(ValueError):
+            self.backend.get(self.namespace, 5, 3)
+
+    def test_get_uses_sparse_index(self):
+        """Test that get seeks to the indexed row before start."""
+        for timestamp in range(10):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+        self.backend.flush()
+
+        times, offsets = csvbackend._load_index(self.fname)
+        self.assertEqual(len(times), 10)
+
+        with open(self.fname, 'rb') as csvfile:
+            csvfile.seek(offsets[7])
+            self.assertEqual(csvfile.readline(),
+                             b'7,1970-01-01T00:00:07Z\r\n')
+
+        # Rewrite the first row with a timestamp inside the range. A full
+        # scan would return it, but the indexed scan starts after it.
+        with open(self.fname, 'r+b') as csvfile:
+            csvfile.seek(offsets[0])
+            csvfile.write(b'0,1970-01-01T00:00:08Z')
+
+        result = self.backend.get(self.namespace, 8, 8)
+
+        self.assertEqual(result, [['1970-01-01T00:00:08Z', '8']])
+
+    def test_get_skips_partial_rows(self):
+        """Test that rows being written or malformed are not returned."""
+        for timestamp in range(2):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+        rows = self.backend.iter_get(self.namespace, 0, 9)
+
+        # A buffered handle may write the start of a row before its end.
+        with open(self.fname, 'ab') as csvfile:
+            csvfile.write(b'x\r\n2,1970-01-01T00:00:0')
+
+        self.assertEqual(list(rows), [['1970-01-01T00:00:00Z', '0'],
+                                      ['1970-01-01T00:00:01Z', '1']])
+
+    def test_get_unordered_rows(self):
+        """Test that rows saved out of order disable the index."""
+        for timestamp in (1, 2, 5, 3, 4):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        self.assertIsNone(csvbackend._load_index(self.fname))
+
+        self.backend.shutdown()
+        backend = CSVBackend(self.settings)
+        backend.save(self.namespace, '6', 6)
+        result = backend.get(self.namespace, 3, 4)
+        backend.shutdown()
+
+        self.assertEqual(result, [['1970-01-01T00:00:03Z', '3'],
+                                  ['1970-01-01T00:00:04Z', '4']])
+
+    def test_get_fail_unknown_namespace(self):
+        """Test fail case in get with a namespace without data."""
+        with self.assertRaises(NamespaceError):
+            self.backend.get(self.namespace, 0, 1)
+
+    def test_get_fields(self):
+        """Test that get merges the namespaces of many fields."""
+        measurement = self.namespace.rsplit('.', 1)[0]
+        for timestamp in (1, 2):
+            self.backend.save(f'{measurement}.bytes_in', '10', timestamp)
+        self.backend.save(f'{measurement}.bytes_out', '20', 2)
+
+        result = self.backend.get(measurement, 0, 5, fields='*')
+
+        self.assertEqual(result, [
+            ['1970-01-01T00:00:01Z', {'bytes_in': '10', 'bytes_out': None}],
+            ['1970-01-01T00:00:02Z', {'bytes_in': '10', 'bytes_out': '20'}]])
+        with self.assertRaises(NamespaceError):
+            self.backend.get(measurement, 0, 5, fields=['errors'])
+
+    def test_delete_success(self):
+        """Test that delete removes only the rows inside the range."""
+        for timestamp in range(10):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        self.backend.delete(self.namespace, 2, 7)
+
+        result = self.backend.get(self.namespace, 0, 9)
+        self.assertEqual([row[1] for row in result], ['0', '1', '8', '9'])
+        self.assertFalse(Path(f'{self.fname}.tmp').exists())
+
+    def test_delete_returns_deleted_rows(self):
+        """Test that delete counts the rows it removed."""
+        for timestamp in range(10):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        self.assertEqual(self.backend.delete(self.namespace, None, 3), 4)
+
+    def test_namespaces(self):
+        """Test that namespaces lists the stored namespaces."""
+        self.backend.save(self.namespace, '1', 1)
+
+        self.assertEqual(self.backend.namespaces(), [self.namespace])
+
+    def test_delete_rebuilds_index(self):
+        """Test that delete leaves an index with the new row offsets."""
+        for timestamp in (1, 2, 5, 3, 4):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+        self.assertIsNone(csvbackend._load_index(self.fname))
+
+        self.backend.delete(self.namespace, 5, 5)
+
+        times, offsets = csvbackend._load_index(self.fname)
+        self.assertEqual(len(times), 4)
+        with open(self.fname, 'rb') as csvfile:
+            csvfile.seek(offsets[-1])
+            self.assertEqual(csvfile.readline(),
+                             b'4,1970-01-01T00:00:04Z\r\n')
+
+        self.backend.save(self.namespace, '6', 6)
+        result = self.backend.get(self.namespace, 4, 6)
+        self.assertEqual([row[1] for row in result], ['4', '6'])
+
+    def test_save_keeps_files_open(self):
+        """Test that save reuses the append handle of a namespace."""
+        with mock.patch('napps.kytos.kronos.backends.csvbackend.open',
+                        wraps=open) as mock_open:
+            for timestamp in range(5):
+                self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        opened = [call[0][0] for call in mock_open.call_args_list]
+        self.assertEqual(opened.count(self.fname), 1)
+
+    def test_save_closes_least_recently_used_file(self):
+        """Test that no more than MAX_OPEN_FILES files are kept open."""
+        self.backend._files._max_files = 2
+
+        for namespace in ('kytos.kronos.a', 'kytos.kronos.b',
+                          'kytos.kronos.a', 'kytos.kronos.c'):
+            self.backend.save(namespace, '1', 0)
+
+        day = '1970-01-01'
+        self.assertEqual(list(self.backend._files._files),
+                         [self.backend._segment_fname('kytos.kronos.a', day),
+                          self.backend._segment_fname('kytos.kronos.c', day)])
+        result = self.backend.get('kytos.kronos.b', 0, 0)
+        self.assertEqual(result, [['1970-01-01T00:00:00Z', '1']])
+
+    def test_save_flushes_after_flush_rows(self):
+        """Test that a file is flushed once FLUSH_ROWS rows are pending."""
+        self.backend._files._flush_rows = 3
+        self.backend._files._flush_interval = 60
+
+        for timestamp in range(3):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+
+        self.assertEqual(self.backend._files._files[self.fname].pending, 0)
+        with open(self.fname) as csvfile:
+            self.assertEqual(len(csvfile.read().splitlines()), 4)
+
+    def test_index_follows_flushed_rows(self):
+        """Test that index entries are written after their rows."""
+        self.backend._files._flush_rows = 3
+        self.backend._files._flush_interval = 60
+
+        for timestamp in range(2):
+            self.backend.save(self.namespace, str(timestamp), timestamp)
+        self.assertIsNone(csvbackend._load_index(self.fname))
+
+        self.backend.save(self.namespace, '2', 2)
+        times, offsets = csvbackend._load_index(self.fname)
+        self.assertEqual(len(times), 3)
+        with open(self.fname, 'rb') as csvfile:
+            self.assertLess(offsets[-1], len(csvfile.read()))
+
+    def test_shutdown_closes_files(self):
+        """Test that shutdown flushes and closes every open file."""
+        self.backend.save(self.namespace, '1', 0)
+        handle = self.backend._files._files[self.fname]
+
+        self.backend.shutdown()
+
+        self.assertTrue(handle.file.closed)
+        self.assertEqual(self.backend._files._files, {})
+
+    def test_save_splits_segments(self):
+        """Test that rows are stored in one file per segment."""
+        self.settings.BACKENDS['CSV']['SEGMENT'] = 'hourly'
+        backend = CSVBackend(self.settings)
+
+        for timestamp in (0, 3600, 3601, 7200):
+            backend.save(self.namespace, str(timestamp), timestamp)
+        backend.shutdown()
+
+        folder = Path(self.tmpdir.name, f'foo_{self.namespace}')
+        self.assertEqual(sorted(path.name for path in folder.glob('*.csv')),
+                         ['1970-01-01T00.csv', '1970-01-01T01.csv',
+                          '1970-01-01T02.csv'])
+
+    def test_get_reads_only_overlapping_segments(self):
+        """Test that get opens only the segments inside the range."""
+        self.settings.BACKENDS['CSV']['SEGMENT'] = 'hourly'
+        backend = CSVBackend(self.settings)
+        for timestamp in (0, 3600, 3601, 7200):
+            backend.save(self.namespace, str(timestamp), timestamp)
+
+        with mock.patch('napps.kytos.kronos.backends.csvbackend.'
+                        '_iter_search', return_value=[]) as mock_search:
+            backend.get(self.namespace, 3600, 3700)
+        backend.shutdown()
+
+        fnames = [call[0][2] for call in mock_search.call_args_list]
+        self.assertEqual([Path(fname).name for fname in fnames],
+                         ['1970-01-01T01.csv'])
+
+    def test_get_many(self):
+        """Test that a pattern returns each matching namespace."""
+        other = 'kytos.kronos.telemetry.switches.2.bytes_in'
+        self.backend.save(self.namespace, '1', 0)
+        self.backend.save(other, '2', 10)
+        self.backend.save('kytos.kronos.telemetry.switches.2.bytes_out', '3',
+                          10)
+
+        points = self.backend.get_many('kytos.kronos.telemetry.switches.*.'
+                                       'bytes_in', 0, 20)
+        self.assertEqual(points, {
+            self.namespace: [['1970-01-01T00:00:00Z', '1']],
+            other: [['1970-01-01T00:00:10Z', '2']]})
+
+        with self.assertRaises(NamespaceError):
+            self.backend.get_many('kytos.kronos.other.*', 0, 20)
+
+    def test_delete_unlinks_inner_segments(self):
+        """Test that delete removes whole segments inside the range."""
+        self.settings.BACKENDS['CSV']['SEGMENT'] = 'hourly'
+        backend = CSVBackend(self.settings)
+        for timestamp in (0, 1800, 3600, 7200, 7300):
+            backend.save(self.namespace, str(timestamp), timestamp)
+
+        with mock.patch.object(backend, '_rewrite',
+                               wraps=backend._rewrite) as mock_rewrite:
+            backend.delete(self.namespace, 1000, 7200)
+
+        fnames = [Path(call[0][0]).name
+                  for call in mock_rewrite.call_args_list]
+        self.assertEqual(fnames, ['1970-01-01T00.csv', '1970-01-01T02.csv'])
+        folder = Path(self.tmpdir.name, f'foo_{self.namespace}')
+        self.assertFalse((folder / '1970-01-01T01.csv').exists())
+
+        result = backend.get(self.namespace, 0, 8000)
+        backend.shutdown()
+        self.assertEqual([row[1] for row in result], ['0', '7300'])
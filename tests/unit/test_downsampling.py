@@ -0,0 +1,34 @@
+"""Module to test the downsampling of query results."""
+from unittest import TestCase
+
+from napps.kytos.kronos.downsampling import lttb
+from napps.kytos.kronos.utils import convert_to_iso
+
+
+class TestDownsampling(TestCase):
+    """Test the LTTB downsampling."""
+
+    def setUp(self):
+        """Create a flat series with a single spike."""
+        self.points = [[convert_to_iso(second), 1] for second in range(1000)]
+        self.points[500][1] = 100
+
+    def test_lttb(self):
+        """Test that the ends and the spike are kept."""
+        result = lttb(self.points, 10)
+
+        self.assertEqual(len(result), 10)
+        self.assertEqual(result[0], self.points[0])
+        self.assertEqual(result[-1], self.points[-1])
+        self.assertIn(self.points[500], result)
+
+    def test_lttb_small_result(self):
+        """Test that results smaller than max_points are unchanged."""
+        self.assertEqual(lttb(self.points[:5], 10), self.points[:5])
+
+    def test_lttb_non_numeric(self):
+        """Test that points without a numeric value are left out."""
+        points = [[convert_to_iso(second), None] for second in range(20)]
+        points[3][1] = '3'
+
+        self.assertEqual(lttb(points, 10), [[convert_to_iso(3), '3']])
@@ -0,0 +1,200 @@
+"""Module to test the in-memory hot tier."""
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.backends.csvbackend import CSVBackend
+from napps.kytos.kronos.backends.hottier import HotTierBackend, RingBuffer
+
+
+class TestRingBuffer(TestCase):
+    """Test the ring buffer of points."""
+
+    def test_append_wraps_around(self):
+        """Test that the oldest points are replaced once full."""
+        ring = RingBuffer(3)
+        for time in range(5):
+            self.assertTrue(ring.append(time, time * 10))
+
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.oldest, 2)
+        self.assertEqual(ring.newest, 4)
+        self.assertEqual(ring.between(0, 10), [(2, 20), (3, 30), (4, 40)])
+
+    def test_between(self):
+        """Test the search of a range after wrapping around."""
+        ring = RingBuffer(4)
+        for time in range(0, 60, 10):
+            ring.append(time, time)
+
+        self.assertEqual(ring.between(25, 45), [(30, 30), (40, 40)])
+        self.assertEqual(ring.between(51, 60), [])
+
+    def test_append_out_of_order(self):
+        """Test that an older point is not added."""
+        ring = RingBuffer(3)
+        ring.append(10, 1)
+        self.assertFalse(ring.append(5, 2))
+        self.assertEqual(len(ring), 1)
+
+
+class TestHotTierBackend(TestCase):
+    """Test methods in the hot tier backend."""
+
+    def setUp(self):
+        """Wrap a mocked backend."""
+        settings = mock.MagicMock()
+        settings.HOT_TIER = {'SIZE': 3, 'MAX_NAMESPACES': 2}
+        self.backend = mock.MagicMock(VALUE_TYPE=float)
+        self.backend.save_many.return_value = []
+        self.hot_tier = HotTierBackend(self.backend, settings)
+        self.namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+
+    def _save_series(self):
+        for timestamp in range(10, 50, 10):
+            self.hot_tier.save(self.namespace, {'bytes_in': timestamp},
+                               timestamp)
+
+    def test_save(self):
+        """Test that data is saved in the backend."""
+        self.hot_tier.save(self.namespace, {'bytes_in': 1}, 10)
+        self.backend.save.assert_called_with(self.namespace,
+                                             {'bytes_in': 1}, 10)
+
+    @mock.patch('napps.kytos.kronos.backends.hottier.now_nanoseconds',
+                return_value=21 * 10**9)
+    @mock.patch('napps.kytos.kronos.backends.wrapper.now_nanoseconds',
+                return_value=20 * 10**9)
+    def test_save_without_timestamp(self, *_):
+        """Test that the backend and the tier keep the same default time."""
+        self.hot_tier.save(self.namespace, {'bytes_in': 1})
+        self.hot_tier.save_many([(self.namespace, {'bytes_out': 2}, None)],
+                                'ms')
+
+        self.backend.save.assert_called_with(self.namespace,
+                                             {'bytes_in': 1}, 20)
+        self.backend.save_many.assert_called_with(
+            [(self.namespace, {'bytes_out': 2}, 20000)], 'ms')
+        self.assertEqual(self.hot_tier.get(f'{self.namespace}.bytes_in',
+                                           20, 20),
+                         [['1970-01-01T00:00:20Z', 1.0]])
+
+    def test_get_from_memory(self):
+        """Test that recent points are returned without the backend."""
+        self._save_series()
+
+        result = self.hot_tier.get(f'{self.namespace}.bytes_in', 20, 35)
+
+        self.backend.get.assert_not_called()
+        self.assertEqual(result, [['1970-01-01T00:00:20Z', 20.0],
+                                  ['1970-01-01T00:00:30Z', 30.0]])
+
+    def test_iter_get(self):
+        """Test that iter_get streams from memory or from the backend."""
+        self._save_series()
+
+        points = self.hot_tier.iter_get(f'{self.namespace}.bytes_in', 40)
+        self.assertEqual(list(points), [['1970-01-01T00:00:40Z', 40.0]])
+        self.backend.iter_get.assert_not_called()
+
+        self.hot_tier.iter_get(f'{self.namespace}.bytes_in', 0, 40)
+        self.backend.iter_get.assert_called_once()
+
+    def test_get_pages(self):
+        """Test that limit and after are applied to buffered points."""
+        self._save_series()
+
+        result = self.hot_tier.get(f'{self.namespace}.bytes_in', 20, 40,
+                                   limit=1, after='1970-01-01T00:00:20Z')
+
+        self.backend.get.assert_not_called()
+        self.assertEqual(result, [['1970-01-01T00:00:30Z', 30.0]])
+
+    def test_get_older_range(self):
+        """Test that a range older than the buffer uses the backend."""
+        self._save_series()
+
+        self.hot_tier.get(f'{self.namespace}.bytes_in', 10, 40)
+
+        self.backend.get.assert_called_with(f'{self.namespace}.bytes_in',
+                                            10, 40)
+
+    def test_get_with_method(self):
+        """Test that aggregations use the backend."""
+        self._save_series()
+
+        self.hot_tier.get(f'{self.namespace}.bytes_in', 20, 40, 'mean')
+
+        self.backend.get.assert_called_once()
+
+    def test_save_out_of_order(self):
+        """Test that a point older than the buffer drops the buffer."""
+        self._save_series()
+        self.hot_tier.save(self.namespace, {'bytes_in': 1}, 25)
+
+        self.hot_tier.get(f'{self.namespace}.bytes_in', 30, 40)
+
+        self.backend.get.assert_called_once()
+
+    def test_save_many(self):
+        """Test that records rejected by the backend are not buffered."""
+        self.backend.save_many.return_value = [(1, ValueError())]
+        records = [(self.namespace, {'bytes_in': 1}, 10),
+                   (self.namespace, {'bytes_in': 'x'}, 20),
+                   (self.namespace, {'bytes_in': 3}, 30)]
+
+        self.hot_tier.save_many(records)
+        result = self.hot_tier.get(f'{self.namespace}.bytes_in', 10, 30)
+
+        self.assertEqual(result, [['1970-01-01T00:00:10Z', 1.0],
+                                  ['1970-01-01T00:00:30Z', 3.0]])
+
+    def test_delete(self):
+        """Test that deleting a namespace drops its buffers."""
+        self._save_series()
+
+        self.hot_tier.delete(self.namespace)
+        self.hot_tier.get(f'{self.namespace}.bytes_in', 30, 40)
+
+        self.backend.delete.assert_called_with(self.namespace, None, None)
+        self.backend.get.assert_called_once()
+
+    def test_delete_oldest(self):
+        """Test that deleting old points keeps the newer buffered points."""
+        self._save_series()
+
+        self.hot_tier.delete(self.namespace, None, 20)
+        result = self.hot_tier.get(f'{self.namespace}.bytes_in', 30, 40)
+
+        self.backend.get.assert_not_called()
+        self.assertEqual(len(result), 2)
+
+    def test_max_namespaces(self):
+        """Test that the least recently saved namespace is evicted."""
+        for field in ('a', 'b', 'c'):
+            self.hot_tier.save(self.namespace, {field: 1}, 10)
+
+        self.hot_tier.get(f'{self.namespace}.a', 10, 20)
+        self.backend.get.assert_called_once()
+        self.hot_tier.get(f'{self.namespace}.c', 10, 20)
+        self.backend.get.assert_called_once()
+
+    def test_over_csv_backend(self):
+        """Test that memory and CSV files return the same series."""
+        with TemporaryDirectory() as path:
+            settings = mock.MagicMock()
+            settings.BACKENDS = {'CSV': {'USER': 'foo', 'PATH': path}}
+            settings.HOT_TIER = {'SIZE': 3, 'MAX_NAMESPACES': 2}
+            backend = CSVBackend(settings)
+            hot_tier = HotTierBackend(backend, settings)
+            namespace = f'{self.namespace}.bytes_in'
+
+            for timestamp in range(10, 50, 10):
+                hot_tier.save(self.namespace, {'bytes_in': timestamp},
+                              timestamp)
+            hot = hot_tier.get(namespace, 30, 40)
+            cold = backend.get(namespace, 30, 40)
+            backend.shutdown()
+
+        self.assertEqual(hot, [['1970-01-01T00:00:30Z', '30'],
+                               ['1970-01-01T00:00:40Z', '40']])
+        self.assertEqual(hot, cold)
@@ -0,0 +1,240 @@
+"""Module to test the asyncio InfluxDB backend.
+
+isort:skip_file
+"""
+import asyncio
+import json
+import sys
+
+# pylint: disable=wrong-import-order,wrong-import-position
+
+from unittest import TestCase, mock
+
+sys.modules['aiohttp'] = mock.MagicMock()
+sys.modules['influxdb'] = mock.MagicMock()
+
+import napps.kytos.kronos.backends.influx as influx
+import napps.kytos.kronos.backends.influx_async as influx_async
+from napps.kytos.kronos.utils import BackendUnavailableError
+
+# pylint: enable=wrong-import-order,wrong-import-position
+
+
+class InfluxDBClientError(Exception):
+    """Client error of the mocked influxdb module."""
+
+
+class InfluxDBServerError(Exception):
+    """Server error of the mocked influxdb module."""
+
+
+def _patch_exceptions(test):
+    """Give the mocked influxdb modules their exception classes."""
+    for module in (influx, influx_async):
+        patcher = mock.patch.multiple(module.exceptions,
+                                      InfluxDBClientError=InfluxDBClientError,
+                                      InfluxDBServerError=InfluxDBServerError)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
+class TestAsyncInfluxClient(TestCase):
+    """Test the client of the InfluxDB HTTP API."""
+
+    def setUp(self):
+        """Start a client on its event loop."""
+        _patch_exceptions(self)
+        self.client = influx_async.AsyncInfluxClient('localhost', 8086, 'foo',
+                                                     'bar', 'kytos',
+                                                     batch_size=2)
+        self.client._session = mock.MagicMock()
+        self.client._session.close = mock.AsyncMock()
+
+    def tearDown(self):
+        """Stop the event loop."""
+        self.client.close()
+
+    def test_line_protocol(self):
+        """Test the encoding of points as line protocol."""
+        points = [{'measurement': 'kytos.kronos.a b', 'time': 10**9,
+                   'fields': {'bytes_in': 1.5, 'up': True, 'name': 'a"b',
+                              'errors': 3}}]
+
+        self.assertEqual(influx_async._line_protocol(points),
+                         b'kytos.kronos.a\\ b bytes_in=1.5,up=true,'
+                         b'name="a\\"b",errors=3i 1000000000')
+
+    def test_write_points_concurrently(self):
+        """Test that the batches of a write are in flight together."""
+        in_flight = []
+        peaks = []
+        bodies = []
+
+        async def send(method, path, params, data=None):
+            in_flight.append(path)
+            bodies.append((method, path, params['precision'], data))
+            await asyncio.sleep(0.01)
+            peaks.append(len(in_flight))
+            in_flight.remove(path)
+            return b''
+
+        self.client._send = send
+        points = [{'measurement': 'kytos.kronos.a', 'time': time,
+                   'fields': {'bytes_in': 1.0}} for time in range(5)]
+
+        self.client.write_points(points, time_precision='n')
+
+        self.assertEqual(len(bodies), 3)
+        self.assertEqual(max(peaks), 3)
+        self.assertEqual(bodies[2], ('POST', 'write', 'n',
+                                     b'kytos.kronos.a bytes_in=1.0 4'))
+
+    def test_write_points_fail(self):
+        """Test that a failed batch fails the write."""
+        self.client._send = mock.AsyncMock(
+            side_effect=[b'', InfluxDBServerError()])
+        points = [{'measurement': 'kytos.kronos.a', 'time': time,
+                   'fields': {'bytes_in': 1.0}} for time in range(4)]
+
+        with self.assertRaises(InfluxDBServerError):
+            self.client.write_points(points)
+
+    def test_query(self):
+        """Test that queries return the result of their statement."""
+        series = {'name': 'kytos.kronos.a', 'columns': ['time', 'bytes_in'],
+                  'values': [['1970-01-01T00:00:00Z', 1]]}
+        self.client._send = mock.AsyncMock(return_value=json.dumps(
+            {'results': [{'statement_id': 0, 'series': [series]}]}))
+
+        result = self.client.query('SELECT * FROM "kytos.kronos.a"',
+                                   chunked=True, chunk_size=0)
+        self.assertEqual(result.raw['series'], [series])
+        self.client._send.assert_awaited_with(
+            'GET', 'query', {'q': 'SELECT * FROM "kytos.kronos.a"',
+                             'db': 'kytos'})
+
+        self.client._send.return_value = json.dumps(
+            {'results': [{'statement_id': 0, 'series': [
+                {'name': 'measurements', 'columns': ['name'],
+                 'values': [['kytos.kronos.a']]}]}]})
+        self.assertEqual(self.client.get_list_measurements(),
+                         [{'name': 'kytos.kronos.a'}])
+
+        self.client.query('DELETE FROM "kytos.kronos.a"')
+        self.assertEqual(self.client._send.await_args[0][0], 'POST')
+
+        self.client._send.return_value = json.dumps(
+            {'results': [{'statement_id': 0, 'error': 'bad query'}]})
+        with self.assertRaises(InfluxDBClientError):
+            self.client.query('SELECT')
+
+    def test_open_maps_errors(self):
+        """Test that error statuses raise the influxdb exceptions."""
+        response = mock.MagicMock()
+        response.read = mock.AsyncMock(return_value=b'{"error": "down"}')
+        self.client._session.request = mock.AsyncMock(return_value=response)
+
+        response.status = 503
+        with self.assertRaises(InfluxDBServerError):
+            self.client.run(self.client._open('query', {'q': 'SHOW'}))
+
+        response.status = 400
+        with self.assertRaises(InfluxDBClientError):
+            self.client.run(self.client._open('query', {'q': 'SHOW'}))
+        self.assertEqual(self.client._session.request.await_args[1]['params'],
+                         {'u': 'foo', 'p': 'bar', 'q': 'SHOW'})
+
+    def test_request_streams_lines(self):
+        """Test that streamed responses are read one line at a time."""
+        response = mock.MagicMock(status=200)
+        response.content.readline = mock.AsyncMock(
+            side_effect=[b'{"results": []}\n', b''])
+        self.client._session.request = mock.AsyncMock(return_value=response)
+
+        streamed = self.client.request('query', params={'q': 'SELECT'},
+                                       stream=True)
+        self.assertEqual(list(streamed.iter_lines()), [b'{"results": []}'])
+        streamed.close()
+        self.client.run(asyncio.sleep(0))
+
+        response.close.assert_called_once()
+
+
+class TestAsyncInfluxBackend(TestCase):
+    """Test the backend driving the asyncio client."""
+
+    def setUp(self):
+        """Start the backend, without spool and retries."""
+        _patch_exceptions(self)
+        settings = mock.MagicMock()
+        overrides = {'SPOOL_PATH': '', 'RETRIES': 0, 'BATCH_SIZE': 2}
+        settings.BACKENDS.get.return_value.get.side_effect = \
+            lambda key, default: overrides.get(key, mock.DEFAULT)
+        self.backend = influx_async.AsyncInfluxBackend(settings)
+        self.backend._get_database = mock.MagicMock(return_value=True)
+        self.client = self.backend._client
+        self.client._session = mock.MagicMock()
+        self.client._session.close = mock.AsyncMock()
+        self.client._send = mock.AsyncMock(return_value=b'')
+
+    def tearDown(self):
+        """Stop the background threads and the event loop."""
+        self.backend.shutdown()
+
+    def test_flush_writes_batches_at_once(self):
+        """Test that flush writes every batch through the client."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        for timestamp in range(5):
+            self.backend.save(namespace, {'bytes_in': timestamp}, timestamp)
+
+        self.backend.flush()
+
+        self.assertEqual(self.client._send.await_count, 3)
+        self.assertEqual(self.backend._buffer, [])
+
+    def test_flush_writes_past_rejected_batch(self):
+        """Test that a rejected batch does not stop the other writes."""
+        self.client._send.side_effect = [b'', InfluxDBClientError(), b'']
+        self.backend._buffer = [{'measurement': 'kytos.kronos.a',
+                                 'time': time, 'fields': {'bytes_in': 1.0}}
+                                for time in range(5)]
+
+        self.backend.flush()
+
+        self.assertEqual(self.client._send.await_count, 3)
+
+    def test_flush_spools_when_unavailable(self):
+        """Test that flush spools the points when InfluxDB is down."""
+        self.backend._spool = mock.MagicMock()
+        self.backend._buffer = [{'measurement': 'kytos.kronos.a', 'time': 0,
+                                 'fields': {'bytes_in': 1.0}}]
+        self.client._send.side_effect = InfluxDBServerError()
+
+        self.backend.flush()
+
+        self.backend._spool.append.assert_called_once_with(
+            [{'measurement': 'kytos.kronos.a', 'time': 0,
+              'fields': {'bytes_in': 1.0}}])
+
+        self.backend._spool = None
+        self.backend._buffer = [{'measurement': 'kytos.kronos.a', 'time': 0,
+                                 'fields': {'bytes_in': 1.0}}]
+        with self.assertRaises(BackendUnavailableError):
+            self.backend.flush()
+        self.assertEqual(len(self.backend._buffer), 1)
+        # The circuit is open, so shutdown would fail to write the point.
+        self.backend._buffer = []
+
+    def test_flush_spools_unavailable_batches(self):
+        """Test that only the batches failed as unavailable are spooled."""
+        self.backend._spool = mock.MagicMock()
+        points = [{'measurement': 'kytos.kronos.a', 'time': time,
+                   'fields': {'bytes_in': 1.0}} for time in range(5)]
+        self.backend._buffer = list(points)
+        self.client._send.side_effect = [InfluxDBClientError(),
+                                         InfluxDBServerError(), b'']
+
+        self.backend.flush()
+
+        self.backend._spool.append.assert_called_once_with(points[2:4])
+        self.assertIn('kytos.kronos.a', self.backend._measurements._names)
@@ -5,7 +5,9 @@ can be organized in two parts. The first consists the tests to private methods
 for the module are the tests for the InfluxBackend class.
 isort:skip_file
 """
+import json
 import sys
+from threading import Event, Thread
 
 # pylint: disable=wrong-import-order,wrong-import-position
 
@@ -17,6 +19,11 @@ sys.modules['influxdb.exceptions'] = mock.MagicMock()
 import napps.kytos.kronos.backends.influx as influx
 from napps.kytos.kronos.utils import (BackendError, NamespaceError)
 
+# The circuit breaker checks the exceptions of the client calls against the
+# server errors, which the mocked module does not define.
+influx.exceptions.InfluxDBServerError = type('InfluxDBServerError',
+                                             (Exception,), {})
+
 # pylint: enable=wrong-import-order,wrong-import-position
 # pylint: disable=R0904,E0012, Too many public methods
 
@@ -27,6 +34,11 @@ class TestInfluxBackend(TestCase):
     def setUp(self):
         """Start Influx Backend."""
         settings = mock.MagicMock()
+        # Failed writes are neither retried nor spooled, unless a test sets
+        # a spool.
+        overrides = {'SPOOL_PATH': '', 'RETRIES': 0}
+        settings.BACKENDS.get.return_value.get.side_effect = \
+            lambda key, default: overrides.get(key, mock.DEFAULT)
         self.backend = influx.InfluxBackend(settings)
 
         # The original_write_points allow to recover the original write_points
@@ -40,6 +52,7 @@ class TestInfluxBackend(TestCase):
 
     def tearDown(self):
         """Reset write_points to original."""
+        self.backend.shutdown()
         self.backend._client.write_points = self.original_write_points
         influx._query_assemble = self.original_query_assemble
 
@@ -113,6 +126,58 @@ class TestInfluxBackend(TestCase):
                           f'\'{str(start)}\' AND time <=\'{str(end)}\'')
         self.assertEqual(query, expected_query)
 
+    def test_query_assemble_select_with_limit_and_after(self):
+        """Test query_assemble with a LIMIT and an exclusive start."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+
+        query = influx._query_assemble('SELECT', namespace,
+                                       '1970-01-01T00:00:00Z', None,
+                                       'bytes_in', limit=100,
+                                       after='1970-01-01T00:00:05Z')
+        expected_query = (f'SELECT bytes_in FROM "{namespace}" WHERE time  >= '
+                          '\'1970-01-01T00:00:00Z\' AND time > '
+                          '\'1970-01-01T00:00:05Z\' LIMIT 100')
+        self.assertEqual(query, expected_query)
+
+    def test_query_assemble_select_group_after(self):
+        """Test that a grouped page starts at the bucket after the cursor."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+
+        query = influx._query_assemble('SELECT', namespace,
+                                       '1970-01-01T00:00:00Z', None,
+                                       'bytes_in', 'mean', '1m', limit=10,
+                                       after='1970-01-01T00:01:00Z')
+        expected_query = (f'SELECT mean(bytes_in) FROM "{namespace}" WHERE '
+                          'time  >= \'1970-01-01T00:00:00Z\' AND time >= '
+                          '\'1970-01-01T00:02:00Z\' GROUP BY time(1m) '
+                          'LIMIT 10')
+        self.assertEqual(query, expected_query)
+
+    def test_query_assemble_select_fields(self):
+        """Test query_assemble selecting many fields with a method."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+
+        query = influx._query_assemble('SELECT', namespace,
+                                       '1970-01-01T00:00:00Z', None,
+                                       ('bytes_in', 'bytes_out'), 'mean')
+        expected_query = ('SELECT mean("bytes_in") AS "bytes_in", '
+                          'mean("bytes_out") AS "bytes_out" FROM '
+                          f'"{namespace}" WHERE time  >= '
+                          '\'1970-01-01T00:00:00Z\'')
+        self.assertEqual(query, expected_query)
+
+    def test_query_assemble_select_regex(self):
+        """Test query_assemble selecting the measurements of a regex."""
+        regex = influx.namespace_regex('kytos.kronos.switches.*')
+
+        query = influx._query_assemble('SELECT', regex,
+                                       '1970-01-01T00:00:00Z', None,
+                                       'bytes_in')
+        expected_query = ('SELECT bytes_in FROM '
+                          r'/^kytos\.kronos\.switches\.[^.]*$/ WHERE time  >= '
+                          '\'1970-01-01T00:00:00Z\'')
+        self.assertEqual(query, expected_query)
+
     def test_query_assemble_delete(self):
         """Test query_assemble with DELETE clause."""
         clause = 'DELETE'
@@ -165,39 +230,6 @@ class TestInfluxBackend(TestCase):
                           f'GROUP BY time(*) fill(none)')
         self.assertEqual(query, expected_query)
 
-    def test_validate_namespace_success(self):
-        """Test to check the success in namespace validation."""
-        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
-
-        result = influx._validate_namespace(namespace)
-
-        self.assertEqual(result, True)
-
-    def test_validate_namespace_fail_with_invalid_namespace_value(self):
-        """Test validate_namespace when its called with invalid value."""
-        namespace = 1234
-
-        with self.assertRaises(TypeError):
-            influx._validate_namespace(namespace)
-
-    def test_validate_namespace_fail_without_prefix(self):
-        """Test validate_namespace when its called without prefix."""
-        namespace = 'telemetry.switches.1.interfaces.232.bytes_in'
-
-        with self.assertRaises(NamespaceError):
-            influx._validate_namespace(namespace)
-
-    def test_extract_field(self):
-        """Test extract_field method."""
-        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
-
-        result = influx._extract_field(namespace)
-
-        expected_value = ('kytos.kronos.telemetry.switches.1.interfaces.232',
-                          'bytes_in')
-
-        self.assertEqual(result, expected_value)
-
     # Second part: Testing methods of InfluxBackend class.
     @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
                 '_write_endpoints')
@@ -207,18 +239,204 @@ class TestInfluxBackend(TestCase):
         value = {'bytes_in': 1234}
         timestamp = '0'
         self.backend.save(namespace, value, timestamp)
+        self.backend.flush()
 
         # Expected data to be used in _write_endpoints call.
         measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
 
         data = [{
                 'measurement': measurement,
-                'time': '1970-01-01T00:00:00Z',
+                'time': 0,
                 'fields': {'bytes_in': 1234.0}
                 }]
 
         mock_influx_write_endpoints.assert_called_with(data)
 
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_save_buffers_points(self, mock_influx_write_endpoints):
+        """Test that save only buffers points until a batch is full."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        # Stop the flusher thread so that only the size trigger is tested.
+        self.backend.shutdown()
+        self.backend._batch_size = 10
+        self.backend._max_buffer_size = 100
+        self.backend._flush_event = mock.MagicMock()
+
+        for timestamp in range(9):
+            self.backend.save(namespace, {'bytes_in': 1}, timestamp)
+
+        self.assertEqual(len(self.backend._buffer), 9)
+        self.backend._flush_event.set.assert_not_called()
+        mock_influx_write_endpoints.assert_not_called()
+
+        self.backend.save(namespace, {'bytes_in': 1}, 9)
+        self.backend._flush_event.set.assert_called_once()
+        self.backend.flush()
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_save_flushes_when_buffer_is_full(self,
+                                              mock_influx_write_endpoints):
+        """Test that save flushes synchronously with a full buffer."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        self.backend._batch_size = 2
+        self.backend._max_buffer_size = 4
+
+        for timestamp in range(4):
+            self.backend.save(namespace, {'bytes_in': 1}, timestamp)
+
+        self.assertEqual(self.backend._buffer, [])
+        self.assertEqual(mock_influx_write_endpoints.call_count, 2)
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_flush_writes_in_batches(self, mock_influx_write_endpoints):
+        """Test that flush splits the buffer in BATCH_SIZE writes."""
+        self.backend._batch_size = 2
+        self.backend._buffer = [{'time': index} for index in range(5)]
+
+        self.backend.flush()
+
+        calls = [mock.call([{'time': 0}, {'time': 1}]),
+                 mock.call([{'time': 2}, {'time': 3}]),
+                 mock.call([{'time': 4}])]
+        mock_influx_write_endpoints.assert_has_calls(calls)
+        self.assertEqual(self.backend._buffer, [])
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_flush_skips_rejected_batch(self, mock_influx_write_endpoints):
+        """Test that a rejected batch does not drop the following ones."""
+        self.backend._batch_size = 2
+        self.backend._buffer = [{'time': index} for index in range(5)]
+        mock_influx_write_endpoints.side_effect = [None, BackendError(), None]
+
+        self.backend.flush()
+
+        mock_influx_write_endpoints.assert_called_with([{'time': 4}])
+        self.assertEqual(mock_influx_write_endpoints.call_count, 3)
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_shutdown_flushes_buffer(self, mock_influx_write_endpoints):
+        """Test that shutdown stops the flusher and writes pending points."""
+        self.backend._buffer = [{'time': 0}]
+
+        self.backend.shutdown()
+
+        self.assertFalse(self.backend._flusher.is_alive())
+        mock_influx_write_endpoints.assert_called_with([{'time': 0}])
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_flush_spools_when_unavailable(self, mock_influx_write_endpoints):
+        """Test that flush spools the batches left when InfluxDB is down."""
+        self.backend._spool = mock.MagicMock()
+        self.backend._batch_size = 2
+        self.backend._buffer = [{'time': index} for index in range(5)]
+        mock_influx_write_endpoints.side_effect = [
+            None, influx.BackendUnavailableError()]
+
+        self.backend.flush()
+
+        self.backend._spool.append.assert_called_once_with(
+            [{'time': 2}, {'time': 3}, {'time': 4}])
+        self.assertEqual(mock_influx_write_endpoints.call_count, 2)
+
+        self.backend._spool = None
+        self.backend._buffer = [{'time': 5}]
+        mock_influx_write_endpoints.side_effect = \
+            influx.BackendUnavailableError()
+        with self.assertRaises(BackendError):
+            self.backend.flush()
+        self.assertEqual(self.backend._buffer, [{'time': 5}])
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_flush_requeues_after_error(self, mock_influx_write_endpoints):
+        """Test that an unexpected error keeps the following batches."""
+        self.backend._batch_size = 2
+        self.backend._buffer = [{'time': index} for index in range(5)]
+        mock_influx_write_endpoints.side_effect = [None, ValueError()]
+
+        with self.assertRaises(ValueError):
+            self.backend.flush()
+
+        self.assertEqual(self.backend._buffer, [{'time': 4}])
+
+    def test_requeue_keeps_max_buffer_size(self):
+        """Test that requeued points drop the oldest beyond the limit."""
+        points = [{'measurement': 'kytos.kronos.switch', 'time': time}
+                  for time in range(5)]
+        self.backend.shutdown()
+        self.backend._max_buffer_size = 3
+        self.backend._buffer = points[3:]
+
+        self.backend._requeue(points[1:3])
+
+        self.assertEqual(self.backend._buffer, points[2:])
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.flush')
+    def test_flush_loop_survives_error(self, mock_influx_flush):
+        """Test that an unexpected error does not stop the flusher."""
+        self.backend.shutdown()
+        self.backend._stop_event = mock.MagicMock()
+        self.backend._stop_event.is_set.side_effect = [False, False, True]
+        self.backend._flush_event = mock.MagicMock()
+        mock_influx_flush.reset_mock()
+        mock_influx_flush.side_effect = [ValueError(), None]
+
+        self.backend._flush_loop()
+
+        self.assertEqual(mock_influx_flush.call_count, 2)
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_write_endpoints')
+    def test_replay(self, mock_influx_write_endpoints):
+        """Test that replay writes spooled batches until a write fails."""
+        self.backend.shutdown()
+        self.backend._stop_event = mock.MagicMock()
+        self.backend._stop_event.is_set.return_value = False
+        self.backend._batch_size = 2
+        self.backend._replay_rate = 10
+        self.backend._spool = spool = mock.MagicMock()
+        spool.pending.side_effect = [30, 20, 10]
+        spool.read.return_value = ([{'time': 0}, {'time': 1}], 20)
+        mock_influx_write_endpoints.side_effect = [
+            None, BackendError(), influx.BackendUnavailableError()]
+
+        self.backend._replay()
+
+        spool.read.assert_called_with(2)
+        self.assertEqual(spool.commit.call_args_list,
+                         [mock.call(20, 2), mock.call(20, 2)])
+        self.backend._stop_event.wait.assert_called_with(0.2)
+
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_buffer_points')
+    def test_save_many(self, mock_influx_buffer_points):
+        """Test that save_many buffers valid records and reports the rest."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        records = [(namespace, {'bytes_in': 1}, '0'),
+                   (namespace, {'bytes_in': 'abc'}, '0'),
+                   ('telemetry', {'bytes_in': 1}, '0'),
+                   (namespace, {'bytes_out': 2}, '0')]
+
+        errors = self.backend.save_many(records)
+
+        self.assertEqual([position for position, _ in errors], [1, 2])
+        self.assertIsInstance(errors[0][1], ValueError)
+        self.assertIsInstance(errors[1][1], NamespaceError)
+        points = mock_influx_buffer_points.call_args[0][0]
+        self.assertEqual([point['fields'] for point in points],
+                         [{'bytes_in': 1.0}, {'bytes_out': 2.0}])
+
+        self.backend.save_many([(namespace, {'bytes_in': 1},
+                                 1700000000123456789)], 'ns')
+        points = mock_influx_buffer_points.call_args[0][0]
+        self.assertEqual(points[0]['time'], 1700000000123456789)
+
     def test_save_fail_invalid_value(self):
         """Test fail case in save with invalid value."""
         namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
@@ -249,7 +467,8 @@ class TestInfluxBackend(TestCase):
         start = '1970-01-01T00:00:00Z'
         end = '1970-01-12T13:46:40Z'
         mock_influx_get_points.assert_called_with(measurement, start, end,
-                                                  field, method, fill, group)
+                                                  field, method, fill, group,
+                                                  None, None)
 
     def test_get_fail_invalid_namespace(self):
         """Test fail case in save with namespace that not exists."""
@@ -305,6 +524,24 @@ class TestInfluxBackend(TestCase):
         end = '1970-01-12T13:46:40Z'
         mock_influx_delete_points.assert_called_with(measurement, start, end)
 
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_namespace_exists', return_value=True)
+    @mock.patch('napps.kytos.kronos.backends.influx.InfluxBackend.'
+                '_delete_points')
+    def test_delete_discards_buffered_points(self, *_):
+        """Test that buffered points of the deleted range are not written."""
+        measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        self.backend._buffer = [
+            {'measurement': measurement, 'time': 5 * 10**9},
+            {'measurement': measurement, 'time': 20 * 10**9},
+            {'measurement': 'kytos.kronos.other', 'time': 5 * 10**9}]
+
+        self.backend.delete(f'{measurement}.bytes_in', 0, 10)
+
+        self.assertEqual(self.backend._buffer, [
+            {'measurement': measurement, 'time': 20 * 10**9},
+            {'measurement': 'kytos.kronos.other', 'time': 5 * 10**9}])
+
     def test_delete_fail_invalid_namespace(self):
         """Test fail case in save with namespace that not exists."""
         namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
@@ -355,6 +592,7 @@ class TestInfluxBackend(TestCase):
 
     def test_write_endpoints_success(self):
         """Test method write_endpoints."""
+        self.backend._client = mock.MagicMock()
         self.backend._get_database = mock.MagicMock()
         self.backend._get_database.return_value = False
 
@@ -362,11 +600,14 @@ class TestInfluxBackend(TestCase):
 
         data = [{
                 'measurement': measurement,
-                'time': '1970-01-02T10:17:36Z',
+                'time': 123456 * 10**9,
                 'fields': {'bytes_in': 1234.0}
                 }]
 
-        self.backend._client.write_points.assert_called_with(data)
+        self.backend._write_endpoints(data)
+
+        self.backend._client.write_points.assert_called_with(
+            data, time_precision='n')
 
     def test_write_endpoints_fail(self):
         """Test fail case in method write_endpoints."""
@@ -392,6 +633,30 @@ class TestInfluxBackend(TestCase):
         with self.assertRaises(BackendError):
             self.backend._write_endpoints(data)
 
+    def test_write_endpoints_unavailable(self):
+        """Test that connection errors raise BackendUnavailableError."""
+        self.backend._client = mock.MagicMock()
+        self.backend._client.write_points.side_effect = ConnectionError()
+
+        with mock.patch.object(influx.exceptions, 'InfluxDBClientError',
+                               KeyError), \
+                mock.patch.object(influx.exceptions, 'InfluxDBServerError',
+                                  KeyError):
+            with self.assertRaises(influx.BackendUnavailableError):
+                self.backend._write_endpoints([{'time': 0}])
+
+    def test_write_endpoints_breaker_open(self):
+        """Test that writes fail at once while the breaker is open."""
+        self.backend._client = mock.MagicMock()
+        self.backend._breaker = mock.MagicMock()
+        self.backend._breaker.call.side_effect = \
+            influx.BackendUnavailableError()
+        self.backend._get_database = mock.MagicMock(return_value=True)
+
+        with self.assertRaises(influx.BackendUnavailableError):
+            self.backend._write_endpoints([{'time': 0}])
+        self.backend._client.write_points.assert_not_called()
+
     def test_get_database_success(self):
         """Test to check the success the get_database method."""
         self.backend._database = 'database_1'
@@ -456,6 +721,71 @@ class TestInfluxBackend(TestCase):
                                                             chunked=True,
                                                             chunk_size=0)
 
+    def test_get_points_fields(self):
+        """Test that _get_points maps the columns of many fields."""
+        measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        self.backend._client = mock.MagicMock()
+        self.backend._client.query.return_value.raw = {'series': [{
+            'columns': ['time', 'max_bytes_in', 'max_bytes_out'],
+            'values': [['1970-01-01T00:00:00Z', 1, 2]]}]}
+
+        result = self.backend._get_points(measurement, 0, 10, '*', 'max',
+                                          group='1m')
+
+        self.assertEqual(result, [['1970-01-01T00:00:00Z',
+                                   {'bytes_in': 1, 'bytes_out': 2}]])
+
+    def test_get_many(self):
+        """Test that get_many reads every matching measurement at once."""
+        self.backend._client = mock.MagicMock()
+        self.backend._client.get_list_measurements.return_value = [
+            {'name': 'kytos.kronos.switches.1'},
+            {'name': 'kytos.kronos.switches.2'}]
+        self.backend._client.query.return_value.raw = {'series': [
+            {'name': 'kytos.kronos.switches.1',
+             'columns': ['time', 'bytes_in', 'bytes_out', 'errors'],
+             'values': [['1970-01-01T00:00:00Z', 1, 2, 3],
+                        ['1970-01-01T00:00:10Z', None, 4, 5]]},
+            {'name': 'kytos.kronos.switches.2',
+             'columns': ['time', 'bytes_in', 'bytes_out', 'errors'],
+             'values': [['1970-01-01T00:00:00Z', 6, None, None]]}]}
+
+        result = self.backend.get_many('kytos.kronos.switches.*.bytes_*',
+                                       '1970-01-01T00:00:00Z',
+                                       '1970-01-01T00:00:10Z')
+
+        self.assertEqual(result, {
+            'kytos.kronos.switches.1.bytes_in': [['1970-01-01T00:00:00Z', 1]],
+            'kytos.kronos.switches.1.bytes_out': [['1970-01-01T00:00:00Z', 2],
+                                                  ['1970-01-01T00:00:10Z',
+                                                   4]],
+            'kytos.kronos.switches.2.bytes_in': [['1970-01-01T00:00:00Z',
+                                                  6]]})
+        self.assertEqual(self.backend._client.query.call_count, 1)
+
+        with self.assertRaises(NamespaceError):
+            self.backend.get_many('kytos.kronos.routers.*.bytes_in',
+                                  '1970-01-01T00:00:00Z')
+
+    def test_get_many_chunked_series(self):
+        """Test that get_many joins a series split across chunks."""
+        self.backend._client = mock.MagicMock()
+        self.backend._client.get_list_measurements.return_value = [
+            {'name': 'kytos.kronos.switches.1'}]
+        self.backend._client.query.return_value.raw = {'series': [
+            {'name': 'kytos.kronos.switches.1',
+             'columns': ['time', 'bytes_in'],
+             'values': [['1970-01-01T00:00:00Z', 1]]},
+            {'name': 'kytos.kronos.switches.1',
+             'columns': ['time', 'bytes_in'],
+             'values': [['1970-01-01T00:00:10Z', 2]]}]}
+
+        result = self.backend.get_many('kytos.kronos.switches.*.bytes_in',
+                                       '1970-01-01T00:00:00Z')
+
+        self.assertEqual(result, {'kytos.kronos.switches.1.bytes_in': [
+            ['1970-01-01T00:00:00Z', 1], ['1970-01-01T00:00:10Z', 2]]})
+
     def test_get_points_fail(self):
         """Test method _get_points fail case."""
         measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
@@ -479,6 +809,35 @@ class TestInfluxBackend(TestCase):
             self.backend._get_points(measurement, start, end, field,
                                            method, fill, group)
 
+    def test_iter_points(self):
+        """Test that _iter_points decodes a chunked response lazily."""
+        chunks = [{'results': [{'series': [{'values': [['t1', 1], ['t2', 2]]}],
+                                'partial': True}]},
+                  {'results': [{'series': [{'values': [['t3', 3]]}]}]}]
+        response = mock.MagicMock()
+        response.iter_lines.return_value = [json.dumps(chunk).encode()
+                                            for chunk in chunks]
+        self.backend._client.request.return_value = response
+
+        points = self.backend._iter_points('kytos.kronos.telemetry', '1', '2',
+                                           'bytes_in')
+
+        self.backend._client.request.assert_not_called()
+        self.assertEqual(list(points), [['t1', 1], ['t2', 2], ['t3', 3]])
+        params = self.backend._client.request.call_args[1]['params']
+        self.assertEqual(params['chunked'], 'true')
+        response.close.assert_called_once()
+
+    def test_iter_points_fail(self):
+        """Test that _iter_points raises when the query has no series."""
+        response = mock.MagicMock()
+        response.iter_lines.return_value = [b'{"results": [{}]}']
+        self.backend._client.request.return_value = response
+
+        with self.assertRaises(influx.InvalidQueryError):
+            list(self.backend._iter_points('kytos.kronos.telemetry', '1', '2',
+                                           'bytes_in'))
+
     def test_namespace_exists_success(self):
         """Test method _namespace_exists."""
         self.backend._client.get_list_measurements = mock.MagicMock()
@@ -520,3 +879,83 @@ class TestInfluxBackend(TestCase):
 
         returned_value = self.backend._namespace_exists(measurement_b)
         self.assertEqual(returned_value, False)
+
+    def test_namespace_exists_uses_cache(self):
+        """Test that measurements are not listed again before the TTL."""
+        self.backend._client.get_list_measurements = mock.MagicMock()
+        mock_measurements = self.backend._client.get_list_measurements
+        measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_measurements.return_value = [{'name': measurement}]
+        self.backend._measurements._ttl = 60
+
+        self.assertTrue(self.backend._namespace_exists(measurement))
+        self.assertTrue(self.backend._namespace_exists(measurement))
+        mock_measurements.assert_called_once()
+
+    def test_name_cache_keeps_names_added_during_refresh(self):
+        """Test that a name added while the names are fetched is kept."""
+        fetching = Event()
+        release = Event()
+
+        def fetch():
+            fetching.set()
+            release.wait(1)
+            return [{'name': 'kytos.kronos.a'}]
+
+        names = influx._NameCache(fetch, 60)
+        lookup = Thread(target=names.names)
+        lookup.start()
+        fetching.wait(1)
+        adder = Thread(target=names.add, args=('kytos.kronos.b',))
+        adder.start()
+        release.set()
+        lookup.join()
+        adder.join()
+
+        self.assertEqual(names.names(), {'kytos.kronos.a', 'kytos.kronos.b'})
+
+    def test_namespace_exists_refreshes_after_ttl(self):
+        """Test that measurements are listed again after the TTL."""
+        self.backend._client.get_list_measurements = mock.MagicMock()
+        mock_measurements = self.backend._client.get_list_measurements
+        measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_measurements.return_value = [{'name': measurement}]
+        self.backend._measurements._ttl = 0
+
+        self.backend._namespace_exists(measurement)
+        self.backend._namespace_exists(measurement)
+        self.assertEqual(mock_measurements.call_count, 2)
+
+    def test_write_endpoints_adds_measurement_to_cache(self):
+        """Test that a written measurement exists without a new listing."""
+        self.backend._client.get_list_measurements = mock.MagicMock()
+        mock_measurements = self.backend._client.get_list_measurements
+        mock_measurements.return_value = [{'name': 'kytos.kronos.other'}]
+        self.backend._measurements._ttl = 60
+        self.backend._client.get_list_database.return_value = []
+        self.backend._client.write_points.side_effect = None
+
+        measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        self.assertFalse(self.backend._namespace_exists(measurement))
+
+        self.backend._write_endpoints([{'measurement': measurement,
+                                        'time': '1970-01-02T10:17:36Z',
+                                        'fields': {'bytes_in': 1234.0}}])
+
+        self.assertTrue(self.backend._namespace_exists(measurement))
+        mock_measurements.assert_called_once()
+
+    def test_delete_points_invalidates_cache(self):
+        """Test that measurements are listed again after a delete."""
+        self.backend._client.get_list_measurements = mock.MagicMock()
+        mock_measurements = self.backend._client.get_list_measurements
+        measurement = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_measurements.return_value = [{'name': measurement}]
+        self.backend._measurements._ttl = 60
+
+        self.backend._namespace_exists(measurement)
+        self.backend._delete_points(measurement, None, None)
+        mock_measurements.return_value = []
+
+        self.assertFalse(self.backend._namespace_exists(measurement))
+        self.assertEqual(mock_measurements.call_count, 2)
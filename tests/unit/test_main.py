@@ -11,8 +11,11 @@ from flask import Flask
 
 sys.modules['influxdb'] = mock.MagicMock()
 
+from napps.kytos.kronos.backends.influx import InvalidQueryError
 from napps.kytos.kronos.main import Main
-from napps.kytos.kronos.utils import (NamespaceError)
+from napps.kytos.kronos.utils import (BackendUnavailableError,
+                                      NamespaceError, decode_cursor,
+                                      encode_cursor, namespace_regex)
 from tests.helpers import get_controller_mock
 
 # pylint: enable=wrong-import-order,wrong-import-position
@@ -26,6 +29,17 @@ class TestMainKronos(TestCase):
         """Start NApp thread."""
         self.napp = Main(get_controller_mock())
 
+    def tearDown(self):
+        """Stop the NApp worker threads."""
+        self.napp.workers.shutdown()
+        self.napp.queries.shutdown()
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.shutdown')
+    def test_shutdown_flushes_backend(self, mock_influx_shutdown):
+        """Test that shutdown releases the backend resources."""
+        self.napp.shutdown()
+        mock_influx_shutdown.assert_called_once()
+
     @mock.patch('napps.kytos.kronos.main.InfluxBackend.save')
     def test_rest_save_success_with_influx(self, mock_influx_save):
         """Test success in method rest_save."""
@@ -68,6 +82,58 @@ class TestMainKronos(TestCase):
             exception_name = response.json['exc_name']
             self.assertEqual(exception_name, 'ValueError')
 
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save_many')
+    def test_rest_save_batch_json(self, mock_influx_save_many):
+        """Test rest_save_batch with a JSON array."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        body = [{'namespace': namespace, 'fields': {'bytes_in': 1},
+                 'timestamp': 10},
+                {'namespace': namespace},
+                {'namespace': 'telemetry', 'fields': {'bytes_in': 2}}]
+
+        mock_influx_save_many.return_value = [(1, NamespaceError('bad'))]
+
+        app = Flask(__name__)
+        with app.test_request_context(json=body):
+            response = self.napp.rest_save_batch()
+
+        mock_influx_save_many.assert_called_with(
+            [(namespace, {'bytes_in': 1}, 10),
+             ('telemetry', {'bytes_in': 2}, None)], 's')
+        self.assertEqual(response.json['response'], '1 values saved.')
+        errors = response.json['errors']
+        self.assertEqual([error['index'] for error in errors], [1, 2])
+        self.assertEqual(errors[0]['exc_name'], 'ValueError')
+        self.assertEqual(errors[1]['exc_name'], 'NamespaceError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save_many')
+    def test_rest_save_batch_line_protocol(self, mock_influx_save_many):
+        """Test rest_save_batch with InfluxDB line protocol."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        body = (f'{namespace} bytes_in=1,bytes_out=2 1000000000123456789\n'
+                f'{namespace} bytes_in=3\n')
+
+        mock_influx_save_many.return_value = []
+
+        app = Flask(__name__)
+        with app.test_request_context(data=body, content_type='text/plain'):
+            response = self.napp.rest_save_batch()
+
+        mock_influx_save_many.assert_called_with(
+            [(namespace, {'bytes_in': 1.0, 'bytes_out': 2.0},
+              1000000000123456789),
+             (namespace, {'bytes_in': 3.0}, None)], 'ns')
+        self.assertEqual(response.json['response'], '2 values saved.')
+        self.assertEqual(response.json['errors'], [])
+
+    def test_rest_save_batch_fail_not_a_list(self):
+        """Test rest_save_batch with a JSON body that is not an array."""
+        app = Flask(__name__)
+        with app.test_request_context(json={'namespace': 'kytos.kronos'}):
+            response = self.napp.rest_save_batch()
+
+        self.assertEqual(response.json['exc_name'], 'ValueError')
+
     @mock.patch('napps.kytos.kronos.main.InfluxBackend.delete')
     def test_rest_delete_success_with_influx(self, mock_influx_delete):
         """Test success in method rest_delete."""
@@ -136,11 +202,286 @@ class TestMainKronos(TestCase):
         mock_influx_get.return_value = [['1970-01-01T00:00:00.001234567Z', 12]]
 
         app = Flask(__name__)
-        with app.app_context():
+        with app.test_request_context():
             self.napp.rest_get(namespace, start, end)
             mock_influx_get.assert_called_with(namespace, start, end, None,
                                                None, None)
 
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save_many')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.delete')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_backend_unavailable(self, mock_influx_get,
+                                      mock_influx_save, mock_influx_delete,
+                                      mock_influx_save_many):
+        """Test that an open circuit is returned as a JSON error."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        for mock_method in (mock_influx_get, mock_influx_save,
+                            mock_influx_delete, mock_influx_save_many):
+            mock_method.side_effect = BackendUnavailableError('open')
+
+        app = Flask(__name__)
+        with app.test_request_context(json=[{'namespace': namespace,
+                                             'fields': {'bytes_in': 1}}]):
+            responses = [self.napp.rest_get(namespace, 0, 10),
+                         self.napp.rest_save(namespace, 1),
+                         self.napp.rest_delete(namespace),
+                         self.napp.rest_save_batch()]
+
+        for response in responses:
+            self.assertEqual(response.json, {
+                'exc_name': 'BackendUnavailableError', 'response': 'open'})
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_get_with_limit(self, mock_influx_get):
+        """Test that rest_get returns the cursor of the next page."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_get.return_value = [['1970-01-01T00:00:01Z', 1]]
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'limit': '1'}):
+            response = self.napp.rest_get(namespace, 0, 10, 'mean')
+            cursor = response.json['cursor']
+            self.assertEqual(decode_cursor(cursor), '1970-01-01T00:00:01Z')
+
+        mock_influx_get.return_value = []
+        with app.test_request_context(query_string={'limit': '1',
+                                                    'cursor': cursor}):
+            response = self.napp.rest_get(namespace, 0, 10, 'mean')
+            self.assertIsNone(response.json['cursor'])
+        mock_influx_get.assert_called_with(namespace, 0, 10, 'mean', None,
+                                           None, limit=1,
+                                           after='1970-01-01T00:00:01Z')
+
+        with app.test_request_context(query_string={'limit': '0'}):
+            response = self.napp.rest_get(namespace, 0, 10)
+            self.assertEqual(response.json['exc_name'], 'ValueError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_get_with_max_points(self, mock_influx_get):
+        """Test that rest_get downsamples the points to max_points."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_get.return_value = [[f'1970-01-01T00:00:{second:02}Z', 1]
+                                        for second in range(60)]
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'max_points': '10'}):
+            response = self.napp.rest_get(namespace, 0, 60, 'mean')
+            self.assertEqual(len(response.json['response']), 10)
+
+        with app.test_request_context(query_string={'max_points': '2'}):
+            response = self.napp.rest_get(namespace, 0, 60, 'mean')
+            self.assertEqual(response.json['exc_name'], 'ValueError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_get_with_fields(self, mock_influx_get):
+        """Test that rest_get passes the selected fields to the backend."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_influx_get.return_value = [['t1', {'bytes_in': 1,
+                                                'bytes_out': 2}]]
+
+        app = Flask(__name__)
+        query_string = {'fields': 'bytes_in,bytes_out'}
+        with app.test_request_context(query_string=query_string):
+            response = self.napp.rest_get(namespace, 0, 60)
+            self.assertEqual(response.json['response'],
+                             mock_influx_get.return_value)
+        mock_influx_get.assert_called_with(namespace, 0, 60, None, None, None,
+                                           fields=('bytes_in', 'bytes_out'))
+
+        query_string['max_points'] = '10'
+        with app.test_request_context(query_string=query_string):
+            response = self.napp.rest_get(namespace, 0, 60)
+            self.assertEqual(response.json['exc_name'], 'ValueError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get_many')
+    def test_rest_get_with_pattern(self, mock_influx_get_many):
+        """Test that rest_get returns every namespace matching a pattern."""
+        pattern = 'kytos.kronos.telemetry.switches.1.interfaces.*.bytes_in'
+        points = {f'kytos.kronos.telemetry.switches.1.interfaces.{port}.'
+                  'bytes_in': [[f'1970-01-01T00:00:{second:02}Z', second]
+                               for second in range(10)]
+                  for port in (1, 2)}
+        mock_influx_get_many.return_value = points
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'max_points': '3'}):
+            response = self.napp.rest_get(pattern, 0, 60)
+            self.assertEqual(list(response.json['response']), list(points))
+            self.assertTrue(all(len(series) == 3 for series
+                                in response.json['response'].values()))
+        mock_influx_get_many.assert_called_with(pattern, 0, 60, None, None,
+                                                None)
+
+        with app.test_request_context(query_string={'limit': '2'}):
+            response = self.napp.rest_get(pattern, 0, 60)
+            self.assertEqual(response.json['exc_name'], 'ValueError')
+        self.assertEqual(mock_influx_get_many.call_count, 1)
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_get_columnar(self, mock_influx_get):
+        """Test that rest_get returns the points in columns."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_get.return_value = [['1970-01-01T00:00:00Z', 1],
+                                        ['1970-01-01T00:00:10Z', 2]]
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'format': 'columnar'}):
+            response = self.napp.rest_get(namespace, 0, 10)
+            self.assertEqual(response.json['response'],
+                             {'start': 0, 'step': 10**10, 'values': [1, 2]})
+
+        query_string = {'format': 'float64', 'limit': '2'}
+        with app.test_request_context(query_string=query_string):
+            response = self.napp.rest_get(namespace, 0, 10)
+            self.assertEqual(response.mimetype, 'application/octet-stream')
+            self.assertEqual(len(response.get_data()), 32)
+            self.assertEqual(response.headers['X-Kronos-Points'], '2')
+            self.assertIn('X-Kronos-Cursor', response.headers)
+
+        for query_string in ({'format': 'csv'},
+                             {'format': 'columnar', 'fields': '*'}):
+            with app.test_request_context(query_string=query_string):
+                response = self.napp.rest_get(namespace, 0, 10)
+                self.assertEqual(response.json['exc_name'], 'ValueError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_query(self, mock_influx_get):
+        """Test that rest_query returns the result of each query by id."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+
+        def get(name, *args):
+            if name != namespace:
+                raise NamespaceError('missing')
+            return [['1970-01-01T00:00:00Z', len(args)]]
+
+        mock_influx_get.side_effect = get
+        body = [{'id': 'in', 'namespace': namespace, 'start': 0, 'end': 60,
+                 'method': 'mean', 'group': '1m'},
+                {'id': 'out', 'namespace': 'kytos.kronos.other.bytes_out',
+                 'start': 0},
+                {'namespace': namespace, 'limit': 0}]
+
+        app = Flask(__name__)
+        with app.test_request_context(json=body):
+            response = self.napp.rest_query()
+
+        results = response.json['response']
+        self.assertEqual(results['in'],
+                         {'response': [['1970-01-01T00:00:00Z', 5]]})
+        self.assertEqual(results['out']['exc_name'], 'NamespaceError')
+        self.assertEqual(results['2']['exc_name'], 'ValueError')
+        mock_influx_get.assert_any_call(namespace, 0, 60, 'mean', None, '1m')
+        self.assertEqual(mock_influx_get.call_count, 2)
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_query_backend_error(self, mock_influx_get):
+        """Test that rest_query reports backend errors of single queries."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+
+        def get(name, start, *args):
+            if start == 0:
+                raise InvalidQueryError('Error. No data in the range.')
+            return [['1970-01-01T00:01:00Z', 1]]
+
+        mock_influx_get.side_effect = get
+        body = [{'id': 'empty', 'namespace': namespace, 'start': 0},
+                {'id': 'full', 'namespace': namespace, 'start': 60}]
+
+        app = Flask(__name__)
+        with app.test_request_context(json=body):
+            response = self.napp.rest_query()
+
+        results = response.json['response']
+        self.assertEqual(results['empty'],
+                         {'exc_name': 'InvalidQueryError',
+                          'response': 'Error. No data in the range.'})
+        self.assertEqual(results['full'],
+                         {'response': [['1970-01-01T00:01:00Z', 1]]})
+
+    def test_rest_query_fail(self):
+        """Test that rest_query rejects invalid batches."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        bodies = [{'namespace': namespace},
+                  [{'start': 0}],
+                  [{'namespace': namespace, 'method': ['mean']}],
+                  [{'id': 1, 'namespace': namespace},
+                   {'id': '1', 'namespace': namespace}]]
+
+        app = Flask(__name__)
+        for body in bodies:
+            with app.test_request_context(json=body):
+                response = self.napp.rest_query()
+                self.assertEqual(response.json['exc_name'], 'ValueError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.iter_get')
+    def test_rest_get_stream_ndjson(self, mock_influx_iter_get):
+        """Test that rest_get streams the points as JSON lines."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_iter_get.return_value = iter([['t1', 1], ['t2', 2]])
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'stream': 'ndjson'}):
+            response = self.napp.rest_get(namespace, 1, 2)
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(response.get_data(as_text=True),
+                         '["t1", 1]\n["t2", 2]\n')
+        mock_influx_iter_get.assert_called_with(namespace, 1, 2, None, None,
+                                                None)
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.iter_get')
+    def test_rest_get_stream_json(self, mock_influx_iter_get):
+        """Test that rest_get streams the points as a JSON document."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_iter_get.return_value = iter([['t1', 1], ['t2', 2]])
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'stream': 'json'}):
+            response = self.napp.rest_get(namespace, 1, 2)
+
+        self.assertEqual(response.get_json(),
+                         {'response': [['t1', 1], ['t2', 2]]})
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.iter_get')
+    def test_rest_get_stream_fail(self, mock_influx_iter_get):
+        """Test that errors before the first point are JSON errors."""
+        namespace = 'kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_iter_get.side_effect = NamespaceError()
+
+        app = Flask(__name__)
+        with app.test_request_context(query_string={'stream': 'ndjson'}):
+            response = self.napp.rest_get(namespace, 1, 2)
+            self.assertEqual(response.json['exc_name'], 'NamespaceError')
+
+        with app.test_request_context(query_string={'stream': 'xml'}):
+            response = self.napp.rest_get(namespace, 1, 2)
+            self.assertEqual(response.json['exc_name'], 'ValueError')
+
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_rest_get_cached(self, mock_influx_get, mock_influx_save):
+        """Test that rest_get caches results until a write."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_influx_get.return_value = [['1970-01-01T00:00:00Z', 12]]
+
+        app = Flask(__name__)
+        with app.test_request_context():
+            self.napp.rest_get(f'{namespace}.bytes_in', 100, 200, 'mean')
+            response = self.napp.rest_get(f'{namespace}.bytes_in', 100, 200,
+                                          'mean')
+            self.assertEqual(mock_influx_get.call_count, 1)
+            self.assertEqual(response.json['response'],
+                             [['1970-01-01T00:00:00Z', 12]])
+
+            self.napp.rest_save(namespace, {'bytes_in': 1}, 150)
+            self.napp.rest_get(f'{namespace}.bytes_in', 100, 200, 'mean')
+            self.assertEqual(mock_influx_get.call_count, 2)
+            mock_influx_save.assert_called_once()
+
+            stats = self.napp.rest_stats().json['response']['query_cache']
+            self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
     @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
     def test_rest_get_fail_invalid_namespace(self, mock_influx_get):
         """Test fail case in method rest_get passing an invalid namespace."""
@@ -151,7 +492,7 @@ class TestMainKronos(TestCase):
         mock_influx_get.side_effect = NamespaceError()
 
         app = Flask(__name__)
-        with app.app_context():
+        with app.test_request_context():
             response = self.napp.rest_get(namespace, start, end)
             exception_name = response.json['exc_name']
             self.assertEqual(exception_name, 'NamespaceError')
@@ -167,7 +508,7 @@ class TestMainKronos(TestCase):
         mock_influx_get.side_effect = ValueError()
 
         app = Flask(__name__)
-        with app.app_context():
+        with app.test_request_context():
             response = self.napp.rest_get(namespace, start, end)
             exception_name = response.json['exc_name']
             self.assertEqual(exception_name, 'ValueError')
@@ -183,7 +524,7 @@ class TestMainKronos(TestCase):
         mock_influx_get.side_effect = ValueError()
 
         app = Flask(__name__)
-        with app.app_context():
+        with app.test_request_context():
             response = self.napp.rest_get(namespace, start, end)
             exception_name = response.json['exc_name']
             self.assertEqual(exception_name, 'ValueError')
@@ -201,6 +542,7 @@ class TestMainKronos(TestCase):
                          'timestamp': timestamp}
 
         self.napp.event_save(event)
+        self.napp.workers.join()
         mock_influx_save.assert_called_with(namespace, value, timestamp)
 
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
@@ -226,6 +568,7 @@ class TestMainKronos(TestCase):
         mock_influx_save.side_effect = NamespaceError()
 
         self.napp.event_save(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
 
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
@@ -251,8 +594,97 @@ class TestMainKronos(TestCase):
         mock_influx_save.side_effect = ValueError()
 
         self.napp.event_save(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
 
+    @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save_many')
+    def test_event_save_many(self, mock_influx_save_many, mock_callback):
+        """Test that event_save_many saves all records in one call."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        records = [(namespace, {'bytes_in': 1}, 10),
+                   {'namespace': namespace, 'fields': {'bytes_out': 2}},
+                   (namespace, {'bytes_in': 3}),
+                   ('telemetry', {'bytes_in': 4}, None)]
+
+        mock_influx_save_many.return_value = [(2, NamespaceError('bad'))]
+
+        event = mock.MagicMock()
+        event.content = {'records': records}
+
+        self.napp.event_save_many(event)
+        self.napp.workers.join()
+
+        mock_influx_save_many.assert_called_once_with(
+            [(namespace, {'bytes_in': 1}, 10),
+             (namespace, {'bytes_out': 2}, None),
+             ('telemetry', {'bytes_in': 4}, None)], 's')
+        errors = [(2, 'ValueError', 'Error. Record must be a (namespace, '
+                                    'fields, timestamp) tuple.'),
+                  (3, 'NamespaceError', 'bad')]
+        mock_callback.assert_called_once_with(event, '2 values saved.',
+                                              errors)
+
+    @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.save_many')
+    def test_event_save_many_without_errors(self, mock_influx_save_many,
+                                            mock_callback):
+        """Test that event_save_many passes no error when all are saved."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_influx_save_many.return_value = []
+
+        event = mock.MagicMock()
+        event.content = {'records': [(namespace, {'bytes_in': 1}, None)]}
+
+        self.napp.event_save_many(event)
+        self.napp.workers.join()
+        mock_callback.assert_called_once_with(event, '1 values saved.', None)
+
+    @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
+    def test_event_rejected_by_full_queue(self, mock_callback):
+        """Test that an event discarded by the worker pool gets an error."""
+        event = mock.MagicMock()
+
+        with mock.patch.object(self.napp.workers, 'submit') as mock_submit:
+            self.napp.event_save(event)
+
+        on_reject = mock_submit.call_args[1]['on_reject']
+        on_reject(event)
+        error = mock_callback.call_args[0][2]
+        self.assertEqual(error[0], 'QueueFullError')
+
+    def test_rest_stats(self):
+        """Test that rest_stats exposes the worker and backend counters."""
+        app = Flask(__name__)
+        with app.app_context():
+            response = self.napp.rest_stats()
+
+        stats = response.json['response']
+        self.assertEqual(stats['workers']['rejected'], 0)
+        self.assertEqual(stats['workers']['queue_depth'], 0)
+        self.assertIn('spool', stats['backend'])
+        self.assertEqual(stats['backend']['breaker']['state'], 'closed')
+
+    @mock.patch('napps.kytos.kronos.retention.time', return_value=3600)
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.delete')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.namespaces')
+    def test_execute_runs_retention(self, mock_namespaces, mock_delete,
+                                    mock_influx_get, _):
+        """Test that execute expires data by the retention rules."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        mock_namespaces.return_value = [namespace, 'kytos.kronos.other']
+        mock_delete.return_value = 5
+        mock_influx_get.return_value = [['1970-01-01T00:00:00Z', 1]]
+        self.napp.retention._rules = [
+            (namespace_regex('kytos.kronos.telemetry.*.*.*.*'), 60)]
+
+        self.napp.execute()
+
+        mock_delete.assert_called_once()
+        self.assertEqual(mock_delete.call_args[0][:2], (namespace, None))
+        self.assertEqual(self.napp.retention.stats()['deleted_points'], 5)
+
     @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
     def test_event_get_success_with_influx(self, mock_influx_get):
         """Test success in method event_get."""
@@ -269,8 +701,32 @@ class TestMainKronos(TestCase):
                          'end': end}
 
         self.napp.event_get(event)
+        self.napp.workers.join()
         mock_influx_get.assert_called_with(namespace, start, end)
 
+    @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
+    @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
+    def test_event_get_with_limit(self, mock_influx_get, mock_callback):
+        """Test that event_get returns a page of points and its cursor."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+        mock_influx_get.return_value = [['1970-01-01T00:00:01Z', 1],
+                                        ['1970-01-01T00:00:02Z', 2]]
+
+        event = mock.MagicMock()
+        event.content = {'namespace': namespace, 'start': 0, 'end': 10,
+                         'limit': 2,
+                         'cursor': encode_cursor('1970-01-01T00:00:00Z')}
+
+        self.napp.event_get(event)
+        self.napp.workers.join()
+
+        mock_influx_get.assert_called_with(namespace, 0, 10, limit=2,
+                                           after='1970-01-01T00:00:00Z')
+        result = mock_callback.call_args[0][1]
+        self.assertEqual(result['points'], mock_influx_get.return_value)
+        self.assertEqual(decode_cursor(result['cursor']),
+                         '1970-01-01T00:00:02Z')
+
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
     @mock.patch('napps.kytos.kronos.main.InfluxBackend.get')
     def test_event_get_fail_with_invalid_namespace(self, mock_influx_get,
@@ -294,6 +750,7 @@ class TestMainKronos(TestCase):
         mock_influx_get.side_effect = NamespaceError()
 
         self.napp.event_get(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
 
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
@@ -320,6 +777,7 @@ class TestMainKronos(TestCase):
         mock_influx_get.side_effect = ValueError()
 
         self.napp.event_get(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
 
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
@@ -346,6 +804,7 @@ class TestMainKronos(TestCase):
         mock_influx_get.side_effect = ValueError()
 
         self.napp.event_get(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
 
     @mock.patch('napps.kytos.kronos.main.InfluxBackend.delete')
@@ -361,6 +820,7 @@ class TestMainKronos(TestCase):
                          'end': end}
 
         self.napp.event_delete(event)
+        self.napp.workers.join()
         mock_influx_delete.assert_called_with(namespace, start, end)
 
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
@@ -386,6 +846,7 @@ class TestMainKronos(TestCase):
         mock_influx_del.side_effect = NamespaceError()
 
         self.napp.event_delete(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
 
     @mock.patch('napps.kytos.kronos.main.Main._execute_callback')
@@ -412,4 +873,5 @@ class TestMainKronos(TestCase):
         mock_influx_del.side_effect = ValueError()
 
         self.napp.event_delete(event)
+        self.napp.workers.join()
         mock_callback.assert_called_with(event, result, error)
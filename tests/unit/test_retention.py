@@ -0,0 +1,114 @@
+"""Module to test the retention engine."""
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.retention import RetentionEngine
+from napps.kytos.kronos.utils import NamespaceError
+
+
+class TestRetentionEngine(TestCase):
+    """Test the expiry of old data by namespace pattern."""
+
+    def setUp(self):
+        """Create an engine in front of a mocked backend."""
+        self.backend = mock.MagicMock(DELETES_MEASUREMENTS=False)
+        self.backend.get.return_value = [['1970-01-01T00:00:00Z', 1]]
+        self.backend.namespaces.return_value = ['kytos.kronos.telemetry.a',
+                                                'kytos.kronos.telemetry.b',
+                                                'kytos.kronos.events']
+        self.backend.delete.return_value = 3
+        self.on_delete = mock.MagicMock()
+        self.engine = RetentionEngine(self.backend,
+                                      {'kytos.kronos.telemetry.*': '30d',
+                                       'kytos.kronos.*': '1w'},
+                                      namespaces_per_run=2,
+                                      on_delete=self.on_delete,
+                                      slice_duration='100d')
+
+    def test_retention(self):
+        """Test that the first matching pattern gives the retention."""
+        self.assertEqual(self.engine.retention('kytos.kronos.telemetry.a'),
+                         30 * 86400 * 10**9)
+        self.assertEqual(self.engine.retention('kytos.kronos.events'),
+                         7 * 86400 * 10**9)
+        self.assertIsNone(self.engine.retention('kytos.other'))
+
+    def test_retention_matches_one_segment(self):
+        """Test that a * matches a single segment, as in queries."""
+        self.assertIsNone(self.engine.retention('kytos.kronos.telemetry.a.b'))
+
+    @mock.patch('napps.kytos.kronos.retention.time', return_value=3456000)
+    def test_run_in_turns(self, _):
+        """Test that each run expires the next namespaces."""
+        self.assertEqual(self.engine.run(), 6)
+        self.backend.delete.assert_called_with('kytos.kronos.telemetry.b',
+                                               None, '1970-01-11T00:00:00Z')
+
+        self.assertEqual(self.engine.run(), 3)
+        self.backend.delete.assert_called_with('kytos.kronos.events',
+                                               None, '1970-02-03T00:00:00Z')
+        self.on_delete.assert_called_with('kytos.kronos.events', None,
+                                          '1970-02-03T00:00:00Z')
+        self.assertEqual(self.backend.namespaces.call_count, 1)
+
+        stats = self.engine.stats()
+        self.assertEqual((stats['runs'], stats['namespaces'],
+                          stats['deleted_points']), (2, 3, 9))
+
+    @mock.patch('napps.kytos.kronos.retention.time', return_value=2592000)
+    def test_run_in_slices(self, _):
+        """Test that a backlog is expired a slice at a time.
+
+        The events namespace has no points older than its retention, so it
+        is not deleted.
+        """
+        self.backend.DELETES_MEASUREMENTS = True
+        self.backend.get.side_effect = lambda namespace, *_, **__: \
+            [] if namespace == 'kytos.kronos.events' else \
+            [['1970-01-02T00:00:00Z', 1]]
+        engine = RetentionEngine(self.backend,
+                                 {'kytos.kronos.*.*': '1w',
+                                  'kytos.kronos.*': '1w'},
+                                 namespaces_per_run=2,
+                                 slice_duration='10d')
+
+        engine.run()
+        engine.run()
+
+        self.backend.get.assert_any_call('kytos.kronos.telemetry.a', 0,
+                                         1987200, limit=1)
+        self.assertEqual(self.backend.get.call_count, 2)
+        self.assertEqual([call[0] for call in
+                          self.backend.delete.call_args_list],
+                         [('kytos.kronos.telemetry.a', None,
+                           '1970-01-12T00:00:00Z'),
+                          ('kytos.kronos.telemetry.a', None,
+                           '1970-01-22T00:00:00Z'),
+                          ('kytos.kronos.telemetry.a', None,
+                           '1970-01-24T00:00:00Z')])
+        self.assertEqual(engine.stats()['pending'], 0)
+
+    def test_run_counts_errors(self):
+        """Test that a failed delete does not stop the run."""
+        self.backend.delete.side_effect = [ValueError(), None]
+
+        self.assertEqual(self.engine.run(), 0)
+
+        stats = self.engine.stats()
+        self.assertEqual((stats['namespaces'], stats['errors']), (1, 1))
+        self.assertEqual(self.on_delete.call_count, 2)
+
+    def test_run_skips_missing_namespaces(self):
+        """Test that a namespace deleted meanwhile is not an error."""
+        self.backend.delete.side_effect = NamespaceError()
+
+        self.engine.run()
+
+        self.assertEqual(self.engine.stats()['errors'], 0)
+
+    def test_run_without_rules(self):
+        """Test that nothing is deleted without rules."""
+        engine = RetentionEngine(self.backend, {})
+
+        self.assertFalse(engine.enabled)
+        self.assertEqual(engine.run(), 0)
+        self.backend.namespaces.assert_not_called()
@@ -0,0 +1,118 @@
+"""Module to test the rollup tiers."""
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.backends.rollup import RollupBackend, RollupTier
+
+
+class TestRollupTier(TestCase):
+    """Test the buckets of a rollup tier."""
+
+    def test_first_bucket_is_incomplete(self):
+        """Test that the bucket of the first point is not kept."""
+        tier = RollupTier(10, 4)
+        for time in (5, 12, 15, 27):
+            tier.add(time, time)
+
+        self.assertEqual(tier.complete_since, 1)
+        self.assertEqual(list(tier.aggregates(0, 10)),
+                         [(10, 2, 27.0, 12.0, 15.0),
+                          (20, 1, 27.0, 27.0, 27.0)])
+
+    def test_retention(self):
+        """Test that only the last buckets are kept."""
+        tier = RollupTier(10, 2)
+        for time in range(0, 60, 10):
+            tier.add(time, 1)
+
+        self.assertEqual(tier.complete_since, 4)
+        self.assertEqual([bucket[0] for bucket in tier.aggregates(0, 10)],
+                         [40, 50])
+
+        tier.add(15, 1)
+        self.assertEqual(len(list(tier.aggregates(0, 10))), 2)
+
+
+class TestRollupBackend(TestCase):
+    """Test methods in the rollup backend."""
+
+    def setUp(self):
+        """Wrap a mocked backend with 10s and 1m tiers."""
+        settings = mock.MagicMock()
+        settings.ROLLUP = {'TIERS': {'10s': 100, '1m': 100},
+                           'MAX_NAMESPACES': 10}
+        self.backend = mock.MagicMock(DEFAULT_FILL='null')
+        self.rollup = RollupBackend(self.backend, settings)
+        self.namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+        for second in range(55, 300, 5):
+            self.rollup.save(self.namespace, {'bytes_in': second}, second)
+
+    def test_get_from_coarsest_tier(self):
+        """Test that a grouped aggregation is answered from the tiers."""
+        with mock.patch.object(RollupTier, 'aggregates',
+                               autospec=True,
+                               side_effect=RollupTier.aggregates) as spy:
+            result = self.rollup.get(f'{self.namespace}.bytes_in', 120, 239,
+                                     'max', 'none', '1m')
+
+        self.backend.get.assert_not_called()
+        self.assertEqual(spy.call_args[0][0].step, 60 * 10**9)
+        self.assertEqual(result, [['1970-01-01T00:02:00Z', 175.0],
+                                  ['1970-01-01T00:03:00Z', 235.0]])
+
+    def test_get_from_finer_tier(self):
+        """Test that ranges not aligned to a coarse tier use a finer one."""
+        result = self.rollup.get(f'{self.namespace}.bytes_in', 70, 299,
+                                 'count', 'null', '2m')
+
+        self.backend.get.assert_not_called()
+        self.assertEqual(result, [['1970-01-01T00:00:00Z', 10],
+                                  ['1970-01-01T00:02:00Z', 24],
+                                  ['1970-01-01T00:04:00Z', 12]])
+
+    def test_get_default_fill(self):
+        """Test that empty buckets follow the default fill of the backend."""
+        self.rollup.save(self.namespace, {'bytes_in': 1}, 330)
+
+        result = self.rollup.get(f'{self.namespace}.bytes_in', 240, 419,
+                                 'max', None, '1m')
+        self.assertEqual(result, [['1970-01-01T00:04:00Z', 295.0],
+                                  ['1970-01-01T00:05:00Z', 1.0],
+                                  ['1970-01-01T00:06:00Z', None]])
+
+        self.backend.DEFAULT_FILL = None
+        result = self.rollup.get(f'{self.namespace}.bytes_in', 240, 419,
+                                 'max', None, '1m')
+        self.assertEqual(len(result), 2)
+        self.backend.get.assert_not_called()
+
+    def test_get_not_covered(self):
+        """Test that queries the tiers cannot answer use the backend."""
+        self.rollup.get(f'{self.namespace}.bytes_in', 0, 299, 'max', None,
+                        '1m')
+        self.rollup.get(f'{self.namespace}.bytes_in', 122, 299, 'max', None,
+                        '1m')
+        self.rollup.get(f'{self.namespace}.bytes_in', 120, 299, 'median',
+                        None, '1m')
+        self.rollup.get(f'{self.namespace}.bytes_in', 120, 200, 'max', None,
+                        '1m')
+
+        self.assertEqual(self.backend.get.call_count, 4)
+
+    def test_delete(self):
+        """Test that deleting a namespace drops its tiers."""
+        self.rollup.delete(f'{self.namespace}.bytes_in')
+        self.rollup.get(f'{self.namespace}.bytes_in', 120, 239, 'max', None,
+                        '1m')
+
+        self.backend.get.assert_called_once()
+
+    def test_delete_oldest(self):
+        """Test that deleting old points only expires the older buckets."""
+        self.rollup.delete(self.namespace, None, 150)
+        self.rollup.get(f'{self.namespace}.bytes_in', 180, 239, 'max', None,
+                        '1m')
+        self.backend.get.assert_not_called()
+
+        self.rollup.get(f'{self.namespace}.bytes_in', 120, 239, 'max', None,
+                        '1m')
+        self.backend.get.assert_called_once()
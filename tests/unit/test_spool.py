@@ -0,0 +1,80 @@
+"""Module to test the spool of points waiting to be written again."""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from napps.kytos.kronos.backends.spool import Spool
+
+
+class TestSpool(TestCase):
+    """Test the append-only spool file."""
+
+    def setUp(self):
+        """Create a spool in a temporary folder."""
+        self.tmpdir = TemporaryDirectory()
+        self.path = Path(self.tmpdir.name, 'spool', 'influx.spool')
+        self.spool = Spool(self.path, 1024)
+        self.points = [{'measurement': 'kytos.kronos.a', 'time': time,
+                        'fields': {'bytes_in': 1.0}} for time in range(3)]
+
+    def tearDown(self):
+        """Close the spool and remove the temporary folder."""
+        self.spool.close()
+        self.tmpdir.cleanup()
+
+    def test_created_on_first_append(self):
+        """Test that the file only exists once points are spooled."""
+        self.assertEqual(self.spool.pending(), 0)
+        self.assertEqual(self.spool.read(10), ([], 0))
+        self.assertFalse(self.path.exists())
+
+        self.assertTrue(self.spool.append(self.points))
+        self.assertTrue(self.path.exists())
+        self.assertGreater(self.spool.pending(), 0)
+
+    def test_read_and_commit(self):
+        """Test that committed points are not read again."""
+        self.spool.append(self.points)
+
+        points, offset = self.spool.read(2)
+        self.assertEqual(points, self.points[:2])
+        self.assertEqual(self.spool.read(2)[0], self.points[:2])
+
+        self.spool.commit(offset, 2)
+        points, offset = self.spool.read(2)
+        self.assertEqual(points, self.points[2:])
+
+        self.spool.commit(offset, 1)
+        self.assertEqual(self.spool.pending(), 0)
+        self.assertEqual(self.path.stat().st_size, 0)
+        self.assertEqual(self.spool.stats(),
+                         {'spooled': 3, 'replayed': 3, 'dropped': 0})
+
+    def test_offset_survives_restarts(self):
+        """Test that a new spool resumes from the committed offset."""
+        self.spool.append(self.points)
+        _, offset = self.spool.read(1)
+        self.spool.commit(offset, 1)
+        self.spool.close()
+
+        self.spool = Spool(self.path, 1024)
+        self.assertEqual(self.spool.read(10)[0], self.points[1:])
+
+    def test_skips_partial_lines(self):
+        """Test that a line cut short is not read."""
+        self.spool.append(self.points[:1])
+        with open(self.path, 'ab') as spool_file:
+            spool_file.write(b'{"measurement":')
+
+        points, offset = self.spool.read(10)
+        self.assertEqual(points, self.points[:1])
+        self.assertLess(offset, self.path.stat().st_size)
+
+    def test_drops_points_when_full(self):
+        """Test that points beyond the size limit are dropped."""
+        self.spool = Spool(self.path, 100)
+
+        self.assertTrue(self.spool.append(self.points[:1]))
+        self.assertFalse(self.spool.append(self.points))
+        self.assertEqual(len(self.spool.read(10)[0]), 1)
+        self.assertEqual(self.spool.stats()['dropped'], 3)
@@ -0,0 +1,261 @@
+"""Module to test the SQLite Backend."""
+import sqlite3
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.backends.sqlite import SQLiteBackend
+from napps.kytos.kronos.utils import NamespaceError
+
+
+class TestSQLiteBackend(TestCase):
+    """Test methods in SQLite Backend."""
+
+    def setUp(self):
+        """Create a SQLite backend in a temporary folder."""
+        self.tmpdir = TemporaryDirectory()
+        settings = mock.MagicMock()
+        settings.BACKENDS = {'SQLITE': {
+            'PATH': str(Path(self.tmpdir.name, 'kronos.db')),
+            'BATCH_SIZE': 1000,
+            'FLUSH_INTERVAL': 60}}
+        self.backend = SQLiteBackend(settings)
+        self.namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232'
+
+    def tearDown(self):
+        """Close the database and remove the temporary folder."""
+        self.backend.shutdown()
+        self.tmpdir.cleanup()
+
+    def _save_series(self):
+        for timestamp in range(0, 120, 10):
+            self.backend.save(self.namespace, {'bytes_in': timestamp,
+                                               'bytes_out': 1}, timestamp)
+
+    def test_uses_wal_journal(self):
+        """Test that the database uses WAL journaling."""
+        mode = self.backend._writer.execute('PRAGMA journal_mode')
+        self.assertEqual(mode.fetchone()[0], 'wal')
+
+    def test_save_batches_transactions(self):
+        """Test that rows are committed only when a batch is full."""
+        self.backend._batch_size = 4
+
+        self.backend.save(self.namespace, {'bytes_in': 1}, 0)
+        self.assertEqual(len(self.backend._pending), 1)
+
+        self.backend.save(self.namespace, {'bytes_in': 1, 'bytes_out': 2,
+                                           'errors': 3}, 1)
+        self.assertEqual(self.backend._pending, [])
+        count = self.backend._writer.execute('SELECT COUNT(*) FROM points')
+        self.assertEqual(count.fetchone()[0], 4)
+
+    def test_save_many(self):
+        """Test that save_many skips and reports invalid records."""
+        records = [(self.namespace, {'bytes_in': 1}, 0),
+                   (self.namespace, {'bytes_in': 'abc'}, 0),
+                   ('telemetry', {'bytes_in': 1}, 0)]
+
+        errors = self.backend.save_many(records)
+
+        self.assertEqual([position for position, _ in errors], [1, 2])
+        self.assertEqual(self.backend.get(f'{self.namespace}.bytes_in', 0, 1),
+                         [['1970-01-01T00:00:00Z', 1.0]])
+
+    def test_save_many_precision(self):
+        """Test that save_many keeps nanosecond epoch times exact."""
+        records = [(self.namespace, {'bytes_in': 1}, 1700000000123456789)]
+
+        self.backend.save_many(records, 'ns')
+
+        self.assertEqual(self.backend.get(f'{self.namespace}.bytes_in',
+                                          1700000000, 1700000001),
+                         [['2023-11-14T22:13:20.123456789Z', 1.0]])
+
+    def test_get_success(self):
+        """Test that get returns the [time, value] rows of a field."""
+        self._save_series()
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 20, 40)
+
+        self.assertEqual(result, [['1970-01-01T00:00:20Z', 20.0],
+                                  ['1970-01-01T00:00:30Z', 30.0],
+                                  ['1970-01-01T00:00:40Z', 40.0]])
+
+    def test_iter_get(self):
+        """Test that iter_get validates eagerly and reads lazily."""
+        self._save_series()
+
+        with self.assertRaises(ValueError):
+            self.backend.iter_get(f'{self.namespace}.bytes_in', 40, 20)
+
+        points = self.backend.iter_get(f'{self.namespace}.bytes_in', 20, 30)
+        self.assertEqual(next(points), ['1970-01-01T00:00:20Z', 20.0])
+        self.assertEqual(list(points), [['1970-01-01T00:00:30Z', 30.0]])
+
+    def test_get_pages(self):
+        """Test that limit and after select a page of points or buckets."""
+        self._save_series()
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 0, 100,
+                                  limit=2, after='1970-01-01T00:00:30Z')
+        self.assertEqual(result, [['1970-01-01T00:00:40Z', 40.0],
+                                  ['1970-01-01T00:00:50Z', 50.0]])
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 0, 100,
+                                  'max', group='30s', limit=1,
+                                  after='1970-01-01T00:00:30Z')
+        self.assertEqual(result, [['1970-01-01T00:01:00Z', 80.0]])
+
+    def test_get_with_method(self):
+        """Test that get aggregates the whole range with a method."""
+        self._save_series()
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 0, 30,
+                                  method='mean')
+
+        self.assertEqual(result, [['1970-01-01T00:00:00Z', 15.0]])
+
+    def test_get_with_method_without_points(self):
+        """Test that an aggregate of an empty range has no point."""
+        self._save_series()
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 200, 300,
+                                  method='mean')
+
+        self.assertEqual(result, [])
+
+    def test_shutdown_closes_readers(self):
+        """Test that the connections of the reading threads are closed."""
+        self._save_series()
+        reader = Thread(target=self.backend.get,
+                        args=(f'{self.namespace}.bytes_in', 0, 30))
+        reader.start()
+        reader.join()
+        connections = list(self.backend._readers)
+
+        self.backend.shutdown()
+
+        self.assertEqual(len(connections), 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connections[0].execute('SELECT 1')
+
+    def test_get_with_group(self):
+        """Test that get aggregates each group interval in the database."""
+        self._save_series()
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 0, 119,
+                                  method='max', group='1m')
+
+        self.assertEqual(result, [['1970-01-01T00:00:00Z', 50.0],
+                                  ['1970-01-01T00:01:00Z', 110.0]])
+
+    def test_get_with_group_and_fill(self):
+        """Test that fill adds the intervals without data."""
+        self.backend.save(self.namespace, {'bytes_in': 1}, 0)
+        self.backend.save(self.namespace, {'bytes_in': 3}, 120)
+
+        result = self.backend.get(f'{self.namespace}.bytes_in', 0, 179,
+                                  'sum', 'previous', '1m')
+
+        self.assertEqual(result, [['1970-01-01T00:00:00Z', 1.0],
+                                  ['1970-01-01T00:01:00Z', 1.0],
+                                  ['1970-01-01T00:02:00Z', 3.0]])
+
+    def test_get_fields(self):
+        """Test that get returns many fields aligned on their times."""
+        self._save_series()
+        self.backend.save(self.namespace, {'bytes_in': 1}, 5)
+
+        result = self.backend.get(self.namespace, 0, 10,
+                                  fields=('bytes_in', 'bytes_out'))
+
+        self.assertEqual(result, [
+            ['1970-01-01T00:00:00Z', {'bytes_in': 0.0, 'bytes_out': 1.0}],
+            ['1970-01-01T00:00:05Z', {'bytes_in': 1.0, 'bytes_out': None}],
+            ['1970-01-01T00:00:10Z', {'bytes_in': 10.0, 'bytes_out': 1.0}]])
+
+    def test_get_all_fields_with_group(self):
+        """Test that '*' aggregates every field of the namespace."""
+        self._save_series()
+
+        result = self.backend.get(self.namespace, 0, 179, 'sum', 0, '1m',
+                                  fields='*')
+
+        self.assertEqual(result, [
+            ['1970-01-01T00:00:00Z', {'bytes_in': 150.0, 'bytes_out': 6.0}],
+            ['1970-01-01T00:01:00Z', {'bytes_in': 510.0, 'bytes_out': 6.0}],
+            ['1970-01-01T00:02:00Z', {'bytes_in': 0.0, 'bytes_out': 0.0}]])
+
+    def test_get_fail_invalid_method(self):
+        """Test fail case in get with a method SQLite does not support."""
+        self._save_series()
+
+        with self.assertRaises(ValueError):
+            self.backend.get(f'{self.namespace}.bytes_in', 0, 30,
+                             method='median')
+
+    def test_get_fail_invalid_namespace(self):
+        """Test fail case in get with a namespace without data."""
+        with self.assertRaises(NamespaceError):
+            self.backend.get(f'{self.namespace}.bytes_in', 0, 30)
+
+    def test_get_fail_end_smaller_than_start(self):
+        """Test fail case in get with end smaller than start."""
+        with self.assertRaises(ValueError):
+            self.backend.get(f'{self.namespace}.bytes_in', 30, 0)
+
+    def test_delete_returns_deleted_points(self):
+        """Test that delete counts the points it removed."""
+        self._save_series()
+
+        self.assertEqual(self.backend.delete(f'{self.namespace}.bytes_in',
+                                             None, 20), 6)
+
+    def test_namespaces(self):
+        """Test that namespaces lists the stored namespaces."""
+        self._save_series()
+
+        self.assertEqual(self.backend.namespaces(),
+                         [f'{self.namespace}.bytes_in',
+                          f'{self.namespace}.bytes_out'])
+
+    def test_get_many(self):
+        """Test that a pattern returns each matching series."""
+        self._save_series()
+        self.backend.save('kytos.kronos.telemetry.switches.1.interfaces.233',
+                          {'bytes_in': 5}, 0)
+        pattern = 'kytos.kronos.telemetry.switches.1.interfaces.*'
+
+        points = self.backend.get_many(f'{pattern}.bytes_in', 0, 20)
+        self.assertEqual(points, {
+            f'{self.namespace}.bytes_in': [['1970-01-01T00:00:00Z', 0],
+                                           ['1970-01-01T00:00:10Z', 10],
+                                           ['1970-01-01T00:00:20Z', 20]],
+            'kytos.kronos.telemetry.switches.1.interfaces.233.bytes_in':
+                [['1970-01-01T00:00:00Z', 5]]})
+
+        points = self.backend.get_many(f'{pattern}.bytes_*', 0, 59, 'sum',
+                                       group='1m')
+        self.assertEqual(list(points), [
+            f'{self.namespace}.bytes_in', f'{self.namespace}.bytes_out',
+            'kytos.kronos.telemetry.switches.1.interfaces.233.bytes_in'])
+        self.assertEqual(points[f'{self.namespace}.bytes_in'],
+                         [['1970-01-01T00:00:00Z', 150]])
+
+        with self.assertRaises(NamespaceError):
+            self.backend.get_many('kytos.kronos.other.*.bytes_in', 0, 20)
+
+    def test_delete_success(self):
+        """Test that delete removes every field inside the range."""
+        self._save_series()
+
+        self.backend.delete(f'{self.namespace}.bytes_in', 10, 100)
+
+        self.assertEqual(self.backend.get(f'{self.namespace}.bytes_in', 0,
+                                          200),
+                         [['1970-01-01T00:00:00Z', 0.0],
+                          ['1970-01-01T00:01:50Z', 110.0]])
+        self.assertEqual(len(self.backend.get(f'{self.namespace}.bytes_out',
+                                              0, 200)), 2)
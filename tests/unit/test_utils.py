@@ -4,8 +4,16 @@ Unit tests to check fail and success cases in utils module.
 """
 from unittest import TestCase
 
-from napps.kytos.kronos.utils import (convert_to_iso, iso_format_validation,
-                                      validate_timestamp)
+from napps.kytos.kronos.utils import (NamespaceError, convert_to_iso,
+                                      decode_cursor, encode_cursor,
+                                      extract_field, fill_buckets,
+                                      is_namespace_pattern,
+                                      iso_format_validation, namespace_regex,
+                                      nanoseconds_to_iso, parse_duration,
+                                      parse_fields, parse_line_protocol,
+                                      parse_record,
+                                      to_nanoseconds, to_nanoseconds_many,
+                                      validate_namespace, validate_timestamp)
 
 
 class TestMainKronos(TestCase):
@@ -71,3 +79,157 @@ class TestMainKronos(TestCase):
         return_value = iso_format_validation(timestamp)
 
         self.assertEqual(return_value, False)
+        self.assertEqual(iso_format_validation(10), False)
+
+    def test_to_nanoseconds(self):
+        """Test the conversion of timestamps to epoch nanoseconds."""
+        self.assertEqual(to_nanoseconds('1970-01-01T00:00:01.5Z'),
+                         1500000000)
+        self.assertEqual(to_nanoseconds('1970-01-01T01:00:00+01:00'), 0)
+        self.assertEqual(to_nanoseconds('1970-01-02'), 86400 * 10**9)
+        self.assertEqual(to_nanoseconds(2), 2 * 10**9)
+        self.assertEqual(to_nanoseconds('2.5'), 2500000000)
+        self.assertEqual(to_nanoseconds(1500, 'ms'), 1500000000)
+        self.assertEqual(to_nanoseconds(1234567890123456789, 'ns'),
+                         1234567890123456789)
+        self.assertEqual(to_nanoseconds('1600000000.123456789'),
+                         1600000000123456789)
+        self.assertEqual(to_nanoseconds('1600000000123.456789', 'ms'),
+                         1600000000123456789)
+
+    def test_to_nanoseconds_fail(self):
+        """Test fail cases in method to_nanoseconds."""
+        for timestamp in ('abc', None, '1970-01-01 00:00'):
+            with self.assertRaises(ValueError):
+                to_nanoseconds(timestamp)
+        with self.assertRaises(ValueError):
+            to_nanoseconds(1, 'minutes')
+
+    def test_to_nanoseconds_many(self):
+        """Test the conversion of a batch of timestamps."""
+        self.assertEqual(to_nanoseconds_many([1, 2], 'ms'), [10**6, 2 * 10**6])
+        self.assertEqual(to_nanoseconds_many(['1970-01-01T00:00:01Z', 2.5]),
+                         [10**9, 2500000000])
+
+    def test_parse_fields(self):
+        """Test the parsing of the fields selected by a query."""
+        self.assertIsNone(parse_fields(None))
+        self.assertEqual(parse_fields('*'), '*')
+        self.assertEqual(parse_fields('bytes_in, bytes_out,bytes_in'),
+                         ('bytes_in', 'bytes_out'))
+        self.assertEqual(parse_fields(['errors']), ('errors',))
+        for fields in ('', 'a,"b"', 3, []):
+            with self.assertRaises(ValueError):
+                parse_fields(fields)
+
+    def test_parse_duration(self):
+        """Test the conversion of InfluxDB durations."""
+        self.assertEqual(parse_duration('10m'), 600 * 10**9)
+        self.assertEqual(parse_duration('5ms'), 5 * 10**6)
+        with self.assertRaises(ValueError):
+            parse_duration('10x')
+
+    def test_fill_buckets(self):
+        """Test that empty buckets are filled between start and end."""
+        rows = [(0, 1.0), (20, 3.0)]
+        self.assertEqual(fill_buckets(rows, 'none', 0, 30, 10), rows)
+        self.assertEqual(fill_buckets(rows, 'previous', 0, 30, 10),
+                         [(0, 1.0), (10, 1.0), (20, 3.0), (30, 3.0)])
+        self.assertEqual(fill_buckets(rows, '0', 5, 15, 10),
+                         [(0, 1.0), (10, 0.0)])
+        with self.assertRaises(ValueError):
+            fill_buckets(rows, 'linear', 0, 30, 10)
+
+    def test_nanoseconds_to_iso(self):
+        """Test that only non-zero fractions are kept."""
+        self.assertEqual(nanoseconds_to_iso(10**9), '1970-01-01T00:00:01Z')
+        self.assertEqual(nanoseconds_to_iso(10**9 + 5 * 10**8),
+                         '1970-01-01T00:00:01.5Z')
+
+    def test_cursor(self):
+        """Test that cursors decode to the encoded timestamp."""
+        cursor = encode_cursor('1970-01-01T00:00:01.5Z')
+        self.assertEqual(decode_cursor(cursor), '1970-01-01T00:00:01.5Z')
+
+        for cursor in ('not a cursor', encode_cursor('abc')):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_parse_record_success(self):
+        """Test success in method parse_record."""
+        record = {'namespace': 'kytos.kronos.telemetry',
+                  'fields': {'bytes_in': 1}, 'timestamp': 10}
+
+        return_value = parse_record(record)
+
+        self.assertEqual(return_value,
+                         ('kytos.kronos.telemetry', {'bytes_in': 1}, 10))
+
+    def test_parse_record_fail_without_fields(self):
+        """Test fail in method parse_record without fields."""
+        with self.assertRaises(ValueError):
+            parse_record({'namespace': 'kytos.kronos.telemetry'})
+
+    def test_parse_line_protocol_success(self):
+        """Test success in method parse_line_protocol."""
+        line = 'kytos.kronos.a\\ b bytes_in=1i,up=t,rate=0.5 2000000000'
+
+        return_value = parse_line_protocol(line)
+
+        expected = ('kytos.kronos.a b',
+                    {'bytes_in': 1.0, 'up': 1.0, 'rate': 0.5}, 2000000000)
+        self.assertEqual(return_value, expected)
+
+    def test_parse_line_protocol_fail_with_tags(self):
+        """Test fail in method parse_line_protocol with tags."""
+        with self.assertRaises(ValueError):
+            parse_line_protocol('kytos.kronos.a,host=1 bytes_in=1')
+
+    def test_parse_line_protocol_fail_with_invalid_value(self):
+        """Test fail in method parse_line_protocol with a string value."""
+        with self.assertRaises(ValueError):
+            parse_line_protocol('kytos.kronos.a bytes_in=abc')
+
+    def test_validate_namespace_success(self):
+        """Test to check the success in namespace validation."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+
+        result = validate_namespace(namespace)
+
+        self.assertEqual(result, True)
+
+    def test_validate_namespace_fail_with_invalid_namespace_value(self):
+        """Test validate_namespace when its called with invalid value."""
+        namespace = 1234
+
+        with self.assertRaises(TypeError):
+            validate_namespace(namespace)
+
+    def test_validate_namespace_fail_without_prefix(self):
+        """Test validate_namespace when its called without prefix."""
+        namespace = 'telemetry.switches.1.interfaces.232.bytes_in'
+
+        with self.assertRaises(NamespaceError):
+            validate_namespace(namespace)
+
+    def test_extract_field(self):
+        """Test extract_field method."""
+        namespace = 'kytos.kronos.telemetry.switches.1.interfaces.232.bytes_in'
+
+        result = extract_field(namespace)
+
+        expected_value = ('kytos.kronos.telemetry.switches.1.interfaces.232',
+                          'bytes_in')
+
+        self.assertEqual(result, expected_value)
+
+    def test_namespace_regex(self):
+        """Test that a star matches within one namespace segment."""
+        regex = namespace_regex('kytos.kronos.switches.*.bytes_*')
+
+        self.assertTrue(is_namespace_pattern('kytos.kronos.switches.*'))
+        self.assertFalse(is_namespace_pattern('kytos.kronos.switches.1'))
+        self.assertTrue(regex.match('kytos.kronos.switches.1.bytes_in'))
+        self.assertFalse(regex.match('kytos.kronos.switches.1.2.bytes_in'))
+        self.assertFalse(regex.match('kytos.kronos.switches.1.errors'))
+        self.assertFalse(namespace_regex('a.b').match('a-b'))
@@ -0,0 +1,103 @@
+"""Module to test the worker pool of kytos/kronos."""
+from threading import Event, Lock, current_thread
+from unittest import TestCase, mock
+
+from napps.kytos.kronos.workers import WorkerPool
+
+
+class TestWorkerPool(TestCase):
+    """Test the bounded worker pool."""
+
+    def setUp(self):
+        """Create an event to hold the worker thread busy."""
+        self.release = Event()
+
+    def tearDown(self):
+        """Let the worker threads finish."""
+        self.release.set()
+
+    def _busy_pool(self, overflow):
+        """Return a pool with one busy worker and one queued task."""
+        started = Event()
+
+        def block():
+            started.set()
+            self.release.wait()
+
+        pool = WorkerPool(1, 1, overflow)
+        pool.submit(block)
+        started.wait()
+        return pool
+
+    def test_submit_runs_task(self):
+        """Test that submitted tasks run on the worker threads."""
+        pool = WorkerPool(2, 10)
+        function = mock.MagicMock(__name__='function')
+
+        pool.submit(function, 1, 2)
+        pool.shutdown()
+
+        function.assert_called_once_with(1, 2)
+
+    def test_submit_keeps_order_by_key(self):
+        """Test that tasks with the same key run in order on one thread."""
+        pool = WorkerPool(4, 100)
+        runs = []
+        lock = Lock()
+
+        def record(key, index):
+            with lock:
+                runs.append((key, index, current_thread().name))
+
+        for index in range(20):
+            for key in ('a', 'b'):
+                pool.submit(record, key, index, key=key)
+        pool.shutdown()
+
+        for key in ('a', 'b'):
+            keyed = [(index, name) for run_key, index, name in runs
+                     if run_key == key]
+            self.assertEqual([index for index, _ in keyed], list(range(20)))
+            self.assertEqual(len({name for _, name in keyed}), 1)
+
+    def test_invalid_overflow_policy(self):
+        """Test that an unknown overflow policy is refused."""
+        with self.assertRaises(ValueError):
+            WorkerPool(1, 1, 'ignore')
+
+    def test_reject_overflow(self):
+        """Test that the new task is rejected when the queue is full."""
+        pool = self._busy_pool('reject')
+        on_reject = mock.MagicMock()
+        queued = mock.MagicMock(__name__='queued')
+        rejected = mock.MagicMock(__name__='rejected')
+
+        self.assertTrue(pool.submit(queued, 'a', on_reject=on_reject))
+        self.assertFalse(pool.submit(rejected, 'b', on_reject=on_reject))
+
+        on_reject.assert_called_once_with('b')
+        self.assertEqual(pool.stats()['rejected'], 1)
+        self.assertEqual(pool.stats()['queue_depth'], 1)
+
+        self.release.set()
+        pool.shutdown()
+        queued.assert_called_once_with('a')
+        rejected.assert_not_called()
+
+    def test_drop_oldest_overflow(self):
+        """Test that the oldest task is dropped when the queue is full."""
+        pool = self._busy_pool('drop_oldest')
+        on_reject = mock.MagicMock()
+        dropped = mock.MagicMock(__name__='dropped')
+        queued = mock.MagicMock(__name__='queued')
+
+        pool.submit(dropped, 'a', on_reject=on_reject)
+        self.assertTrue(pool.submit(queued, 'b', on_reject=on_reject))
+
+        on_reject.assert_called_once_with('a')
+        self.assertEqual(pool.stats()['dropped'], 1)
+
+        self.release.set()
+        pool.shutdown()
+        queued.assert_called_once_with('b')
+        dropped.assert_not_called()
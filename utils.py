@@ -1,6 +1,37 @@
 """Utility features for all backends."""
+import base64
+import binascii
+import calendar
+import math
 import re
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from time import time
+
+MAX_FILL_BUCKETS = 100000
+
+DURATIONS = {'ns': 1, 'u': 10**3, 'µ': 10**3, 'ms': 10**6, 's': 10**9,
+             'm': 60 * 10**9, 'h': 3600 * 10**9, 'd': 86400 * 10**9,
+             'w': 604800 * 10**9}
+
+_ISO_PARTS = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2})'
+                        r'(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})?)?$')
+
+_ISO_FORMAT = re.compile(
+    r'^(-?(?:[1-9][0-9]*)?[0-9]{4})-(1[0-2]|0[1-9])-(3[01]|0[1-9]|[12][0-9])'
+    r'T(2[0-3]|[01][0-9]):([0-5][0-9]):([0-5][0-9])(\.[0-9]+)?'
+    r'(Z|[+-](?:2[0-3]|[01][0-9]):[0-5][0-9])?$')
+_DATE_FORMAT = re.compile(
+    r'^([12]\d{3}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01]))')
+
+_FIELD_NAME = re.compile(r'^[\w-]+$')
+
+# Nanoseconds in a unit of each epoch precision.
+PRECISIONS = {'s': 10**9, 'ms': 10**6, 'u': 10**3, 'ns': 1}
+
+# Distinct timestamps whose parsing or formatting is memoized.
+TIMESTAMP_CACHE_SIZE = 65536
 
 
 class KronosException(Exception):
@@ -11,13 +42,70 @@ class BackendError(KronosException):
     """Exception thrown when a non specific error occurs in backend."""
 
 
+class BackendUnavailableError(BackendError):
+    """Exception thrown when a backend cannot be reached."""
+
+
 class NamespaceError(KronosException):
     """Exception thrown when the provided namespace is not valid."""
 
 
+class QueueFullError(KronosException):
+    """Exception thrown when a request is discarded due to a full queue."""
+
+
+class InvalidQueryError(Exception):
+    """Exception thrown when the assembled query is not valid."""
+
+
 def now():
     """Return timestamp in ISO-8601 format."""
-    return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    return _format_seconds(int(time()))
+
+
+def now_nanoseconds():
+    """Return the current time in epoch nanoseconds, in whole seconds.
+
+    It is the time of ``now()``, without formatting and parsing it.
+    """
+    return int(time()) * 10**9
+
+
+def validate_namespace(namespace):
+    """Verify that a namespace is a string in the kytos.kronos.* format."""
+    if not isinstance(namespace, str) or not re.match(r'\S+', namespace):
+        error = 'Error. Namespace should be a string.'
+        raise TypeError(error)
+
+    if 'kytos.kronos' not in namespace:
+        error = (f'Error. Namespace \'{namespace}\' must have the format '
+                 '\'kytos.kronos.*\'')
+        raise NamespaceError(error)
+
+    return True
+
+
+def is_namespace_pattern(namespace):
+    """Return whether a namespace is a pattern matching many namespaces."""
+    return isinstance(namespace, str) and '*' in namespace
+
+
+def namespace_regex(pattern):
+    """Return a regex matching the namespaces of a pattern.
+
+    A ``*`` matches any part of a single segment, so ``a.*.bytes_in``
+    matches ``a.1.bytes_in`` but not ``a.1.2.bytes_in``.
+    """
+    segments = (re.escape(segment).replace(r'\*', '[^.]*')
+                for segment in pattern.split('.'))
+    return re.compile('^' + r'\.'.join(segments) + '$')
+
+
+def extract_field(namespace):
+    """Split a namespace in its measurement and its last segment, the field."""
+    field = namespace.split('.')[-1]
+    namespace = '.'.join(namespace.split('.')[:-1])
+    return namespace, field
 
 
 def validate_timestamp(start, end):
@@ -29,13 +117,16 @@ def validate_timestamp(start, end):
     return True
 
 
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _format_seconds(seconds):
+    return datetime.utcfromtimestamp(seconds).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
 def convert_to_iso(timestamp):
     """Convert a value to ISO-8601 format."""
     try:
         timestamp = float(timestamp)
-        iso = '%Y-%m-%dT%H:%M:%SZ'
-        timestamp = datetime.utcfromtimestamp(timestamp).strftime(iso)
-        return timestamp
+        return _format_seconds(math.floor(timestamp))
     except ValueError:
         error = f'Error: Timestamp value \'{timestamp}\' is not convertible'\
                  ' to ISO-8601 format.'
@@ -46,24 +137,253 @@ def convert_to_iso(timestamp):
         raise ValueError(error)
 
 
+def to_nanoseconds(timestamp, precision='s'):
+    """Convert an ISO-8601 timestamp or an epoch time to epoch nanoseconds.
+
+    Epoch times are numbers, or strings of numbers, in the ``precision``
+    unit: 's', 'ms', 'u' or 'ns'. Strings are parsed once and memoized.
+    """
+    if isinstance(timestamp, int) and precision in PRECISIONS:
+        return timestamp * PRECISIONS[precision]
+    if isinstance(timestamp, str):
+        return _parse_timestamp(timestamp, precision)
+    return _epoch_to_nanoseconds(timestamp, precision)
+
+
+def to_nanoseconds_many(timestamps, precision='s'):
+    """Convert a sequence of timestamps to a list of epoch nanoseconds.
+
+    Integer epoch times are scaled in one pass, and repeated strings are
+    parsed once.
+    """
+    factor = PRECISIONS.get(precision)
+    if factor is not None and \
+       all(type(timestamp) is int for timestamp in timestamps):
+        return [timestamp * factor for timestamp in timestamps]
+    return [to_nanoseconds(timestamp, precision) for timestamp in timestamps]
+
+
+def _epoch_to_nanoseconds(timestamp, precision):
+    """Convert an epoch time in a precision unit to epoch nanoseconds.
+
+    Strings are parsed as decimals, so that every digit of their fraction
+    is kept, which a float cannot do past about 16 significant digits.
+    """
+    try:
+        if isinstance(timestamp, float):
+            return int(timestamp * PRECISIONS[precision])
+        return int(Decimal(timestamp) * PRECISIONS[precision])
+    except KeyError:
+        error = (f'Error. Precision \'{precision}\' must be one of '
+                 f'{", ".join(PRECISIONS)}.')
+        raise ValueError(error)
+    except (TypeError, ValueError, OverflowError, InvalidOperation):
+        error = f'Error: Timestamp value \'{timestamp}\' is not '\
+                'convertible to epoch nanoseconds.'
+        raise ValueError(error)
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_timestamp(timestamp, precision):
+    """Parse an ISO-8601 or epoch time string to epoch nanoseconds."""
+    if iso_format_validation(timestamp) is False:
+        return _epoch_to_nanoseconds(timestamp, precision)
+
+    match = _ISO_PARTS.match(timestamp)
+    if match is None:
+        error = f'Error: Timestamp value \'{timestamp}\' is not '\
+                'convertible to epoch nanoseconds.'
+        raise ValueError(error)
+
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    seconds = calendar.timegm((int(year), int(month), int(day),
+                               int(hour or 0), int(minute or 0),
+                               int(second or 0)))
+    if zone and zone != 'Z':
+        offset = int(zone[1:3]) * 3600 + int(zone[4:6]) * 60
+        seconds -= offset if zone[0] == '+' else -offset
+
+    return seconds * 10**9 + int((fraction or '0').ljust(9, '0')[:9])
+
+
+def parse_duration(group):
+    """Return an InfluxDB duration like '10m' in nanoseconds."""
+    match = re.match(r'^(\d+)(ns|u|µ|ms|s|m|h|d|w)$', str(group))
+    if match is None:
+        error = f'Error. Group \'{group}\' is not a valid duration.'
+        raise ValueError(error)
+    return int(match.group(1)) * DURATIONS[match.group(2)]
+
+
+def fill_buckets(rows, fill, start, end, step):
+    """Fill the (bucket, value) rows without data between start and end.
+
+    Rows only have the buckets with data, which is the same as InfluxDB's
+    ``fill(none)``. Bucket times are epoch nanoseconds.
+    """
+    if fill is None or fill == 'none':
+        return rows
+    if fill == 'linear':
+        error = 'Error. Fill \'linear\' is not supported by this backend.'
+        raise ValueError(error)
+    if fill not in ('null', 'previous'):
+        try:
+            fill = float(fill)
+        except ValueError:
+            error = f'Error. Fill \'{fill}\' is not valid.'
+            raise ValueError(error)
+
+    first = start - start % step
+    if (end - first) // step >= MAX_FILL_BUCKETS:
+        error = (f'Error. Fill would return more than {MAX_FILL_BUCKETS} '
+                 'buckets.')
+        raise ValueError(error)
+
+    values = dict(rows)
+    filled = []
+    previous = None
+    for bucket in range(first, end + 1, step):
+        if bucket in values:
+            previous = values[bucket]
+            filled.append((bucket, previous))
+        elif fill == 'null':
+            filled.append((bucket, None))
+        elif fill == 'previous':
+            filled.append((bucket, previous))
+        else:
+            filled.append((bucket, fill))
+    return filled
+
+
+def nanoseconds_to_iso(nanoseconds):
+    """Convert epoch nanoseconds to ISO-8601, keeping the fraction if any."""
+    seconds, fraction = divmod(int(nanoseconds), 10**9)
+    iso = convert_to_iso(seconds)
+    if fraction:
+        iso = f'{iso[:-1]}.{fraction:09d}'.rstrip('0') + 'Z'
+    return iso
+
+
+def parse_fields(fields):
+    """Return the fields selected by a query: None, '*' or a tuple of names.
+
+    Fields are given as a list or as a comma-separated string.
+    """
+    if fields is None or fields == '*':
+        return fields
+    if isinstance(fields, str):
+        names = fields.split(',')
+    elif isinstance(fields, (list, tuple)):
+        names = fields
+    else:
+        names = []
+
+    names = tuple(dict.fromkeys(str(name).strip() for name in names))
+    if not names or not all(_FIELD_NAME.match(name) for name in names):
+        error = (f'Error. Fields \'{fields}\' must be \'*\' or a list of '
+                 'field names.')
+        raise ValueError(error)
+    return names
+
+
+def encode_cursor(timestamp):
+    """Return an opaque cursor pointing after a point timestamp."""
+    return base64.urlsafe_b64encode(str(timestamp).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the timestamp of the last point seen from a cursor."""
+    try:
+        timestamp = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (AttributeError, binascii.Error, UnicodeError):
+        timestamp = None
+
+    if not timestamp or iso_format_validation(timestamp) is False:
+        error = f'Error. Cursor \'{cursor}\' is not valid.'
+        raise ValueError(error)
+    return timestamp
+
+
 def iso_format_validation(timestamp):
     """Verify if a timestamp is in isoformat."""
-    if timestamp is None:
+    if not isinstance(timestamp, str):
+        return False
+
+    if not (_ISO_FORMAT.match(timestamp) or _DATE_FORMAT.match(timestamp)):
         return False
 
-    first_part = "(?:[1-9][0-9]*)?[0-9]{4})-(1[0-2]|0[1-9])-"
-    second_part = "(3[01]|0[1-9]|[12][0-9])T(2[0-3]|[01][0-9]):([0-5][0-9]):"
-    third_part = "([0-5][0-9])(\\.[0-9]+)?(Z|[+-](?:2[0-3]|[01][0-9]):[0-5]"\
-                 "[0-9])"
+    return True
 
-    regex = first_part + second_part + third_part
-    regex_iso = r'^(-?' + regex + '?$'
-    regex_date = r'^([12]\d{3}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01]))'
 
-    match_iso = re.compile(regex_iso).match
-    match_date = re.compile(regex_date).match
+def parse_record(item):
+    """Return a (namespace, fields, timestamp) tuple from a JSON object."""
+    if not isinstance(item, dict) or 'namespace' not in item:
+        error = 'Error. Record must be an object with a \'namespace\' key.'
+        raise ValueError(error)
 
-    if not (match_iso(timestamp) or match_date(timestamp)):
-        return False
+    fields = item.get('fields')
+    if not isinstance(fields, dict) or not fields:
+        error = 'Error. Record \'fields\' must be a non-empty object.'
+        raise ValueError(error)
 
-    return True
+    return item['namespace'], fields, item.get('timestamp')
+
+
+def _split_unescaped(text, separator):
+    """Split text on every separator not preceded by a backslash."""
+    return re.split(r'(?<!\\)' + re.escape(separator), text)
+
+
+def _unescape(text):
+    return re.sub(r'\\([ ,=])', r'\1', text)
+
+
+def _parse_line_value(value):
+    if value in ('t', 'T', 'true', 'True', 'TRUE'):
+        return 1.0
+    if value in ('f', 'F', 'false', 'False', 'FALSE'):
+        return 0.0
+    if value[-1:] in ('i', 'u'):
+        value = value[:-1]
+    try:
+        return float(value)
+    except ValueError:
+        error = f'Error. Field value \'{value}\' is not a number.'
+        raise ValueError(error)
+
+
+def parse_line_protocol(line):
+    """Return a (namespace, fields, timestamp) tuple from a line protocol.
+
+    The line follows the InfluxDB format ``measurement field=value[,...]
+    [timestamp]``, with the timestamp in nanoseconds, returned as an integer
+    to be saved with the 'ns' precision. Tags are not supported because
+    kronos identifies series only by their namespace.
+    """
+    parts = _split_unescaped(line.strip(), ' ')
+    if len(parts) not in (2, 3):
+        error = f'Error. Line \'{line}\' is not in line protocol format.'
+        raise ValueError(error)
+
+    measurement = _split_unescaped(parts[0], ',')
+    if len(measurement) > 1:
+        error = f'Error. Tags are not supported in line \'{line}\'.'
+        raise ValueError(error)
+
+    fields = {}
+    for field in _split_unescaped(parts[1], ','):
+        key, sep, value = field.partition('=')
+        if not sep or not key:
+            error = f'Error. Invalid field \'{field}\' in line \'{line}\'.'
+            raise ValueError(error)
+        fields[_unescape(key)] = _parse_line_value(value)
+
+    timestamp = None
+    if len(parts) == 3:
+        try:
+            timestamp = int(parts[2])
+        except ValueError:
+            error = f'Error. Timestamp \'{parts[2]}\' is not an integer.'
+            raise ValueError(error)
+
+    return _unescape(measurement[0]), fields, timestamp
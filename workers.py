@@ -0,0 +1,131 @@
+"""Bounded thread pool used to run backend operations off event threads."""
+from itertools import count
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+
+from kytos.core import log
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'reject')
+
+
+class WorkerPool:
+    """Run submitted tasks on a fixed number of threads.
+
+    Each thread runs the tasks of its own queue, in order. Tasks submitted
+    with the same ``key`` go to the same queue, so they run in the order
+    they were submitted, and tasks without a key are spread over the
+    queues in turns. Pending tasks wait in queues of at most ``queue_size``
+    items altogether. When the queue of a task is full, ``overflow``
+    decides what happens to it:
+
+    - ``block``: the caller waits until there is room in the queue;
+    - ``drop_oldest``: the oldest pending task is discarded;
+    - ``reject``: the new task is discarded.
+
+    Discarded tasks are not run. Instead, their ``on_reject`` callable is
+    called with the task arguments.
+    """
+
+    def __init__(self, size, queue_size, overflow='block', name='worker'):
+        """Start the worker threads."""
+        if overflow not in OVERFLOW_POLICIES:
+            error = (f'Error. Overflow policy \'{overflow}\' must be one of '
+                     f'{", ".join(OVERFLOW_POLICIES)}.')
+            raise ValueError(error)
+
+        self._overflow = overflow
+        size = max(int(size), 1)
+        self._queues = [Queue(max(int(queue_size) // size, 1))
+                        for _ in range(size)]
+        self._turns = count()
+        self._lock = Lock()
+        self._rejected = 0
+        self._dropped = 0
+        self._threads = [Thread(target=self._run, args=(queue,), daemon=True,
+                                name=f'{name}-{index}')
+                         for index, queue in enumerate(self._queues)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, function, *args, key=None, on_reject=None):
+        """Queue ``function(*args)`` to run on a worker thread.
+
+        Tasks with the same ``key`` run in order, on the same thread.
+        Return False if the task was rejected due to a full queue.
+        """
+        task = (function, args, on_reject)
+        if key is None:
+            with self._lock:
+                turn = next(self._turns)
+            queue = self._queues[turn % len(self._queues)]
+        else:
+            queue = self._queues[hash(key) % len(self._queues)]
+
+        if self._overflow == 'block':
+            queue.put(task)
+            return True
+
+        while True:
+            try:
+                queue.put_nowait(task)
+                return True
+            except Full:
+                if self._overflow == 'reject':
+                    with self._lock:
+                        self._rejected += 1
+                    self._discard(task)
+                    return False
+
+            try:
+                dropped = queue.get_nowait()
+            except Empty:
+                continue
+            queue.task_done()
+            with self._lock:
+                self._dropped += 1
+            self._discard(dropped)
+
+    def join(self):
+        """Wait until every queued task has been run."""
+        for queue in self._queues:
+            queue.join()
+
+    def shutdown(self):
+        """Run the pending tasks and stop the worker threads."""
+        for queue in self._queues:
+            queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        """Return the pool size, queue depth and discarded task counters."""
+        with self._lock:
+            return {'workers': len(self._threads),
+                    'queue_depth': sum(queue.qsize()
+                                       for queue in self._queues),
+                    'queue_size': sum(queue.maxsize
+                                      for queue in self._queues),
+                    'overflow': self._overflow,
+                    'rejected': self._rejected,
+                    'dropped': self._dropped}
+
+    @staticmethod
+    def _discard(task):
+        function, args, on_reject = task
+        log.warning(f'Worker queue is full, discarding {function.__name__}.')
+        if on_reject is not None:
+            on_reject(*args)
+
+    @staticmethod
+    def _run(queue):
+        while True:
+            task = queue.get()
+            try:
+                if task is None:
+                    return
+                function, args, _ = task
+                function(*args)
+            except Exception as exception:
+                log.error(f'Error running {task[0].__name__}: {exception}')
+            finally:
+                queue.task_done()